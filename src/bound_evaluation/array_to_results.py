@@ -1,194 +1,435 @@
-"""This file takes arrays and writes them into dictionaries"""
+"""This file takes arrays and writes them into dictionaries. The
+aggregators consume the arrays chunk by chunk, so their memory does not
+grow with the number of iterations."""
 
 import sys
+from math import inf, nan, sqrt
+from typing import Tuple
 from warnings import warn
 
 import numpy as np
+import scipy.stats
 
 from nc_arrivals.arrival_enum import ArrivalEnum
 
 
-def two_col_array_to_results(arrival_enum: ArrivalEnum,
-                             param_array: np.array,
-                             res_array: np.array,
-                             number_servers: int,
-                             valid_iterations: int,
-                             metric: str = "relative") -> dict:
-    """Writes the array values into a dictionary"""
-    if res_array.shape[1] != 2:
-        raise NameError(f"Array must have 2 columns, not {res_array.shape[1]}")
-
-    iterations = int(res_array.shape[0])
-
+def _improvement_vec(bound_1: np.ndarray, bound_2: np.ndarray,
+                     metric: str) -> np.ndarray:
     if metric == "relative":
-        improvement_vec = np.divide(res_array[:, 0], res_array[:, 1])
+        return np.divide(bound_1, bound_2)
     elif metric == "absolute":
-        improvement_vec = np.subtract(res_array[:, 0], res_array[:, 1])
+        return np.subtract(bound_1, bound_2)
     else:
         raise NameError(f"Metric parameter {metric} is infeasible")
 
-    row_max = np.nanargmax(improvement_vec)
-    opt_standard_bound = res_array[row_max, 0]
-    opt_new_bound = res_array[row_max, 1]
-    opt_improvement = improvement_vec[row_max]
-    mean_improvement = np.nanmean(improvement_vec)
 
-    # number_improved = np.sum(np.greater(res_array[:, 0], res_array[:, 1]))
-    number_improved = np.sum(res_array[:, 0] > res_array[:, 1])
+def _mean(total: float, count: int) -> float:
+    if count == 0:
+        return nan
 
-    count_nan = np.count_nonzero(np.isnan(res_array), axis=0)
-    count_nan_standard = count_nan[0]
-    count_nan_new = count_nan[1]
+    return total / count
 
-    if count_nan_standard != count_nan_new:
-        warn(f"number of nan's does not match, "
-             f"{count_nan_standard} != {count_nan_new}")
 
+def _check_columns(res_chunk: np.ndarray, number_columns: int) -> None:
+    if res_chunk.shape[1] != number_columns:
+        raise NameError(f"Array must have {number_columns} columns, "
+                        f"not {res_chunk.shape[1]}")
+
+
+def _check_valid(iterations: int, valid_iterations: int, nan_msg: str,
+                 useless_msg: str) -> None:
     if valid_iterations < iterations * 0.25:
-        warn(f"way too many nan's: "
-             f"{iterations - valid_iterations} out of {iterations}!")
+        warn(nan_msg)
 
         if valid_iterations < 100:
-            warn("result is useless")
+            warn(useless_msg)
             sys.exit(1)
 
-    res_dict = {"Name": "Value", "arrival_distribution": arrival_enum.name}
+
+class RunningArgmax(object):
+    """nanargmax over chunks that also keeps the corresponding rows. Among
+    equal maxima, the first row wins, as in np.nanargmax."""
+
+    def __init__(self) -> None:
+        self.value = None
+        self.row = None
+        self.data: tuple = ()
+
+    def update(self, values: np.ndarray, start: int, *data_chunks) -> None:
+        """
+        :param values:      values of the chunk
+        :param start:       row of the chunk's first value
+        :param data_chunks: arrays whose row at the maximum is kept
+        """
+        if np.all(np.isnan(values)):
+            return
+
+        i = int(np.nanargmax(values))
+        value = values[i]
+
+        if (self.value is None or value > self.value
+                or (value == self.value and start + i < self.row)):
+            self.value = value
+            self.row = start + i
+            self.data = tuple(np.copy(chunk[i]) for chunk in data_chunks)
+
+    def check(self) -> None:
+        if self.value is None:
+            raise ValueError("All-NaN slice encountered")
+
+
+class TwoColAggregator(object):
+    """Streaming version of two_col_array_to_results, columns are
+    (standard bound, new bound)"""
+
+    def __init__(self,
+                 arrival_enum: ArrivalEnum,
+                 number_servers: int,
+                 metric: str = "relative") -> None:
+        _improvement_vec(np.ones(1), np.ones(1), metric)
+
+        self.arrival_enum = arrival_enum
+        self.number_servers = number_servers
+        self.metric = metric
+
+        self.iterations = 0
+        self.number_valid = 0
+        self.sum_improvement = 0.0
+        self.sum_sq_improvement = 0.0
+        self.count_improvement = 0
+        self.number_improved = 0
+        self.count_nan = np.zeros(2, dtype=int)
+        self.opt = RunningArgmax()
+
+    def update(self, param_chunk: np.ndarray, res_chunk: np.ndarray,
+               start=None) -> None:
+        """
+        :param param_chunk: parameter rows of the chunk
+        :param res_chunk:   result rows of the chunk
+        :param start:       row of the chunk's first entry, chunks are
+                            assumed to be consecutive if None
+        """
+        _check_columns(res_chunk=res_chunk, number_columns=2)
+
+        if start is None:
+            start = self.iterations
+
+        improvement_vec = _improvement_vec(res_chunk[:, 0], res_chunk[:, 1],
+                                           self.metric)
+
+        self.opt.update(improvement_vec, start, res_chunk, param_chunk)
+        self.sum_improvement += np.nansum(improvement_vec)
+        self.sum_sq_improvement += np.nansum(np.square(improvement_vec))
+        self.count_improvement += int(
+            np.count_nonzero(~np.isnan(improvement_vec)))
+        self.number_improved += int(np.sum(res_chunk[:, 0] > res_chunk[:, 1]))
+        self.count_nan += np.count_nonzero(np.isnan(res_chunk), axis=0)
+        self.number_valid += int(
+            np.sum(~np.any(np.isnan(res_chunk), axis=1)))
+        self.iterations += res_chunk.shape[0]
+
+    def confidence_widths(self, level=0.95) -> Tuple[float, float]:
+        """
+        Normal approximation of the confidence intervals.
+
+        :param level: confidence level
+        :return:      widths of the intervals of "mean improvement" and
+                      "share improved", inf if there are too few rows
+        """
+        if self.count_improvement < 2 or self.number_valid < 2:
+            return inf, inf
+
+        z_score = scipy.stats.norm.ppf(0.5 + level / 2)
+
+        mean = self.sum_improvement / self.count_improvement
+        variance = (self.sum_sq_improvement - self.count_improvement *
+                    mean**2) / (self.count_improvement - 1)
+        # inf - inf is nan if there are infinite improvements
+        if np.isnan(variance):
+            return inf, inf
+        width_mean = 2 * z_score * sqrt(
+            max(variance, 0.0) / self.count_improvement)
+
+        share = self.number_improved / self.number_valid
+        width_share = 2 * z_score * sqrt(
+            share * (1 - share) / self.number_valid)
+
+        return width_mean, width_share
+
+    def is_precise(self, width_mean: float, width_share: float,
+                   level=0.95) -> bool:
+        """
+        :param width_mean:  target width for "mean improvement"
+        :param width_share: target width for "share improved"
+        :param level:       confidence level
+        :return:            whether both intervals are narrow enough
+        """
+        current_mean, current_share = self.confidence_widths(level=level)
+
+        return current_mean <= width_mean and current_share <= width_share
+
+    def results(self, valid_iterations=None) -> dict:
+        """
+        :param valid_iterations: number of rows without nan if None
+        :return:                 dictionary of two_col_array_to_results
+        """
+        if valid_iterations is None:
+            valid_iterations = self.number_valid
+
+        self.opt.check()
+        opt_res, opt_param = self.opt.data
+
+        if self.count_nan[0] != self.count_nan[1]:
+            warn(f"number of nan's does not match, "
+                 f"{self.count_nan[0]} != {self.count_nan[1]}")
+
+        _check_valid(
+            iterations=self.iterations,
+            valid_iterations=valid_iterations,
+            nan_msg=f"way too many nan's: "
+            f"{self.iterations - valid_iterations} out of {self.iterations}!",
+            useless_msg="result is useless")
+
+        res_dict = {
+            "Name": "Value",
+            "arrival_distribution": self.arrival_enum.name
+        }
+        res_dict.update(
+            _param_row_to_dict(
+                arrival_enum=self.arrival_enum,
+                param_row=opt_param,
+                number_servers=self.number_servers))
+
+        res_dict.update({
+            "opt standard bound": opt_res[0],
+            "opt new bound": opt_res[1],
+            "optimum improvement": self.opt.value,
+            "mean improvement": _mean(self.sum_improvement,
+                                      self.count_improvement),
+            "number improved": self.number_improved,
+            "valid iterations": valid_iterations,
+            "share improved": self.number_improved / valid_iterations
+        })
+
+        return res_dict
+
+
+class ThreeColAggregator(object):
+    """Streaming version of three_col_array_to_results, columns are
+    (standard bound, power bound, exp bound)"""
+
+    def __init__(self, arrival_enum: ArrivalEnum,
+                 metric: str = "relative") -> None:
+        _improvement_vec(np.ones(1), np.ones(1), metric)
+
+        self.arrival_enum = arrival_enum
+        self.metric = metric
+
+        self.iterations = 0
+        self.number_valid = 0
+        # power, exp and news improvement
+        self.sum_improvement = np.zeros(3)
+        self.count_improvement = np.zeros(3, dtype=int)
+        self.number_improved = 0
+        self.opt = RunningArgmax()
+
+    def update(self, res_chunk: np.ndarray, start=None) -> None:
+        """
+        :param res_chunk: result rows of the chunk
+        :param start:     row of the chunk's first entry, chunks are
+                          assumed to be consecutive if None
+        """
+        _check_columns(res_chunk=res_chunk, number_columns=3)
+
+        if start is None:
+            start = self.iterations
+
+        improvement_vecs = [
+            _improvement_vec(res_chunk[:, 0], res_chunk[:, 1], self.metric),
+            _improvement_vec(res_chunk[:, 0], res_chunk[:, 2], self.metric),
+            _improvement_vec(res_chunk[:, 1], res_chunk[:, 2], self.metric)
+        ]
+
+        self.opt.update(improvement_vecs[2], start, res_chunk)
+
+        for k, improvement_vec in enumerate(improvement_vecs):
+            self.sum_improvement[k] += np.nansum(improvement_vec)
+            self.count_improvement[k] += np.count_nonzero(
+                ~np.isnan(improvement_vec))
+
+        self.number_improved += int(np.sum(res_chunk[:, 1] > res_chunk[:, 2]))
+        self.number_valid += int(
+            np.sum(~np.any(np.isnan(res_chunk), axis=1)))
+        self.iterations += res_chunk.shape[0]
+
+    def results(self, valid_iterations=None) -> dict:
+        """
+        :param valid_iterations: number of rows without nan if None
+        :return:                 dictionary of three_col_array_to_results
+        """
+        if valid_iterations is None:
+            valid_iterations = self.number_valid
+
+        self.opt.check()
+        opt_res, = self.opt.data
+
+        _check_valid(
+            iterations=self.iterations,
+            valid_iterations=valid_iterations,
+            nan_msg=f"way too many nan's: "
+            f"{self.iterations - valid_iterations} nan out of "
+            f"{self.iterations}!",
+            useless_msg="result in useless")
+
+        means = [
+            _mean(self.sum_improvement[k], self.count_improvement[k])
+            for k in range(3)
+        ]
+
+        res_dict = {
+            "Name": "Value",
+            "arrival_distribution": self.arrival_enum.name
+        }
+
+        res_dict.update({
+            "opt_standard_bound": opt_res[0],
+            "opt_power_bound": opt_res[1],
+            "opt_exp_bound": opt_res[2],
+            "opt_new_improvement": self.opt.value,
+            "mean_power_improvement": means[0],
+            "mean_exp_improvement": means[1],
+            "mean_new_improvement": means[2],
+            "number improved": self.number_improved,
+            "valid iterations": valid_iterations,
+            "share improved": self.number_improved / valid_iterations
+        })
+
+        return res_dict
+
+
+class TimeAggregator(object):
+    """Streaming version of time_array_to_results, columns are
+    (time standard, time Lyapunov)"""
+
+    def __init__(self, arrival_enum: ArrivalEnum,
+                 number_servers: int) -> None:
+        self.arrival_enum = arrival_enum
+        self.number_servers = number_servers
+
+        # standard, Lyapunov and ratio
+        self.sum_time = np.zeros(3)
+        self.count_time = np.zeros(3, dtype=int)
+
+    def update(self, time_chunk: np.ndarray, start=None) -> None:
+        """
+        :param time_chunk: time rows of the chunk
+        :param start:      unused, the result does not depend on the order
+        """
+        columns = [
+            time_chunk[:, 0], time_chunk[:, 1],
+            np.divide(time_chunk[:, 0], time_chunk[:, 1])
+        ]
+
+        for k, column in enumerate(columns):
+            self.sum_time[k] += np.nansum(column)
+            self.count_time[k] += np.count_nonzero(~np.isnan(column))
+
+    def results(self, time_ratio: dict) -> dict:
+        """
+        :param time_ratio: is updated with the mean ratio
+        :return:           dictionary of time_array_to_results
+        """
+        standard_mean, lyapunov_mean, mean_ratio = [
+            _mean(self.sum_time[k], self.count_time[k]) for k in range(3)
+        ]
+
+        time_ratio.update({self.number_servers: mean_ratio})
+
+        # time_standard = [-2], time_lyapunov = [-1]
+        res_dict = {
+            "Name": "Value",
+            "arrival_distribution": self.arrival_enum.name,
+            "number_servers": self.number_servers,
+            "standard_mean": standard_mean,
+            "Lyapunov_mean": lyapunov_mean,
+            "mean_fraction": mean_ratio
+        }
+
+        return res_dict
+
+
+def _param_row_to_dict(arrival_enum: ArrivalEnum, param_row: np.ndarray,
+                       number_servers: int) -> dict:
+    """Names the parameters of the optimal row"""
+    res_dict = {}
 
     for j in range(number_servers):
         if arrival_enum == ArrivalEnum.DM1:
-            res_dict["lamb{0}".format(j + 1)] = param_array[row_max, j]
-            res_dict["rate{0}".format(
-                j + 1)] = param_array[row_max, number_servers + j]
+            res_dict["lamb{0}".format(j + 1)] = param_row[j]
+            res_dict["rate{0}".format(j + 1)] = param_row[number_servers + j]
 
         elif arrival_enum == ArrivalEnum.MD1:
-            res_dict["lamb{0}".format(j + 1)] = param_array[row_max, j]
-            res_dict["rate{0}".format(
-                j + 1)] = param_array[row_max, number_servers + j]
-            # res_dict["packet_size{0}".format(j + 1)] = param_array[
-            #     row_max, number_servers + j]
+            res_dict["lamb{0}".format(j + 1)] = param_row[j]
+            res_dict["rate{0}".format(j + 1)] = param_row[number_servers + j]
+            # res_dict["packet_size{0}".format(j + 1)] = param_row[
+            #     number_servers + j]
             res_dict["packet_size{0}".format(j + 1)] = 1.0
 
         elif arrival_enum == ArrivalEnum.MMOO:
-            res_dict["mu{0}".format(j + 1)] = param_array[row_max, j]
-            res_dict["lamb{0}".format(
-                j + 1)] = param_array[row_max, number_servers + j]
+            res_dict["mu{0}".format(j + 1)] = param_row[j]
+            res_dict["lamb{0}".format(j + 1)] = param_row[number_servers + j]
             res_dict["burst{0}".format(
-                j + 1)] = param_array[row_max, 2 * number_servers + j]
+                j + 1)] = param_row[2 * number_servers + j]
             res_dict["rate{0}".format(
-                j + 1)] = param_array[row_max, 3 * number_servers + j]
+                j + 1)] = param_row[3 * number_servers + j]
 
         elif arrival_enum == ArrivalEnum.EBB:
-            res_dict["M{0}".format(j + 1)] = param_array[row_max, j]
-            res_dict["b{0}".format(
-                j + 1)] = param_array[row_max, number_servers + j]
+            res_dict["M{0}".format(j + 1)] = param_row[j]
+            res_dict["b{0}".format(j + 1)] = param_row[number_servers + j]
             res_dict["rho{0}".format(
-                j + 1)] = param_array[row_max, 2 * number_servers + j]
+                j + 1)] = param_row[2 * number_servers + j]
             res_dict["rate{0}".format(
-                j + 1)] = param_array[row_max, 3 * number_servers + j]
+                j + 1)] = param_row[3 * number_servers + j]
 
         else:
             raise NameError(
                 f"Arrival parameter {arrival_enum.name} is infeasible")
 
-    res_dict.update({
-        "opt standard bound": opt_standard_bound,
-        "opt new bound": opt_new_bound,
-        "optimum improvement": opt_improvement,
-        "mean improvement": mean_improvement,
-        "number improved": number_improved,
-        "valid iterations": valid_iterations,
-        "share improved": number_improved / valid_iterations
-    })
-
     return res_dict
 
 
+def two_col_array_to_results(arrival_enum: ArrivalEnum,
+                             param_array: np.array,
+                             res_array: np.array,
+                             number_servers: int,
+                             valid_iterations: int,
+                             metric: str = "relative") -> dict:
+    """Writes the array values into a dictionary"""
+    aggregator = TwoColAggregator(
+        arrival_enum=arrival_enum,
+        number_servers=number_servers,
+        metric=metric)
+    aggregator.update(param_chunk=param_array, res_chunk=res_array)
+
+    return aggregator.results(valid_iterations=valid_iterations)
+
+
 def three_col_array_to_results(arrival_enum: ArrivalEnum,
                                res_array: np.array,
                                valid_iterations: int,
                                metric: str = "relative") -> dict:
     """Writes the array values into a dictionary, MMOO"""
-    if res_array.shape[1] != 3:
-        raise NameError("Array must have 3 columns, not {0}".format(
-            res_array.shape[1]))
-
-    iterations = int(res_array.shape[0])
-
-    if metric == "relative":
-        improvement_vec_1 = np.divide(res_array[:, 0], res_array[:, 1])
-        improvement_vec_2 = np.divide(res_array[:, 0], res_array[:, 2])
-        improvement_vec_news = np.divide(res_array[:, 1], res_array[:, 2])
-    elif metric == "absolute":
-        improvement_vec_1 = np.subtract(res_array[:, 0], res_array[:, 1])
-        improvement_vec_2 = np.subtract(res_array[:, 0], res_array[:, 2])
-        improvement_vec_news = np.subtract(res_array[:, 1], res_array[:, 2])
-    else:
-        raise NameError(f"Metric parameter {metric} is infeasible")
-
-    row_exp_max = np.nanargmax(improvement_vec_news)
-    opt_standard_bound = res_array[row_exp_max, 0]
-    opt_power_bound = res_array[row_exp_max, 1]
-    opt_exp_bound = res_array[row_exp_max, 2]
-
-    # opt_power_improvement = improvement_vec_1[row_exp_max]
-    # opt_exp_improvement = improvement_vec_2[row_exp_max]
-    opt_new_improvement = improvement_vec_news[row_exp_max]
+    aggregator = ThreeColAggregator(arrival_enum=arrival_enum, metric=metric)
+    aggregator.update(res_chunk=res_array)
 
-    mean_power_improvement = np.nanmean(improvement_vec_1)
-    mean_exp_improvement = np.nanmean(improvement_vec_2)
-    mean_new_improvement = np.nanmean(improvement_vec_news)
-
-    # number_improved = np.sum(np.greater(res_array[:, 1], res_array[:, 2]))
-    number_improved = np.sum(res_array[:, 1] > res_array[:, 2])
-
-    if valid_iterations < iterations * 0.25:
-        warn(f"way too many nan's: "
-             f"{iterations - valid_iterations} nan out of {iterations}!")
-
-        if valid_iterations < 100:
-            warn("result in useless")
-            sys.exit(1)
-
-    res_dict = {"Name": "Value", "arrival_distribution": arrival_enum.name}
-
-    res_dict.update({
-        "opt_standard_bound": opt_standard_bound,
-        "opt_power_bound": opt_power_bound,
-        "opt_exp_bound": opt_exp_bound,
-        # "opt_power_improvement": opt_power_improvement,
-        # "opt_exp_improvement": opt_exp_improvement,
-        "opt_new_improvement": opt_new_improvement,
-        "mean_power_improvement": mean_power_improvement,
-        "mean_exp_improvement": mean_exp_improvement,
-        "mean_new_improvement": mean_new_improvement,
-        "number improved": number_improved,
-        "valid iterations": valid_iterations,
-        "share improved": number_improved / valid_iterations
-    })
-
-    return res_dict
+    return aggregator.results(valid_iterations=valid_iterations)
 
 
 def time_array_to_results(arrival_enum: ArrivalEnum, time_array,
                           number_servers: int, time_ratio: dict) -> dict:
     """Writes the array values into a dictionary"""
+    aggregator = TimeAggregator(
+        arrival_enum=arrival_enum, number_servers=number_servers)
+    aggregator.update(time_chunk=time_array)
 
-    standard_mean = np.nanmean(time_array[:, 0])
-    lyapunov_mean = np.nanmean(time_array[:, 1])
-
-    ratio = np.divide(time_array[:, 0], time_array[:, 1])
-    mean_ratio = np.nanmean(ratio)
-
-    time_ratio.update({number_servers: mean_ratio})
-
-    # time_standard = [-2], time_lyapunov = [-1]
-    res_dict = {
-        "Name": "Value",
-        "arrival_distribution": arrival_enum.name,
-        "number_servers": number_servers,
-        "standard_mean": standard_mean,
-        "Lyapunov_mean": lyapunov_mean,
-        "mean_fraction": mean_ratio
-    }
-
-    return res_dict
+    return aggregator.results(time_ratio=time_ratio)
@@ -4,11 +4,14 @@ from math import nan
 from timeit import default_timer as timer
 from typing import List
 
+import numpy as np
+
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from nc_operations.perform_enum import PerformEnum
 from optimization.initial_simplex import InitialSimplex
 from optimization.opt_method import OptMethod
 from optimization.optimize import Optimize
+from optimization.optimize_batch import OptimizeBatch
 from optimization.optimize_new import OptimizeNew
 from optimization.sim_anneal_param import SimAnnealParams
 from utils.setting_new import SettingNew
@@ -37,6 +40,45 @@ def compute_improvement(setting: SettingNew,
             show_warn=show_warn).grid_search(
                 bound_list=bound_array, delta=0.1)
 
+    elif opt_method == OptMethod.GRID_SEARCH_VEC:
+        theta_bounds = [(0.1, 4.0)]
+
+        standard_bound = Optimize(
+            setting=setting, print_x=print_x,
+            show_warn=show_warn).grid_search_vec(
+                bound_list=theta_bounds, delta=0.1)
+
+        bound_array = theta_bounds[:]
+        for _i in range(1, number_l + 1):
+            bound_array.append((0.9, 4.0))
+
+        new_bound = OptimizeNew(
+            setting_new=setting, print_x=print_x,
+            show_warn=show_warn).grid_search_vec(
+                bound_list=bound_array, delta=0.1)
+
+    elif opt_method == OptMethod.GRID_SEARCH_SEPARABLE:
+        theta_bounds = [(0.1, 4.0)]
+
+        standard_bound = Optimize(
+            setting=setting, print_x=print_x,
+            show_warn=show_warn).grid_search_vec(
+                bound_list=theta_bounds, delta=0.1)
+
+        bound_array = theta_bounds[:]
+        for _i in range(1, number_l + 1):
+            bound_array.append((0.9, 4.0))
+
+        new_bound = OptimizeNew(
+            setting_new=setting, print_x=print_x,
+            show_warn=show_warn).grid_search_separable(
+                bound_list=bound_array, delta=0.1)
+
+    elif opt_method == OptMethod.GRID_SEARCH_BATCH:
+        # a single setting is a population of size 1
+        return tuple(
+            compute_improvement_batch(setting=setting, number_l=number_l)[0])
+
     elif opt_method == OptMethod.PATTERN_SEARCH:
         theta_start = 0.5
 
@@ -155,6 +197,40 @@ def compute_improvement(setting: SettingNew,
     return standard_bound, new_bound
 
 
+def compute_improvement_batch(setting: SettingNew, number_l=1) -> np.ndarray:
+    """
+    Compare standard_bound with the new Lyapunov bound for a whole
+    population of settings, see OptimizeBatch. Same grids and Nelder-Mead
+    polish as GRID_SEARCH_VEC.
+
+    :param setting:  setting of batch arrivals and services
+    :param number_l: number of Lyapunov parameters
+    :return:         res_array of (standard_bound, new_bound) rows, one per
+                     member of the population
+    """
+    theta_bounds = [(0.1, 4.0)]
+
+    standard_bound, _ = OptimizeBatch(
+        setting=setting, new=False).grid_search(
+            bound_list=theta_bounds, delta=0.1)
+
+    bound_array = theta_bounds[:]
+    for _i in range(1, number_l + 1):
+        bound_array.append((0.9, 4.0))
+
+    new_bound, _ = OptimizeBatch(
+        setting=setting, new=True).grid_search(
+            bound_list=bound_array, delta=0.1)
+
+    # This part is there to overcome opt_method issues
+    new_bound = np.minimum(new_bound, standard_bound)
+
+    res_array = np.column_stack((standard_bound, new_bound))
+    res_array[np.any(res_array == 0, axis=1)] = nan
+
+    return res_array
+
+
 def compute_overhead(setting: SettingNew, opt_method: OptMethod,
                      number_l=1) -> tuple:
     """Compare computation times."""
@@ -177,6 +253,42 @@ def compute_overhead(setting: SettingNew, opt_method: OptMethod,
         stop = timer()
         time_lyapunov = stop - start
 
+    elif opt_method == OptMethod.GRID_SEARCH_VEC:
+        bound_array = [(0.1, 4.0)]
+
+        start = timer()
+        Optimize(setting=setting).grid_search_vec(
+            bound_list=bound_array, delta=0.1)
+        stop = timer()
+        time_standard = stop - start
+
+        for _ in range(1, number_l + 1):
+            bound_array.append((0.9, 4.0))
+
+        start = timer()
+        OptimizeNew(setting_new=setting).grid_search_vec(
+            bound_list=bound_array, delta=0.1)
+        stop = timer()
+        time_lyapunov = stop - start
+
+    elif opt_method == OptMethod.GRID_SEARCH_SEPARABLE:
+        bound_array = [(0.1, 4.0)]
+
+        start = timer()
+        Optimize(setting=setting).grid_search_vec(
+            bound_list=bound_array, delta=0.1)
+        stop = timer()
+        time_standard = stop - start
+
+        for _ in range(1, number_l + 1):
+            bound_array.append((0.9, 4.0))
+
+        start = timer()
+        OptimizeNew(setting_new=setting).grid_search_separable(
+            bound_list=bound_array, delta=0.1)
+        stop = timer()
+        time_lyapunov = stop - start
+
     elif opt_method == OptMethod.PATTERN_SEARCH:
         start_list = [0.5]
 
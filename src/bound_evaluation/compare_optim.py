@@ -35,6 +35,38 @@ def compare_optimization(setting: SettingNew,
                 setting_new=setting, new=new, print_x=print_x).grid_search(
                     bound_list=bound_list, delta=0.1)
 
+        elif opt == OptMethod.GRID_SEARCH_VEC:
+            theta_bounds = [(0.1, 4.0)]
+
+            bound_list = theta_bounds[:]
+            for _i in range(1, number_l + 1):
+                bound_list.append((0.9, 4.0))
+
+            bound = OptimizeNew(
+                setting_new=setting, new=new,
+                print_x=print_x).grid_search_vec(
+                    bound_list=bound_list, delta=0.1)
+
+        elif opt == OptMethod.GRID_SEARCH_ADAPTIVE:
+            theta_bounds = [(0.1, 4.0)]
+
+            bound_list = theta_bounds[:]
+            for _i in range(1, number_l + 1):
+                bound_list.append((0.9, 4.0))
+
+            bound = OptimizeNew(
+                setting_new=setting, new=new,
+                print_x=print_x).grid_search_adaptive(
+                    bound_list=bound_list, delta=0.1)
+
+        elif opt == OptMethod.BRENT:
+            # 1-D solver, i.e., the standard bound in theta only
+            theta_bounds = [(0.1, 4.0)]
+
+            bound = OptimizeNew(
+                setting_new=setting, new=False,
+                print_x=print_x).brent(bound_list=theta_bounds)
+
         elif opt == OptMethod.PATTERN_SEARCH:
             theta_start = 0.5
 
@@ -44,6 +76,16 @@ def compare_optimization(setting: SettingNew,
                 setting_new=setting, new=new, print_x=print_x).pattern_search(
                     start_list=start_list, delta=3.0, delta_min=0.01)
 
+        elif opt == OptMethod.PATTERN_SEARCH_VEC:
+            theta_start = 0.5
+
+            start_list = [theta_start] + [1.0] * number_l
+
+            bound = OptimizeNew(
+                setting_new=setting, new=new,
+                print_x=print_x).pattern_search_vec(
+                    start_list=start_list, delta=3.0, delta_min=0.01)
+
         elif opt == OptMethod.NELDER_MEAD:
             theta_start = 0.5
 
@@ -76,6 +118,18 @@ def compare_optimization(setting: SettingNew,
                     start_list=start_list,
                     sim_anneal_params=simul_anneal_param)
 
+        elif opt == OptMethod.SIMULATED_ANNEALING_VEC:
+            simul_anneal_param = SimAnnealParams()
+            theta_start = 0.5
+
+            start_list = [theta_start] + [1.0] * number_l
+
+            bound = OptimizeNew(
+                setting_new=setting, new=new,
+                print_x=print_x).sim_annealing_vec(
+                    start_list=start_list,
+                    sim_anneal_params=simul_anneal_param)
+
         elif opt == OptMethod.DIFFERENTIAL_EVOLUTION:
             theta_bounds = [(0.1, 4.0)]
 
@@ -96,6 +150,17 @@ def compare_optimization(setting: SettingNew,
                 setting_new=setting, new=new,
                 print_x=print_x).bfgs(start_list=start_list)
 
+        elif opt == OptMethod.NEWTON_CG:
+            theta_start = 0.5
+
+            start_list = [theta_start] + [1.0] * number_l
+
+            # the Newton steps need the curvature of the log-bound, the bound
+            # itself is too flat far from the optimum
+            bound = OptimizeNew(
+                setting_new=setting, new=new, print_x=print_x,
+                log_domain=True).newton_cg(start_list=start_list)
+
         elif opt == OptMethod.GS_OLD:
             theta_bounds = [(0.1, 4.0)]
 
@@ -153,7 +218,8 @@ if __name__ == '__main__':
     SETTING1 = SingleServerPerform(
         arr=EXP_ARRIVAL, const_rate=CONST_RATE, perform_param=OUTPUT_TIME)
     OPT_METHODS = [
-        OptMethod.GRID_SEARCH, OptMethod.GS_OLD, OptMethod.PATTERN_SEARCH,
+        OptMethod.GRID_SEARCH, OptMethod.GRID_SEARCH_VEC, OptMethod.GS_OLD,
+        OptMethod.BRENT, OptMethod.PATTERN_SEARCH,
         OptMethod.BASIN_HOPPING, OptMethod.SIMULATED_ANNEALING,
         OptMethod.DIFFERENTIAL_EVOLUTION
     ]
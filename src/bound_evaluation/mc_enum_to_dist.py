@@ -1,24 +1,135 @@
 """Takes the Monte Carlo Enum and returns the random vector"""
 
+from warnings import catch_warnings, simplefilter
+
 import numpy as np
+import scipy.stats
+from scipy.stats import qmc
 
 from bound_evaluation.mc_enum import MCEnum
 from bound_evaluation.monte_carlo_dist import MonteCarloDist
+from bound_evaluation.sample_enum import SampleEnum
+
+
+def unit_sample(sample_enum: SampleEnum,
+                size: (int, int),
+                rng: np.random.Generator = None,
+                start=0,
+                qmc_rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Points in the unit cube, one dimension per column.
+
+    :param sample_enum: sampling method
+    :param size:        [rows, columns]
+    :param rng:         random generator, np.random's global state if None
+    :param start:       index of the first point in the Sobol or Halton
+                        sequence, e.g. the first row of a shard
+    :param qmc_rng:     scrambles the Sobol or Halton sequence, has to be
+                        the same for all shards of a run; rng if None
+    :return:            array of the given size with entries in [0, 1)
+    """
+    rows, columns = size
+
+    if sample_enum == SampleEnum.PSEUDO:
+        if rng is None:
+            rng = np.random
+        return rng.uniform(size=size)
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    if sample_enum == SampleEnum.LATIN_HYPERCUBE:
+        # one point per stratum in every dimension
+        return qmc.LatinHypercube(d=columns, seed=rng).random(rows)
+
+    if qmc_rng is None:
+        qmc_rng = rng
+
+    if sample_enum == SampleEnum.SOBOL:
+        engine = qmc.Sobol(d=columns, scramble=True, seed=qmc_rng)
+    elif sample_enum == SampleEnum.HALTON:
+        engine = qmc.Halton(d=columns, scramble=True, seed=qmc_rng)
+    else:
+        raise NameError(f"Sampling method {sample_enum} is infeasible")
+
+    if start > 0:
+        # Sobol's fast_forward fails for 0
+        engine.fast_forward(start)
+
+    with catch_warnings():
+        # shards are sub-sequences, their sizes are rarely powers of 2
+        simplefilter("ignore", UserWarning)
+        return engine.random(rows)
+
 
+def mc_enum_to_dist(mc_dist: MonteCarloDist,
+                    size: (int, int),
+                    rng: np.random.Generator = None,
+                    start=0,
+                    qmc_rng: np.random.Generator = None) -> np.ndarray:
+    """
+    :param mc_dist: distribution, its parameters and the sampling method
+    :param size:    [rows, columns]
+    :param rng:     random generator, np.random's global state if None
+    :param start:   see unit_sample
+    :param qmc_rng: see unit_sample
+    :return:        random parameter array
+    """
+    if mc_dist.sample_enum != SampleEnum.PSEUDO:
+        # map the unit points through the inverse cdf
+        unit_array = unit_sample(
+            sample_enum=mc_dist.sample_enum,
+            size=size,
+            rng=rng,
+            start=start,
+            qmc_rng=qmc_rng)
+        return mc_enum_to_ppf(mc_dist=mc_dist, unit_array=unit_array)
+
+    if rng is None:
+        rng = np.random
 
-def mc_enum_to_dist(mc_dist: MonteCarloDist, size: (int, int)) -> np.ndarray:
     if mc_dist.mc_enum == MCEnum.UNIFORM:
-        return np.random.uniform(low=0, high=mc_dist.param_list[0], size=size)
+        return rng.uniform(low=0, high=mc_dist.param_list[0], size=size)
     elif mc_dist.mc_enum == MCEnum.EXPONENTIAL:
-        return np.random.exponential(scale=1 / mc_dist.param_list[0], size=size)
+        return rng.exponential(scale=1 / mc_dist.param_list[0], size=size)
     # watch out: scale is the expectation 1 / lambda
     elif mc_dist.mc_enum == MCEnum.PARETO:
-        return np.random.pareto(a=mc_dist.param_list[0], size=size)
+        return rng.pareto(a=mc_dist.param_list[0], size=size)
     elif mc_dist.mc_enum == MCEnum.LOG_NORMAL:
-        return np.random.lognormal(
+        return rng.lognormal(
             mean=mc_dist.param_list[0], sigma=mc_dist.param_list[1], size=size)
     elif mc_dist.mc_enum == MCEnum.CHI_SQUARED:
-        return np.random.chisquare(df=mc_dist.param_list[0], size=size)
+        return rng.chisquare(df=mc_dist.param_list[0], size=size)
+    else:
+        raise NameError("Distribution parameter {0} is infeasible".format(
+            mc_dist.mc_enum))
+
+
+def mc_enum_to_ppf(mc_dist: MonteCarloDist,
+                   unit_array: np.ndarray) -> np.ndarray:
+    """
+    Inverse cdf of the same distributions as drawn by mc_enum_to_dist.
+
+    :param mc_dist:    distribution and its parameters
+    :param unit_array: points in [0, 1)
+    :return:           parameter array
+    """
+    if mc_dist.mc_enum == MCEnum.UNIFORM:
+        return scipy.stats.uniform.ppf(
+            unit_array, loc=0, scale=mc_dist.param_list[0])
+    elif mc_dist.mc_enum == MCEnum.EXPONENTIAL:
+        return scipy.stats.expon.ppf(
+            unit_array, scale=1 / mc_dist.param_list[0])
+    elif mc_dist.mc_enum == MCEnum.PARETO:
+        # np.random.pareto is the Lomax distribution
+        return scipy.stats.lomax.ppf(unit_array, c=mc_dist.param_list[0])
+    elif mc_dist.mc_enum == MCEnum.LOG_NORMAL:
+        return scipy.stats.lognorm.ppf(
+            unit_array,
+            s=mc_dist.param_list[1],
+            scale=np.exp(mc_dist.param_list[0]))
+    elif mc_dist.mc_enum == MCEnum.CHI_SQUARED:
+        return scipy.stats.chi2.ppf(unit_array, df=mc_dist.param_list[0])
     else:
         raise NameError("Distribution parameter {0} is infeasible".format(
             mc_dist.mc_enum))
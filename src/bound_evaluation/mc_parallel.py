@@ -0,0 +1,338 @@
+"""Parallel Monte Carlo driver: shards the parameter rows across a process
+pool with one deterministic random stream per shard"""
+
+from functools import partial
+from math import ceil, nan
+from multiprocessing import Pool
+from typing import Callable, Iterator, List, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from bound_evaluation.mc_store import MCStore
+
+
+def _qmc_rng(seed_seq: np.random.SeedSequence,
+             number_draws: int) -> np.random.Generator:
+    """
+    Generator that scrambles the quasi-random sequences. It only depends on
+    the root entropy, so the sequences are scrambled alike in all shards
+    and continue where the previous shard stopped. Each resampling draw of
+    the rejected rows continues its own scrambled sequence.
+
+    :param seed_seq:     seed sequence of the shard
+    :param number_draws: 0 for the first draw, k for the k-th resampling
+    :return:             generator for the qmc_rng of draw_fun
+    """
+    if number_draws == 0:
+        return np.random.default_rng(np.random.SeedSequence(seed_seq.entropy))
+
+    return np.random.default_rng(
+        np.random.SeedSequence([seed_seq.entropy, number_draws]))
+
+
+def _run_shard(shard: Tuple[int, int, np.random.SeedSequence],
+               row_fun: Callable[[np.ndarray], tuple],
+               draw_fun: Callable[..., np.ndarray],
+               number_columns: int,
+               number_results: int,
+               filter_fun: Callable[[np.ndarray], np.ndarray] = None,
+               resample=False,
+               max_draws=100,
+               vectorized=False) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Draws and evaluates the rows of one shard.
+
+    :param shard:          (first row, number of rows, seed sequence)
+    :param row_fun:        maps one parameter row to its results
+    :param draw_fun:       draws the parameter rows, called with
+                           size=(rows, columns), rng, start and qmc_rng
+    :param number_columns: number of parameters per row
+    :param number_results: number of results per row
+    :param filter_fun:     maps the parameter rows to a boolean array,
+                           rejected rows are not evaluated and their
+                           results are nan
+    :param resample:       replace rejected rows by new draws
+    :param max_draws:      cap on the number of draws when resampling
+    :param vectorized:     row_fun maps all accepted rows at once to an
+                           array of result rows
+    :return:               first row, parameter rows and result rows of
+                           the shard
+    """
+    start, number_rows, seed_seq = shard
+    rng_seq, legacy_seq = seed_seq.spawn(2)
+
+    # randomness inside row_fun, e.g. optimizers, uses the legacy global
+    # state, so it is reseeded per shard as well
+    np.random.seed(legacy_seq.generate_state(1))
+
+    rng = np.random.default_rng(rng_seq)
+    param_chunk = draw_fun(
+        size=(number_rows, number_columns),
+        rng=rng,
+        start=start,
+        qmc_rng=_qmc_rng(seed_seq=seed_seq, number_draws=0))
+
+    if filter_fun is None:
+        accepted = np.full(number_rows, True)
+    else:
+        accepted = filter_fun(param_chunk)
+        number_draws = 1
+
+        while resample and not np.all(accepted) and number_draws < max_draws:
+            # fresh rows from the shard's generator, the quasi-random
+            # sequences are scrambled anew for every draw
+            redraw = draw_fun(
+                size=(number_rows, number_columns),
+                rng=rng,
+                start=start,
+                qmc_rng=_qmc_rng(seed_seq=seed_seq, number_draws=number_draws))
+            candidates = redraw[filter_fun(redraw)]
+            rejected = np.flatnonzero(~accepted)[:candidates.shape[0]]
+
+            param_chunk[rejected] = candidates[:rejected.size]
+            accepted[rejected] = True
+            number_draws += 1
+
+    res_chunk = np.full([number_rows, number_results], nan)
+
+    if vectorized:
+        if np.any(accepted):
+            res_chunk[accepted] = row_fun(param_chunk[accepted])
+    else:
+        for i in np.flatnonzero(accepted):
+            res_chunk[i, ] = row_fun(param_chunk[i])
+
+    return start, param_chunk, res_chunk
+
+
+def shard_rows(
+        total_iterations: int,
+        chunk_size: int,
+        seed=None,
+        first_iteration=0) -> List[Tuple[int, int, np.random.SeedSequence]]:
+    """
+    Splits the rows into shards with independent seed sequences. The shards
+    only depend on the seed and the chunk size, not on the number of
+    processes or the total number of rows.
+
+    :param total_iterations: number of rows
+    :param chunk_size:       number of rows per shard
+    :param seed:             entropy of the root seed sequence
+    :param first_iteration:  shards before are skipped, multiple of the
+                             chunk size
+    :return:                 list of (first row, number of rows, seed seq)
+    """
+    if first_iteration % chunk_size != 0:
+        raise ValueError(f"first iteration {first_iteration} must be a "
+                         f"multiple of the chunk size {chunk_size}")
+
+    number_shards = ceil(total_iterations / chunk_size)
+    seed_seqs = np.random.SeedSequence(seed).spawn(number_shards)
+
+    return [(k * chunk_size,
+             min(chunk_size, total_iterations - k * chunk_size), seed_seqs[k])
+            for k in range(first_iteration // chunk_size, number_shards)]
+
+
+def mc_shards(row_fun: Callable[[np.ndarray], tuple],
+              draw_fun: Callable[..., np.ndarray],
+              total_iterations: int,
+              number_columns: int,
+              number_results: int,
+              seed=None,
+              chunk_size=100,
+              processes=None,
+              checkpoint_dir=None,
+              config=None,
+              first_iteration=0,
+              filter_fun=None,
+              resample=False,
+              vectorized=False
+              ) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Monte Carlo study on a process pool that yields the shards as they are
+    finished, i.e. not necessarily in row order.
+
+    :param row_fun:          maps one parameter row to its results, has to
+                             be picklable, e.g. a module level function or a
+                             partial of it
+    :param draw_fun:         draws the parameter rows, called with
+                             size=(rows, columns), rng, start and qmc_rng as
+                             mc_enum_to_dist; picklable as well
+    :param total_iterations: number of rows
+    :param number_columns:   number of parameters per row
+    :param number_results:   number of results per row
+    :param seed:             seed for reproducible runs
+    :param chunk_size:       number of rows per shard
+    :param processes:        size of the pool, all cores by default,
+                             1 runs in this process
+    :param checkpoint_dir:   if given, finished shards are written to an
+                             MCStore there and a restart with the same seed
+                             and config only computes the missing ones
+    :param config:           dict that identifies the study in the store
+    :param first_iteration:  rows before are skipped, multiple of the chunk
+                             size
+    :param filter_fun:       maps the parameter rows to a boolean array,
+                             rejected rows are not evaluated and their
+                             results are nan; picklable as well
+    :param resample:         replace rejected rows by new draws until the
+                             shard is full
+    :param vectorized:       row_fun maps all accepted rows of a shard at
+                             once to an array of result rows
+    :return:                 (first row, parameter rows, result rows) of
+                             every shard
+    """
+    shard_fun = partial(
+        _run_shard,
+        row_fun=row_fun,
+        draw_fun=draw_fun,
+        number_columns=number_columns,
+        number_results=number_results,
+        filter_fun=filter_fun,
+        resample=resample,
+        vectorized=vectorized)
+    shards = shard_rows(
+        total_iterations=total_iterations,
+        chunk_size=chunk_size,
+        seed=seed,
+        first_iteration=first_iteration)
+
+    store = None
+    if checkpoint_dir is not None:
+        store = MCStore(
+            directory=checkpoint_dir,
+            config={} if config is None else config,
+            seed=seed,
+            chunk_size=chunk_size)
+        finished = store.completed()
+
+        pending = []
+        for shard in shards:
+            if finished.get(shard[0]) == shard[1]:
+                yield (shard[0], ) + store.load_shard(shard[0])
+            else:
+                pending.append(shard)
+        shards = pending
+
+    def finish(results) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        # shards are written as soon as they are finished
+        for start, param_chunk, res_chunk in tqdm(results,
+                                                  total=len(shards)):
+            if store is not None:
+                store.append(start, param_chunk, res_chunk)
+
+            yield start, param_chunk, res_chunk
+
+    if processes == 1:
+        yield from finish(map(shard_fun, shards))
+    else:
+        with Pool(processes=processes) as pool:
+            yield from finish(pool.imap_unordered(shard_fun, shards))
+
+
+def mc_parallel(row_fun: Callable[[np.ndarray], tuple],
+                draw_fun: Callable[..., np.ndarray],
+                total_iterations: int,
+                number_columns: int,
+                number_results: int,
+                seed=None,
+                chunk_size=100,
+                processes=None,
+                checkpoint_dir=None,
+                config=None,
+                filter_fun=None,
+                resample=False,
+                vectorized=False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Monte Carlo study on a process pool, see mc_shards for the parameters.
+
+    :return: param_array and res_array, one row per iteration
+    """
+    chunks = {
+        start: (param_chunk, res_chunk)
+        for start, param_chunk, res_chunk in mc_shards(
+            row_fun=row_fun,
+            draw_fun=draw_fun,
+            total_iterations=total_iterations,
+            number_columns=number_columns,
+            number_results=number_results,
+            seed=seed,
+            chunk_size=chunk_size,
+            processes=processes,
+            checkpoint_dir=checkpoint_dir,
+            config=config,
+            filter_fun=filter_fun,
+            resample=resample,
+            vectorized=vectorized)
+    }
+
+    param_array = np.concatenate(
+        [chunks[start][0] for start in sorted(chunks)])
+    res_array = np.concatenate([chunks[start][1] for start in sorted(chunks)])
+
+    return param_array, res_array
+
+
+def mc_adaptive(update_fun: Callable[[int, np.ndarray, np.ndarray], None],
+                stop_fun: Callable[[], bool],
+                row_fun: Callable[[np.ndarray], tuple],
+                draw_fun: Callable[..., np.ndarray],
+                max_iterations: int,
+                number_columns: int,
+                number_results: int,
+                batch_size=1000,
+                seed=None,
+                chunk_size=100,
+                processes=None,
+                checkpoint_dir=None,
+                config=None,
+                filter_fun=None,
+                resample=False,
+                vectorized=False) -> int:
+    """
+    Monte Carlo study that runs batches of rows until stop_fun is True or
+    max_iterations is reached. The rows are the first ones of the
+    non-adaptive study with the same seed and chunk size.
+
+    :param update_fun:     consumes (first row, parameter rows, result rows)
+                           of every finished shard, e.g. an aggregator
+    :param stop_fun:       is checked after every batch
+    :param max_iterations: cap on the number of rows
+    :param batch_size:     number of rows per batch, rounded up to a
+                           multiple of the chunk size
+    :return:               number of rows that were evaluated
+    """
+    if seed is None:
+        # all batches have to descend from the same root
+        seed = np.random.SeedSequence().entropy
+
+    batch_size = ceil(batch_size / chunk_size) * chunk_size
+    iterations = 0
+
+    while iterations < max_iterations:
+        next_iterations = min(iterations + batch_size, max_iterations)
+
+        for start, param_chunk, res_chunk in mc_shards(
+                row_fun=row_fun,
+                draw_fun=draw_fun,
+                total_iterations=next_iterations,
+                number_columns=number_columns,
+                number_results=number_results,
+                seed=seed,
+                chunk_size=chunk_size,
+                processes=processes,
+                checkpoint_dir=checkpoint_dir,
+                config=config,
+                first_iteration=iterations,
+                filter_fun=filter_fun,
+                resample=resample,
+                vectorized=vectorized):
+            update_fun(start, param_chunk, res_chunk)
+
+        iterations = next_iterations
+
+        if stop_fun():
+            break
+
+    return iterations
@@ -0,0 +1,111 @@
+"""Append-only on-disk store of finished Monte Carlo shards to checkpoint
+and resume long studies"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class MCStore(object):
+    """Directory of finished shards of one Monte Carlo study. Every shard is
+    written once to its own file, so an interrupted run keeps all shards
+    that were completed before."""
+
+    def __init__(self, directory: str, config: dict, seed: int,
+                 chunk_size: int) -> None:
+        """
+
+        :param directory:  root directory of all stores
+        :param config:     parameters that define the study, e.g. arrival,
+                           metric, optimization and distribution
+        :param seed:       seed of the study, has to be fixed for a resume
+        :param chunk_size: number of rows per shard
+        """
+        if seed is None:
+            raise ValueError("checkpointing needs a fixed seed")
+
+        self.config = dict(config, seed=seed, chunk_size=chunk_size)
+        # the same study always maps to the same sub directory
+        key = hashlib.sha1(
+            json.dumps(self.config, sort_keys=True,
+                       default=str).encode()).hexdigest()[:16]
+        self.path = os.path.join(directory, key)
+
+        os.makedirs(self.path, exist_ok=True)
+        config_file = os.path.join(self.path, "config.json")
+        if not os.path.exists(config_file):
+            with open(config_file, 'w') as json_file:
+                json.dump(self.config, json_file, indent=2, default=str)
+
+    def _shard_file(self, start: int) -> str:
+        return os.path.join(self.path, f"shard_{start:012d}.npz")
+
+    def completed(self) -> Dict[int, int]:
+        """
+        :return: number of rows of every finished shard, keyed by its first
+                 row
+        """
+        finished = {}
+
+        for file_name in os.listdir(self.path):
+            if file_name.startswith("shard_") and file_name.endswith(".npz"):
+                with np.load(os.path.join(self.path, file_name)) as shard:
+                    finished[int(file_name[6:-4])] = shard["res"].shape[0]
+
+        return finished
+
+    def append(self, start: int, param_chunk: np.ndarray,
+               res_chunk: np.ndarray) -> None:
+        """
+        Writes one finished shard. The file is renamed into place, so a
+        crash while writing never leaves a broken shard behind.
+
+        :param start:       first row of the shard
+        :param param_chunk: parameter rows of the shard
+        :param res_chunk:   result rows of the shard
+        """
+        file_name = self._shard_file(start)
+        tmp_name = file_name + ".tmp"
+
+        with open(tmp_name, 'wb') as tmp_file:
+            np.savez(tmp_file, param=param_chunk, res=res_chunk)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+
+        os.replace(tmp_name, file_name)
+
+    def load_shard(self, start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param start: first row of a finished shard
+        :return:      its parameter rows and result rows
+        """
+        with np.load(self._shard_file(start)) as shard:
+            return shard["param"], shard["res"]
+
+    def load(self, total_iterations=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Also works while the study is still running, e.g. to aggregate the
+        partial results.
+
+        :param total_iterations: only rows before are loaded, all if None
+        :return:                 param_array and res_array of the finished
+                                 shards, ordered by row
+        """
+        param_chunks = []
+        res_chunks = []
+
+        for start in sorted(self.completed()):
+            if total_iterations is not None and start >= total_iterations:
+                continue
+
+            param_chunk, res_chunk = self.load_shard(start)
+            param_chunks.append(param_chunk)
+            res_chunks.append(res_chunk)
+
+        if not res_chunks:
+            return np.empty([0, 0]), np.empty([0, 0])
+
+        return np.concatenate(param_chunks), np.concatenate(res_chunks)
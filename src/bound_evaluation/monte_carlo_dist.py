@@ -4,17 +4,25 @@ in one class"""
 from typing import List
 
 from bound_evaluation.mc_enum import MCEnum
+from bound_evaluation.sample_enum import SampleEnum
 
 
 class MonteCarloDist(object):
     """Monte Carlo distribution class"""
 
-    def __init__(self, mc_enum: MCEnum, param_list: List[float]) -> None:
+    def __init__(self,
+                 mc_enum: MCEnum,
+                 param_list: List[float],
+                 sample_enum: SampleEnum = SampleEnum.PSEUDO) -> None:
         self.mc_enum = mc_enum
         self.param_list = param_list
+        self.sample_enum = sample_enum
 
     def to_name(self) -> str:
-        return self.mc_enum.name
+        if self.sample_enum == SampleEnum.PSEUDO:
+            return self.mc_enum.name
+
+        return f"{self.mc_enum.name}_{self.sample_enum.name}"
 
     def param_to_string(self) -> str:
         res = ""
@@ -0,0 +1,10 @@
+"""Enum of Sampling Methods for Monte Carlo Parameter Evaluation"""
+
+from enum import Enum
+
+
+class SampleEnum(Enum):
+    PSEUDO = "Pseudo-random"
+    SOBOL = "Sobol"
+    HALTON = "Halton"
+    LATIN_HYPERCUBE = "Latin-Hypercube"
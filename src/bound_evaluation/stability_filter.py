@@ -0,0 +1,100 @@
+"""Vectorized stability screen of Monte Carlo parameter rows. Unstable rows
+can never produce a finite bound, so they are not optimized."""
+
+import numpy as np
+
+from nc_arrivals.arrival_enum import ArrivalEnum
+
+
+def mean_rate_array(param_array: np.ndarray,
+                    arrival_enum: ArrivalEnum,
+                    number_servers: int,
+                    n=1) -> np.ndarray:
+    """
+    Long term arrival rates, i.e. rho(theta) for theta -> 0.
+
+    The columns are ordered as in the Monte Carlo studies: one block of
+    number_servers columns per arrival parameter, followed by one block of
+    service rates. For MD1 and MM1, the last block is 1 / mu and the
+    service rate is 1.
+
+    :param param_array:    parameter rows
+    :param arrival_enum:   arrival process
+    :param number_servers: number of flows and servers
+    :param n:              number of aggregated flows per arrival
+    :return:               array of shape (rows, number_servers)
+    """
+    def block(k: int) -> np.ndarray:
+        return param_array[:, k * number_servers:(k + 1) * number_servers]
+
+    with np.errstate(all="ignore"):
+        if arrival_enum == ArrivalEnum.DM1:
+            return n / block(0)
+
+        elif (arrival_enum == ArrivalEnum.MD1
+              or arrival_enum == ArrivalEnum.MM1):
+            # lamb / mu
+            return n * block(0) * block(arrival_enum.number_parameters())
+
+        elif arrival_enum == ArrivalEnum.MMOO:
+            # burst * mu / (mu + lamb)
+            return n * block(2) * block(0) / (block(0) + block(1))
+
+        elif arrival_enum == ArrivalEnum.EBB:
+            return n * block(2)
+
+        elif (arrival_enum == ArrivalEnum.TBConst
+              or arrival_enum == ArrivalEnum.MassOne):
+            return n * block(1)
+
+        else:
+            raise NameError(
+                f"Arrival parameter {arrival_enum.name} is infeasible")
+
+
+def service_rate_array(param_array: np.ndarray, arrival_enum: ArrivalEnum,
+                       number_servers: int) -> np.ndarray:
+    """
+    :param param_array:    parameter rows, see mean_rate_array
+    :param arrival_enum:   arrival process
+    :param number_servers: number of flows and servers
+    :return:               array of shape (rows, number_servers)
+    """
+    if arrival_enum == ArrivalEnum.MD1 or arrival_enum == ArrivalEnum.MM1:
+        return np.ones((param_array.shape[0], number_servers))
+
+    first = arrival_enum.number_parameters() * number_servers
+
+    return param_array[:, first:first + number_servers]
+
+
+def stable_rows(param_array: np.ndarray,
+                arrival_enum: ArrivalEnum,
+                number_servers: int,
+                n=1) -> np.ndarray:
+    """
+    Stability of the fat cross: every cross flow j >= 1 is stable at its
+    own server and all flows together are stable at server 0. For one
+    server, this is the single server condition.
+
+    :param param_array:    parameter rows, see mean_rate_array
+    :param arrival_enum:   arrival process
+    :param number_servers: number of flows and servers
+    :param n:              number of aggregated flows per arrival
+    :return:               boolean array, True for the stable rows
+    """
+    mean_rates = mean_rate_array(
+        param_array=param_array,
+        arrival_enum=arrival_enum,
+        number_servers=number_servers,
+        n=n)
+    service_rates = service_rate_array(
+        param_array=param_array,
+        arrival_enum=arrival_enum,
+        number_servers=number_servers)
+
+    # nan, e.g. from a zero parameter, compares to False
+    cross_stable = np.all(mean_rates[:, 1:] < service_rates[:, 1:], axis=1)
+    total_stable = np.sum(mean_rates, axis=1) < service_rates[:, 0]
+
+    return cross_stable & total_stable
@@ -1,10 +1,14 @@
 """SFA for canonical tree"""
 
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival_distribution import ArrivalDistribution
-from nc_operations.evaluate_single_hop import evaluate_single_hop
+from nc_operations.evaluate_single_hop import (evaluate_single_hop,
+                                               evaluate_single_hop_array)
 from nc_operations.operations import Convolve, Leftover
+from nc_operations.theta_domain import single_hop_domain
 from nc_service.constant_rate_server import ConstantRate
 from nc_service.service import Service
 from utils.perform_parameter import PerformParameter
@@ -27,6 +31,7 @@ class TandemSFA(Setting):
         self.ser_list = ser_list
         self.perform_param = perform_param
         self.number_servers = len(ser_list)
+        self._s_net: Service = None
 
     def bound(self, param_list: List[float]) -> float:
         theta = param_list[0]
@@ -45,3 +50,62 @@ class TandemSFA(Setting):
             s_net=s_net,
             theta=theta,
             perform_param=self.perform_param)
+
+    def bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        return self._bound_array(param_array=param_array, log_domain=False)
+
+    def log_bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        return self._bound_array(param_array=param_array, log_domain=True)
+
+    def prepare(self) -> None:
+        leftover_service_list: List[Service] = [
+            Leftover(arr=self.arr_list[i + 1], ser=self.ser_list[i])
+            for i in range(self.number_servers)
+        ]
+
+        self._s_net = leftover_service_list[0]
+        for i in range(1, self.number_servers):
+            self._s_net = Convolve(self._s_net, leftover_service_list[i])
+
+    def evaluate(self, param_list: List[float]) -> float:
+        return self._evaluate(param_list=param_list, log_domain=False)
+
+    def log_evaluate(self, param_list: List[float]) -> float:
+        return self._evaluate(param_list=param_list, log_domain=True)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        if self._s_net is None:
+            self.prepare()
+
+        return single_hop_domain(foi=self.arr_list[0], s_net=self._s_net)
+
+    def _bound_array(self, param_array: np.ndarray,
+                     log_domain: bool) -> np.ndarray:
+        theta = param_array[0]
+
+        leftover_service_list: List[Service] = [
+            Leftover(arr=self.arr_list[i + 1], ser=self.ser_list[i])
+            for i in range(self.number_servers)
+        ]
+
+        s_net: Service = leftover_service_list[0]
+        for i in range(1, self.number_servers):
+            s_net = Convolve(s_net, leftover_service_list[i])
+
+        return evaluate_single_hop_array(
+            foi=self.arr_list[0],
+            s_net=s_net,
+            theta=theta,
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _evaluate(self, param_list: List[float], log_domain: bool) -> float:
+        if self._s_net is None:
+            self.prepare()
+
+        return evaluate_single_hop(
+            foi=self.arr_list[0],
+            s_net=self._s_net,
+            theta=param_list[0],
+            perform_param=self.perform_param,
+            log_domain=log_domain)
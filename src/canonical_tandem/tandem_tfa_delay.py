@@ -1,18 +1,27 @@
 """TFA hop-by-hop for canonical tree"""
 
-from typing import List
+from typing import List, Tuple
 
+import numpy as np
+
+from nc_arrivals.arrival import Arrival
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from nc_operations.operations import Deconvolve, Leftover
-from nc_operations.performance_bounds import delay
+from nc_operations.performance_bounds import delay, delay_array
+from nc_operations.theta_domain import intersect_domains, single_hop_domain
 from nc_service.constant_rate_server import ConstantRate
 from nc_service.service import Service
+from utils.eval_context import MemoizedNode
 from utils.setting import Setting
 
 
 class TandemTFADelay(Setting):
     """Canonical tandem with hop-by-hop analysis"""
 
+    # every hop evaluates the deconvolution chain of all previous hops, whose
+    # nodes are memoized in prepare
+    memoize = True
+
     def __init__(self, arr_list: List[ArrivalDistribution],
                  ser_list: List[ConstantRate], prob_d: float) -> None:
         # The first element in the arrival list in dedicated to the foi
@@ -25,6 +34,7 @@ class TandemTFADelay(Setting):
         self.ser_list = ser_list
         self.prob_d = prob_d
         self.number_servers = len(ser_list)
+        self._hop_list: List[Tuple[Arrival, Service]] = []
 
     def bound(self, param_list: List[float]) -> float:
         theta = param_list[0]
@@ -49,3 +59,63 @@ class TandemTFADelay(Setting):
                 arr=input_traffic, ser=leftover_service_list[i])
 
         return delay_val
+
+    def bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        theta = param_array[0]
+
+        leftover_service_list: List[Service] = [
+            Leftover(arr=self.arr_list[i + 1], ser=self.ser_list[i])
+            for i in range(self.number_servers)
+        ]
+
+        delay_val = np.zeros(np.shape(theta))
+
+        input_traffic = self.arr_list[0]
+
+        for i in range(self.number_servers):
+            delay_val = delay_val + delay_array(
+                arr=input_traffic,
+                ser=leftover_service_list[i],
+                theta=theta,
+                prob_d=self.prob_d)
+
+            input_traffic = Deconvolve(
+                arr=input_traffic, ser=leftover_service_list[i])
+
+        return delay_val
+
+    def prepare(self) -> None:
+        input_traffic: Arrival = self.arr_list[0]
+        self._hop_list = []
+
+        for i in range(self.number_servers):
+            leftover_service = MemoizedNode(
+                Leftover(arr=self.arr_list[i + 1], ser=self.ser_list[i]))
+            self._hop_list.append((input_traffic, leftover_service))
+
+            input_traffic = MemoizedNode(
+                Deconvolve(arr=input_traffic, ser=leftover_service))
+
+    def evaluate(self, param_list: List[float]) -> float:
+        if not self._hop_list:
+            self.prepare()
+
+        delay_val = 0.0
+
+        for input_traffic, leftover_service in self._hop_list:
+            delay_val += delay(
+                arr=input_traffic,
+                ser=leftover_service,
+                theta=param_list[0],
+                prob_d=self.prob_d)
+
+        return delay_val
+
+    def theta_domain(self) -> Tuple[float, float]:
+        if not self._hop_list:
+            self.prepare()
+
+        return intersect_domains([
+            single_hop_domain(foi=input_traffic, s_net=leftover_service)
+            for input_traffic, leftover_service in self._hop_list
+        ])
@@ -1,14 +1,19 @@
 """Fat tree topology."""
 
-from typing import List
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival import Arrival
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from nc_operations.deconvolve_power import DeconvolvePower
-from nc_operations.evaluate_single_hop import evaluate_single_hop
+from nc_operations.evaluate_single_hop import (evaluate_single_hop,
+                                               evaluate_single_hop_array)
 from nc_operations.operations import AggregateList, Deconvolve, Leftover
+from nc_operations.theta_domain import single_hop_domain
 from nc_service.constant_rate_server import ConstantRate
 from nc_service.service import Service
+from utils.helper_functions import group_identical_pairs, is_identical
 from utils.perform_parameter import PerformParameter
 from utils.setting_new import SettingNew
 
@@ -28,18 +33,35 @@ class FatCrossPerform(SettingNew):
         self.ser_list = ser_list
         self.perform_param = perform_param
         self.number_servers = len(ser_list)
+        # identical cross flows are evaluated once and scaled by their
+        # multiplicity
+        self.cross_groups = group_identical_pairs(arr_list[1:], ser_list[1:])
+        # group of each cross flow
+        self._group_index = [
+            next(i for i, (arr_g, ser_g, _n) in enumerate(self.cross_groups)
+                 if is_identical(arr_g, arr) and is_identical(ser_g, ser))
+            for arr, ser in zip(arr_list[1:], ser_list[1:])
+        ]
+        # index of the first flow of each group in arr_list
+        self._group_first = [
+            self._group_index.index(group) + 1
+            for group in range(len(self.cross_groups))
+        ]
+        self._s_net: Service = None
+        self._output_power_list: List[DeconvolvePower] = []
+        self._s_net_power: Service = None
+        self._flow_power_list: List[DeconvolvePower] = []
+        self._s_net_flow_power: Service = None
 
     def bound(self, param_list: List[float]) -> float:
         theta = param_list[0]
 
         output_list: List[Arrival] = [
-            Deconvolve(arr=self.arr_list[i], ser=self.ser_list[i])
-            for i in range(1, self.number_servers)
+            Deconvolve(arr=arr, ser=ser) for arr, ser, _n in self.cross_groups
         ]
-        # we use i + 1, since i = 0 is the foi
 
         aggregated_cross: Arrival = AggregateList(
-            arr_list=output_list, p_list=[])
+            arr_list=output_list, p_list=[], n_list=self._multiplicities())
         s_net: Service = Leftover(arr=aggregated_cross, ser=self.ser_list[0])
 
         return evaluate_single_hop(
@@ -48,29 +70,215 @@ class FatCrossPerform(SettingNew):
             theta=theta,
             perform_param=self.perform_param)
 
+    def bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        return self._bound_array(param_array=param_array, log_domain=False)
+
+    def log_bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        return self._bound_array(param_array=param_array, log_domain=True)
+
     def new_bound(self, param_l_list: List[float]) -> float:
-        # len(param_list) = theta (1) + output bounds (len(arr_list)-1)
-        if len(param_l_list) != len(self.arr_list):
-            raise NameError("Check number of parameters")
+        return self._new_bound(param_l_list=param_l_list, log_domain=False)
+
+    def new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        return self._new_bound_array(
+            param_l_array=param_l_array, log_domain=False)
 
+    def log_new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        return self._new_bound_array(
+            param_l_array=param_l_array, log_domain=True)
+
+    def prepare(self) -> None:
         output_list: List[Arrival] = [
-            DeconvolvePower(
-                arr=self.arr_list[i],
-                ser=self.ser_list[i],
-                l_power=param_l_list[i])
+            Deconvolve(arr=arr, ser=ser) for arr, ser, _n in self.cross_groups
+        ]
+        self._s_net = Leftover(
+            arr=AggregateList(
+                arr_list=output_list,
+                p_list=[],
+                n_list=self._multiplicities()),
+            ser=self.ser_list[0])
+
+        # the l's are set in each call of new_evaluate, one per group
+        self._output_power_list = [
+            DeconvolvePower(arr=arr, ser=ser)
+            for arr, ser, _n in self.cross_groups
+        ]
+        self._s_net_power = Leftover(
+            arr=AggregateList(
+                arr_list=self._output_power_list,
+                p_list=[],
+                n_list=self._multiplicities()),
+            ser=self.ser_list[0])
+
+        # one l per flow, for different l's within a group
+        self._flow_power_list = [
+            DeconvolvePower(arr=self.arr_list[i], ser=self.ser_list[i])
             for i in range(1, self.number_servers)
         ]
-        # we use i + 1, since i = 0 is the foi
+        self._s_net_flow_power = Leftover(
+            arr=AggregateList(arr_list=self._flow_power_list, p_list=[]),
+            ser=self.ser_list[0])
+
+    def evaluate(self, param_list: List[float]) -> float:
+        return self._evaluate(param_list=param_list, log_domain=False)
+
+    def log_evaluate(self, param_list: List[float]) -> float:
+        return self._evaluate(param_list=param_list, log_domain=True)
+
+    def new_evaluate(self, param_l_list: List[float]) -> float:
+        return self._new_evaluate(param_l_list=param_l_list, log_domain=False)
+
+    def log_new_evaluate(self, param_l_list: List[float]) -> float:
+        return self._new_evaluate(param_l_list=param_l_list, log_domain=True)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        if self._s_net is None:
+            self.prepare()
+
+        return single_hop_domain(foi=self.arr_list[0], s_net=self._s_net)
+
+    def _bound_array(self, param_array: np.ndarray,
+                     log_domain: bool) -> np.ndarray:
+        theta = param_array[0]
+
+        output_list: List[Arrival] = [
+            Deconvolve(arr=arr, ser=ser) for arr, ser, _n in self.cross_groups
+        ]
 
         aggregated_cross: Arrival = AggregateList(
-            arr_list=output_list, p_list=[])
+            arr_list=output_list, p_list=[], n_list=self._multiplicities())
+        s_net: Service = Leftover(arr=aggregated_cross, ser=self.ser_list[0])
+
+        return evaluate_single_hop_array(
+            foi=self.arr_list[0],
+            s_net=s_net,
+            theta=theta,
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _new_bound(self, param_l_list: List[float],
+                   log_domain: bool) -> float:
+        # len(param_list) = theta (1) + output bounds (len(arr_list)-1)
+        # or theta (1) + one shared l per group (len(cross_groups))
+        output_list, n_list = self._power_output_list(
+            param_l_list=param_l_list)
+
+        aggregated_cross: Arrival = AggregateList(
+            arr_list=output_list, p_list=[], n_list=n_list)
         s_net: Service = Leftover(arr=aggregated_cross, ser=self.ser_list[0])
 
         return evaluate_single_hop(
             foi=self.arr_list[0],
             s_net=s_net,
             theta=param_l_list[0],
-            perform_param=self.perform_param)
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _new_bound_array(self, param_l_array: np.ndarray,
+                         log_domain: bool) -> np.ndarray:
+        output_list, n_list = self._power_output_list(
+            param_l_list=param_l_array)
+
+        aggregated_cross: Arrival = AggregateList(
+            arr_list=output_list, p_list=[], n_list=n_list)
+        s_net: Service = Leftover(arr=aggregated_cross, ser=self.ser_list[0])
+
+        return evaluate_single_hop_array(
+            foi=self.arr_list[0],
+            s_net=s_net,
+            theta=param_l_array[0],
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _evaluate(self, param_list: List[float], log_domain: bool) -> float:
+        if self._s_net is None:
+            self.prepare()
+
+        return evaluate_single_hop(
+            foi=self.arr_list[0],
+            s_net=self._s_net,
+            theta=param_list[0],
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _new_evaluate(self, param_l_list: List[float],
+                      log_domain: bool) -> float:
+        if self._s_net_power is None:
+            self.prepare()
+
+        l_list = self._group_l_list(param_l_list=param_l_list)
+
+        if l_list is None:
+            output_list = self._flow_power_list
+            s_net = self._s_net_flow_power
+            l_list = param_l_list[1:]
+        else:
+            output_list = self._output_power_list
+            s_net = self._s_net_power
+
+        # every call sets all l's of the graph it evaluates, so the ones
+        # left from the previous call are never read
+        for output, l_power in zip(output_list, l_list):
+            output.set_l_power(l_power=l_power)
+
+        return evaluate_single_hop(
+            foi=self.arr_list[0],
+            s_net=s_net,
+            theta=param_l_list[0],
+            perform_param=self.perform_param,
+            log_domain=log_domain)
+
+    def _group_l_list(self, param_l_list: List[float]) -> Optional[list]:
+        """
+        :param param_l_list: theta and either one l per cross flow or one
+                             shared l per group of identical cross flows
+        :return:             one l per group, None if the l's of a group
+                             differ
+        """
+        if len(param_l_list) == 1 + len(self.cross_groups):
+            return list(param_l_list[1:])
+
+        if len(param_l_list) != len(self.arr_list):
+            raise NameError("Check number of parameters")
+
+        l_list = [param_l_list[i] for i in self._group_first]
+
+        for group, l_power in zip(self._group_index, param_l_list[1:]):
+            if l_power != l_list[group]:
+                return None
+
+        return l_list
+
+    def _multiplicities(self) -> List[int]:
+        return [n for _arr, _ser, n in self.cross_groups]
+
+    def _power_output_list(self, param_l_list) -> tuple:
+        """
+        :param param_l_list: theta and either one l per cross flow or one
+                             shared l per group of identical cross flows
+        :return:             DeconvolvePower outputs and their multiplicities
+        """
+        if len(param_l_list) == 1 + len(self.cross_groups):
+            output_list: List[Arrival] = [
+                DeconvolvePower(arr=arr, ser=ser, l_power=param_l_list[i])
+                for i, (arr, ser, _n) in enumerate(self.cross_groups, start=1)
+            ]
+
+            return output_list, self._multiplicities()
+
+        if len(param_l_list) != len(self.arr_list):
+            raise NameError("Check number of parameters")
+
+        output_list = [
+            DeconvolvePower(
+                arr=self.arr_list[i],
+                ser=self.ser_list[i],
+                l_power=param_l_list[i])
+            for i in range(1, self.number_servers)
+        ]
+        # we use i + 1, since i = 0 is the foi
+
+        return output_list, None
 
     def to_string(self) -> str:
         for arr in self.arr_list:
@@ -1,17 +1,19 @@
 """Compute average computation time for different parameters."""
 
 import csv
-from math import floor
+from functools import partial
 from typing import List
 
 import numpy as np
 from tqdm import tqdm  # Progressbar in for loop
 
-from bound_evaluation.array_to_results import time_array_to_results
+from bound_evaluation.array_to_results import TimeAggregator
 from bound_evaluation.compare_old_new import compute_overhead
 from bound_evaluation.mc_enum import MCEnum
 from bound_evaluation.mc_enum_to_dist import mc_enum_to_dist
+from bound_evaluation.mc_parallel import mc_shards
 from bound_evaluation.monte_carlo_dist import MonteCarloDist
+from bound_evaluation.stability_filter import stable_rows
 from fat_tree.fat_cross_perform import FatCrossPerform
 from nc_arrivals.arrival_enum import ArrivalEnum
 from nc_arrivals.markov_modulated import MMOOFluid
@@ -26,70 +28,95 @@ from utils.perform_parameter import PerformParameter
 ########################################################################
 
 
+def fat_cross_time_row(param_row: np.ndarray, arrival_enum: ArrivalEnum,
+                       num_serv: int, perform_param: PerformParameter,
+                       opt_method: OptMethod) -> tuple:
+    """Computation times for one row of Monte Carlo parameters."""
+    if arrival_enum == ArrivalEnum.DM1:
+        arrive_list = [DM1(lamb=param_row[j]) for j in range(num_serv)]
+    elif arrival_enum == ArrivalEnum.MMOO:
+        arrive_list = [
+            MMOOFluid(
+                mu=param_row[j],
+                lamb=param_row[num_serv + j],
+                burst=param_row[2 * num_serv + j]) for j in range(num_serv)
+        ]
+
+    else:
+        raise NameError("Arrival parameter {0} is infeasible".format(
+            arrival_enum.name))
+
+    service_list = [
+        ConstantRate(
+            rate=param_row[arrival_enum.number_parameters() * num_serv + j])
+        for j in range(num_serv)
+    ]
+
+    setting = FatCrossPerform(
+        arr_list=arrive_list,
+        ser_list=service_list,
+        perform_param=perform_param)
+
+    # time_standard, time_lyapunov = compute_overhead()
+    return compute_overhead(
+        setting=setting, opt_method=opt_method, number_l=num_serv - 1)
+
+
 def mc_time_fat_cross(arrival_enum: ArrivalEnum,
                       list_number_servers: List[int],
-                      perform_param: PerformParameter, opt_method: OptMethod,
-                      mc_dist: MonteCarloDist) -> dict:
-    """Chooses parameters by Monte Carlo type random choice."""
+                      perform_param: PerformParameter,
+                      opt_method: OptMethod,
+                      mc_dist: MonteCarloDist,
+                      seed=None,
+                      processes=1,
+                      checkpoint_dir=None,
+                      prefilter=True) -> dict:
+    """Chooses parameters by Monte Carlo type random choice. With a seed
+    and a checkpoint_dir, an interrupted run resumes from its finished
+    shards. Unstable rows are not timed if prefilter is True. The timings
+    run in this process by default, as workers on the other cores would
+    skew the wall-clock times; a pool of processes is opt-in."""
     total_iterations = 10**4
 
     time_ratio = {"Number_of_servers": "Ratio"}
 
     for num_serv in tqdm(list_number_servers):
-
         # 1 Parameter for service
-
-        size_array = [
-            total_iterations, (arrival_enum.number_parameters() + 1) * num_serv
-        ]
-        # [rows, columns]
-
-        param_array = mc_enum_to_dist(mc_dist=mc_dist, size=size_array)
-
-        time_array = np.empty([total_iterations, 2])
-
-        for i in range(total_iterations):
-            if arrival_enum == ArrivalEnum.DM1:
-                arrive_list = [
-                    DM1(lamb=param_array[i, j]) for j in range(num_serv)
-                ]
-            elif arrival_enum == ArrivalEnum.MMOO:
-                arrive_list = [
-                    MMOOFluid(
-                        mu=param_array[i, j],
-                        lamb=param_array[i, num_serv + j],
-                        burst=param_array[i, 2 * num_serv + j])
-                    for j in range(num_serv)
-                ]
-
-            else:
-                raise NameError("Arrival parameter {0} is infeasible".format(
-                    arrival_enum.name))
-
-            service_list = [
-                ConstantRate(rate=param_array[
-                    i, arrival_enum.number_parameters() * num_serv + j])
-                for j in range(num_serv)
-            ]
-
-            setting = FatCrossPerform(
-                arr_list=arrive_list,
-                ser_list=service_list,
-                perform_param=perform_param)
-
-            # time_standard, time_lyapunov = compute_overhead()
-            time_array[i, 0], time_array[i, 1] = compute_overhead(
-                setting=setting, opt_method=opt_method, number_l=num_serv - 1)
-
-            if i % floor(total_iterations / 10) == 0:
-                print("iteration {0} of {1}".format(i, total_iterations))
-
-        print(
-            time_array_to_results(
-                arrival_enum=arrival_enum,
-                time_array=time_array,
-                number_servers=num_serv,
-                time_ratio=time_ratio))
+        aggregator = TimeAggregator(
+            arrival_enum=arrival_enum, number_servers=num_serv)
+
+        for _start, _param_chunk, time_chunk in mc_shards(
+                row_fun=partial(
+                    fat_cross_time_row,
+                    arrival_enum=arrival_enum,
+                    num_serv=num_serv,
+                    perform_param=perform_param,
+                    opt_method=opt_method),
+                draw_fun=partial(mc_enum_to_dist, mc_dist=mc_dist),
+                total_iterations=total_iterations,
+                number_columns=(arrival_enum.number_parameters() + 1) *
+                num_serv,
+                number_results=2,
+                seed=seed,
+                processes=processes,
+                checkpoint_dir=checkpoint_dir,
+                filter_fun=partial(
+                    stable_rows,
+                    arrival_enum=arrival_enum,
+                    number_servers=num_serv) if prefilter else None,
+                config={
+                    "study": "fat_cross_time",
+                    "arrival": arrival_enum.name,
+                    "number_servers": num_serv,
+                    "perform_param": perform_param.to_name_value(),
+                    "opt_method": opt_method.name,
+                    "mc_dist": mc_dist.to_name(),
+                    "mc_param": mc_dist.param_to_string(),
+                    "prefilter": prefilter
+                }):
+            aggregator.update(time_chunk=time_chunk)
+
+        print(aggregator.results(time_ratio=time_ratio))
 
     with open(
         (f"time_{perform_param.to_name()}_{arrival_enum.name}_{opt_method.name}.csv"
@@ -5,12 +5,14 @@ from math import floor, nan
 import numpy as np
 
 from bound_evaluation.array_to_results import two_col_array_to_results
-from bound_evaluation.compare_old_new import compute_improvement
+from bound_evaluation.compare_old_new import (compute_improvement,
+                                              compute_improvement_batch)
 from fat_tree.fat_cross_perform import FatCrossPerform
 from nc_arrivals.arrival_enum import ArrivalEnum
+from nc_arrivals.batch_arrivals import DM1Batch
 from nc_arrivals.qt import DM1
 from nc_operations.perform_enum import PerformEnum
-from nc_service.constant_rate_server import ConstantRate
+from nc_service.constant_rate_server import ConstantRate, ConstantRateBatch
 from optimization.opt_method import OptMethod
 from utils.perform_parameter import PerformParameter
 
@@ -22,10 +24,20 @@ from utils.perform_parameter import PerformParameter
 def grid_param_simple_exp(delay: int, opt_method: OptMethod, metric: str,
                           lamb1_range, lamb2_range, rate1_range,
                           rate2_range) -> dict:
-    """Choose parameters along a grid."""
+    """Choose parameters along a grid. GRID_SEARCH_BATCH optimizes the
+    whole grid at once."""
     total_iterations = len(lamb1_range) * len(lamb2_range) * len(
         rate1_range) * len(rate2_range)
 
+    if opt_method == OptMethod.GRID_SEARCH_BATCH:
+        return _grid_param_simple_exp_batch(
+            delay=delay,
+            metric=metric,
+            lamb1_range=lamb1_range,
+            lamb2_range=lamb2_range,
+            rate1_range=rate1_range,
+            rate2_range=rate2_range)
+
     param_array = np.empty([total_iterations, 4])
     res_array = np.empty([total_iterations, 2])
 
@@ -70,7 +82,52 @@ def grid_param_simple_exp(delay: int, opt_method: OptMethod, metric: str,
         metric=metric,
         param_array=param_array,
         res_array=res_array,
-        number_servers=2)
+        number_servers=2,
+        valid_iterations=_number_valid(res_array))
+
+
+def _grid_param_simple_exp_batch(delay: int, metric: str, lamb1_range,
+                                 lamb2_range, rate1_range,
+                                 rate2_range) -> dict:
+    """Same rows as the loop in grid_param_simple_exp, one population."""
+    # rows in the order of the nested loops, lamb1 varies slowest
+    param_array = np.stack(
+        np.meshgrid(
+            lamb1_range, lamb2_range, rate1_range, rate2_range,
+            indexing="ij"),
+        axis=-1).reshape(-1, 4).astype(float)
+
+    delay_prob = PerformParameter(
+        perform_metric=PerformEnum.DELAY_PROB, value=delay)
+
+    setting = FatCrossPerform(
+        arr_list=[
+            DM1Batch(lamb=param_array[:, 0]),
+            DM1Batch(lamb=param_array[:, 1])
+        ],
+        ser_list=[
+            ConstantRateBatch(rate=param_array[:, 2]),
+            ConstantRateBatch(rate=param_array[:, 3])
+        ],
+        perform_param=delay_prob)
+
+    # bound, new_bound
+    res_array = compute_improvement_batch(setting=setting, number_l=1)
+
+    # This might be a very dangerous condition
+    res_array[res_array[:, 1] >= 1] = nan
+
+    return two_col_array_to_results(
+        arrival_enum=ArrivalEnum.DM1,
+        metric=metric,
+        param_array=param_array,
+        res_array=res_array,
+        number_servers=2,
+        valid_iterations=_number_valid(res_array))
+
+
+def _number_valid(res_array: np.ndarray) -> int:
+    return int(np.sum(~np.any(np.isnan(res_array), axis=1)))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,12 @@
 """Abstract Arrival class."""
 
 from abc import abstractmethod
+from math import inf
+from typing import Tuple
+
+import numpy as np
+
+from utils.helper_functions import apply_elementwise
 
 
 class Arrival(object):
@@ -22,6 +28,26 @@ class Arrival(object):
         """
         pass
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        """
+        sigma(theta) for an array of thetas, nan if out of bounds
+        :param theta: array of mgf parameters
+        """
+        return apply_elementwise(fun=self.sigma, theta=theta)
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        """
+        rho(theta) for an array of thetas, nan if out of bounds
+        :param theta: array of mgf parameters
+        """
+        return apply_elementwise(fun=self.rho, theta=theta)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        """
+        open interval of thetas, in which sigma and rho are feasible
+        """
+        return 0.0, inf
+
     @abstractmethod
     def is_discrete(self) -> bool:
         """
@@ -2,19 +2,19 @@
 
 from math import exp
 
-from utils.exceptions import ParameterOutOfBounds
+from utils.exceptions import out_of_bounds
 
 
 def mgf_fbm(theta: float, delta_time: int, lamb: float, sigma: float,
             hurst: float) -> float:
     if theta <= 0:
-        raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+        return out_of_bounds("theta = {0} must be > 0", theta)
 
     if sigma <= 0:
-        raise ParameterOutOfBounds(f"sigma = {sigma} must be > 0")
+        return out_of_bounds("sigma = {0} must be > 0", sigma)
 
     if hurst <= 0 or hurst >= 1:
-        raise ParameterOutOfBounds(f"Hurst = {hurst} must be in (0, 1)")
+        return out_of_bounds("Hurst = {0} must be in (0, 1)", hurst)
 
     return exp(lamb * theta * delta_time +
                (0.5 * (sigma * theta)**2) * delta_time**(2 * hurst))
@@ -26,7 +26,7 @@ def mgf_regulated_arrive(theta: float,
                          rho_single: float,
                          n=1) -> float:
     if theta <= 0:
-        raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+        return out_of_bounds("theta = {0} must be > 0", theta)
 
     rho_delta = rho_single * delta_time
 
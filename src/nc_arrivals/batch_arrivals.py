@@ -0,0 +1,97 @@
+"""Populations of arrivals, one parameter array per parameter"""
+
+import numpy as np
+
+from nc_arrivals.ebb import EBB
+from nc_arrivals.markov_modulated import MMOOFluid
+from nc_arrivals.qt import DM1, MD1, MM1
+from nc_arrivals.regulated_arrivals import (LeakyBucketMassOne,
+                                            TokenBucketConstant)
+from utils.batch import Batch, as_population
+
+
+class DM1Batch(Batch, DM1):
+    """Population of D/M/1 arrivals"""
+
+    def __init__(self, lamb: np.ndarray, n=1) -> None:
+        lamb, = as_population(lamb)
+        super().__init__(lamb=lamb, n=n)
+        self.population_size = lamb.size
+
+
+class MD1Batch(Batch, MD1):
+    """Population of M/D/1 arrivals"""
+
+    def __init__(self, lamb: np.ndarray, mu: np.ndarray, n=1) -> None:
+        lamb, mu = as_population(lamb, mu)
+        super().__init__(lamb=lamb, mu=mu, n=n)
+        self.population_size = lamb.size
+
+
+class MM1Batch(Batch, MM1):
+    """Population of M/M/1 arrivals"""
+
+    def __init__(self, lamb: np.ndarray, mu: np.ndarray, n=1) -> None:
+        lamb, mu = as_population(lamb, mu)
+        super().__init__(lamb=lamb, mu=mu, n=n)
+        self.population_size = lamb.size
+
+
+class MMOOFluidBatch(Batch, MMOOFluid):
+    """Population of continuous Markov modulated on-off arrivals"""
+
+    def __init__(self, mu: np.ndarray, lamb: np.ndarray, burst: np.ndarray,
+                 n=1) -> None:
+        mu, lamb, burst = as_population(mu, lamb, burst)
+        super().__init__(mu=mu, lamb=lamb, burst=burst, n=n)
+        self.population_size = mu.size
+
+
+class EBBBatch(Batch, EBB):
+    """Population of EBB arrivals"""
+
+    def __init__(self, factor_m: np.ndarray, decay: np.ndarray,
+                 rho_single: np.ndarray, n=1) -> None:
+        factor_m, decay, rho_single = as_population(factor_m, decay,
+                                                    rho_single)
+        super().__init__(
+            factor_m=factor_m, decay=decay, rho_single=rho_single, n=n)
+        self.population_size = factor_m.size
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.n * self.rho_single,
+                               self.population_shape(theta))
+
+
+class TokenBucketConstantBatch(Batch, TokenBucketConstant):
+    """Population of token buckets with constant parameters"""
+
+    def __init__(self, sigma_single: np.ndarray, rho_single: np.ndarray,
+                 n=1) -> None:
+        sigma_single, rho_single = as_population(sigma_single, rho_single)
+        super().__init__(
+            sigma_single=sigma_single, rho_single=rho_single, n=n)
+        self.population_size = sigma_single.size
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.n * self.sigma_single,
+                               self.population_shape(theta))
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.n * self.rho_single,
+                               self.population_shape(theta))
+
+
+class LeakyBucketMassOneBatch(Batch, LeakyBucketMassOne):
+    """Population of leaky buckets according to Massoulie"""
+
+    def __init__(self, sigma_single: np.ndarray, rho_single: np.ndarray,
+                 n=1) -> None:
+        sigma_single, rho_single = as_population(sigma_single, rho_single)
+        super().__init__(
+            sigma_single=sigma_single, rho_single=rho_single, n=n)
+        self.population_size = sigma_single.size
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.n * self.rho_single,
+                               self.population_shape(theta))
@@ -1,9 +1,13 @@
 """Exponentially Bounded Burstiness"""
 
-from math import log
+from math import log, nan
+from typing import Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival_distribution import ArrivalDistribution
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class EBB(ArrivalDistribution):
@@ -18,11 +22,11 @@ class EBB(ArrivalDistribution):
 
     def sigma(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         if theta >= self.decay:
-            raise ParameterOutOfBounds("theta {0} must be < decay {1}".format(
-                theta, self.decay))
+            return out_of_bounds("theta {0} must be < decay {1}", theta,
+                                 self.decay)
 
         theta_over_decay = theta / self.decay
 
@@ -32,6 +36,22 @@ class EBB(ArrivalDistribution):
     def rho(self, theta=0.0) -> float:
         return self.n * self.rho_single
 
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where((theta > 0) & (theta < self.decay), theta, nan)
+
+        theta_over_decay = theta / self.decay
+
+        return (self.n / theta) * (theta_over_decay * np.log(self.factor_m) -
+                                   np.log1p(-theta_over_decay))
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.full(np.shape(theta), self.n * self.rho_single)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return 0.0, self.decay
+
     def is_discrete(self) -> bool:
         return True
 
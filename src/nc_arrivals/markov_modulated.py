@@ -1,9 +1,12 @@
 """Markov Modulated Processes"""
 
-from math import exp, log, sqrt
+from math import exp, log, nan, sqrt
+
+import numpy as np
 
 from nc_arrivals.arrival_distribution import ArrivalDistribution
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class MMOOFluid(ArrivalDistribution):
@@ -20,13 +23,26 @@ class MMOOFluid(ArrivalDistribution):
 
     def rho(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         bb = theta * self.burst - self.mu - self.lamb
 
         return 0.5 * self.n * (bb + sqrt(
             (bb**2) + 4 * self.mu * theta * self.burst)) / theta
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(theta))
+
+    @np.errstate(all="ignore")
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        bb = theta * self.burst - self.mu - self.lamb
+
+        return 0.5 * self.n * (bb + np.sqrt(
+            (bb**2) + 4 * self.mu * theta * self.burst)) / theta
+
     def is_discrete(self) -> bool:
         return False
 
@@ -55,7 +71,7 @@ class MMOODisc(ArrivalDistribution):
 
     def rho(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         off_on = self.stay_off + self.stay_on * exp(theta * self.burst)
         sqrt_part = sqrt(off_on**2 - 4 * (self.stay_off + self.stay_on - 1) *
@@ -63,6 +79,21 @@ class MMOODisc(ArrivalDistribution):
 
         return log(0.5 * (off_on + sqrt_part)) / theta
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(theta))
+
+    @np.errstate(all="ignore")
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        off_on = self.stay_off + self.stay_on * np.exp(theta * self.burst)
+        sqrt_part = np.sqrt(off_on**2 - 4 *
+                            (self.stay_off + self.stay_on - 1) *
+                            np.exp(theta * self.burst))
+
+        return np.log(0.5 * (off_on + sqrt_part)) / theta
+
     def is_discrete(self) -> bool:
         return True
 
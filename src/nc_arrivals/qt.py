@@ -1,9 +1,13 @@
 """Typical Queueing Theory Processes"""
 
-from math import exp, log
+from math import exp, log, nan
+from typing import Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival_distribution import ArrivalDistribution
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class DM1(ArrivalDistribution):
@@ -27,14 +31,27 @@ class DM1(ArrivalDistribution):
         :param theta: mgf parameter
         """
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         if theta >= self.lamb:
-            raise ParameterOutOfBounds(
-                f"theta = {theta} must be < lambda = {self.lamb}")
+            return out_of_bounds("theta = {0} must be < lambda = {1}",
+                                 theta, self.lamb)
 
         return (self.n / theta) * log(self.lamb / (self.lamb - theta))
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(theta))
+
+    @np.errstate(all="ignore")
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where((theta > 0) & (theta < self.lamb), theta, nan)
+
+        return (self.n / theta) * np.log(self.lamb / (self.lamb - theta))
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return 0.0, self.lamb
+
     def is_discrete(self) -> bool:
         return True
 
@@ -59,10 +76,20 @@ class MD1(ArrivalDistribution):
 
     def rho(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         return (self.n / theta) * self.lamb * (exp(theta / self.mu) - 1)
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(theta))
+
+    @np.errstate(all="ignore")
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        return (self.n / theta) * self.lamb * np.expm1(theta / self.mu)
+
     def is_discrete(self) -> bool:
         return False
 
@@ -88,10 +115,22 @@ class MM1(ArrivalDistribution):
 
     def rho(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
+
+        return self.n * self.lamb / (self.mu - theta)
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(theta))
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where((theta > 0) & (theta < self.mu), theta, nan)
 
         return self.n * self.lamb / (self.mu - theta)
 
+    def theta_domain(self) -> Tuple[float, float]:
+        return 0.0, self.mu
+
     def is_discrete(self) -> bool:
         return False
 
@@ -1,11 +1,15 @@
 """Abstract Leaky-Bucket class."""
 
 from abc import abstractmethod
-from math import erf, exp, inf, log, pi, sqrt
+from math import erf, exp, inf, log, nan, pi, sqrt
+
+import numpy as np
+import scipy.special
 
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from utils.deprecated import deprecated
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class RegulatedArrivals(ArrivalDistribution):
@@ -31,6 +35,13 @@ class RegulatedArrivals(ArrivalDistribution):
         """
         return self.n * self.rho_single
 
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        """
+        rho(theta) for an array of thetas
+        :param theta: array of mgf parameters
+        """
+        return np.full(np.shape(theta), self.n * self.rho_single)
+
     def is_discrete(self) -> bool:
         """
         :return True if the arrival distribution is discrete, False if not
@@ -59,6 +70,9 @@ class TokenBucketConstant(RegulatedArrivals):
     def sigma(self, theta=0.0) -> float:
         return self.n * self.sigma_single
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.full(np.shape(theta), self.n * self.sigma_single)
+
 
 class LeakyBucketMassOne(RegulatedArrivals):
     """Leaky Bucket according to Massoulie using directly Lemma 2"""
@@ -68,11 +82,21 @@ class LeakyBucketMassOne(RegulatedArrivals):
 
     def sigma(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds("theta = {0} must be > 0".format(theta))
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         return self.n * log(0.5 * (exp(theta * self.sigma_single) + exp(
             -theta * self.sigma_single))) / theta
 
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        # log(0.5 * (e^x + e^-x)) without overflow of e^x
+        return self.n * (np.logaddexp(theta * self.sigma_single,
+                                      -theta * self.sigma_single) -
+                         log(2)) / theta
+
 
 @deprecated
 class LeakyBucketMassTwo(RegulatedArrivals):
@@ -84,7 +108,7 @@ class LeakyBucketMassTwo(RegulatedArrivals):
 
     def sigma(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds("theta = {0} must be > 0".format(theta))
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         try:
             return log(1.0 + sqrt(2 * pi * self.n * (self.sigma_single**2)) *
@@ -93,6 +117,15 @@ class LeakyBucketMassTwo(RegulatedArrivals):
         except OverflowError:
             return inf
 
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        return np.log(1.0 + sqrt(2 * pi * self.n * (self.sigma_single**2)) *
+                      theta * np.exp(0.5 * self.n * (self.sigma_single**2) *
+                                     (theta**2))) / theta
+
 
 @deprecated
 class LeakyBucketMassTwoExact(RegulatedArrivals):
@@ -103,7 +136,7 @@ class LeakyBucketMassTwoExact(RegulatedArrivals):
 
     def sigma(self, theta: float) -> float:
         if theta <= 0:
-            raise ParameterOutOfBounds("theta = {0} must be > 0".format(theta))
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         try:
             return log(1.0 + sqrt(0.5 * pi * self.n * (self.sigma_single**2)) *
@@ -113,3 +146,14 @@ class LeakyBucketMassTwoExact(RegulatedArrivals):
                                               (self.sigma_single**2)))) / theta
         except OverflowError:
             return inf
+
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+        theta = np.where(theta > 0, theta, nan)
+
+        return np.log(1.0 + sqrt(0.5 * pi * self.n * (self.sigma_single**2)) *
+                      theta * np.exp(0.5 * self.n * (self.sigma_single**2) *
+                                     (theta**2)) *
+                      scipy.special.erf(1.0 + theta * sqrt(
+                          0.5 * self.n * (self.sigma_single**2)))) / theta
@@ -1,10 +1,16 @@
 """Implements new Lyapunov Deconvolution"""
 
-from math import exp, log
+from math import exp, log, nan
+from typing import Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival import Arrival
+from nc_operations.theta_domain import (intersect_domains, scale_domain,
+                                        stable_domain)
 from nc_service.service import Service
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class DeconvolvePower(Arrival):
@@ -13,9 +19,26 @@ class DeconvolvePower(Arrival):
     def __init__(self, arr: Arrival, ser: Service, l_power=1.0) -> None:
         self.arr = arr
         self.ser = ser
+        self.l_power = 1.0
+        self.set_l_power(l_power=l_power)
+
+    def set_l_power(self, l_power) -> None:
+        """
+        Replaces l, e.g., when a prepared graph is evaluated again.
+
+        :param l_power: power parameter l >= 1, scalar or array
+        """
+        if isinstance(l_power, float):
+            # scalar l of the optimizers, without the costly np.ndim
+            self.l_power = max(l_power, 1.0)
+            return
+
         self.l_power = l_power
 
-        if self.l_power < 1.0:
+        if np.ndim(self.l_power) > 0:
+            # array of l's for the array evaluation
+            self.l_power = np.maximum(self.l_power, 1.0)
+        elif self.l_power < 1.0:
             self.l_power = 1.0
             # raise ParameterOutOfBounds("l must be >= 1")
 
@@ -23,28 +46,70 @@ class DeconvolvePower(Arrival):
         # here, theta can simply be replaced by l * theta
         l_theta = self.l_power * theta
 
-        k_sig = -log(
-            1 - exp(l_theta *
-                    (self.arr.rho(l_theta) - self.ser.rho(l_theta)))) / l_theta
+        rho_a_l = self.arr.rho(l_theta)
+
+        k_sig = -log(1 - exp(l_theta *
+                             (rho_a_l - self.ser.rho(l_theta)))) / l_theta
 
         if self.arr.is_discrete():
             return self.arr.sigma(l_theta) + self.ser.sigma(l_theta) + k_sig
         else:
             return self.arr.sigma(l_theta) + self.ser.sigma(
-                l_theta) + self.arr.rho(l_theta) + k_sig
+                l_theta) + rho_a_l + k_sig
 
     def rho(self, theta: float) -> float:
         # here, theta can simply be replaced by l * theta
         l_theta = self.l_power * theta
 
-        if self.arr.rho(l_theta) < 0 or self.ser.rho(l_theta) < 0:
-            raise ParameterOutOfBounds("Check rho's sign")
+        rho_a_l = self.arr.rho(l_theta)
+        rho_s_l = self.ser.rho(l_theta)
 
-        if self.arr.rho(l_theta) >= self.ser.rho(l_theta):
-            raise ParameterOutOfBounds(
+        if not (rho_a_l >= 0 and rho_s_l >= 0):
+            return out_of_bounds("Check rho's sign")
+
+        if rho_a_l >= rho_s_l:
+            return out_of_bounds(
                 "The arrivals' rho has to be smaller than the service's rho")
 
-        return self.arr.rho(l_theta)
+        return rho_a_l
+
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        l_theta = self.l_power * as_float_array(theta)
+
+        rho_a_l = self.arr.rho_array(l_theta)
+
+        k_sig = -np.log(1 - np.exp(
+            l_theta * (rho_a_l - self.ser.rho_array(l_theta)))) / l_theta
+
+        if self.arr.is_discrete():
+            return self.arr.sigma_array(l_theta) + self.ser.sigma_array(
+                l_theta) + k_sig
+        else:
+            return self.arr.sigma_array(l_theta) + self.ser.sigma_array(
+                l_theta) + rho_a_l + k_sig
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        l_theta = self.l_power * as_float_array(theta)
+
+        rho_a_l = self.arr.rho_array(l_theta)
+        rho_s_l = self.ser.rho_array(l_theta)
+
+        return np.where((rho_a_l >= 0) & (rho_s_l >= 0) & (rho_a_l < rho_s_l),
+                        rho_a_l, nan)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        # the largest l gives the smallest interval
+        l_max = float(np.max(self.l_power))
+
+        return stable_domain(
+            domain=scale_domain(
+                domain=intersect_domains(
+                    [self.arr.theta_domain(),
+                     self.ser.theta_domain()]),
+                factor=l_max),
+            rho_arr=lambda theta: self.arr.rho_array(l_max * theta),
+            rho_ser=lambda theta: self.ser.rho_array(l_max * theta))
 
     def is_discrete(self):
         return self.arr.is_discrete()
@@ -1,9 +1,15 @@
 """Helper function to evaluate a single hop."""
 
+import numpy as np
+
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from nc_operations.perform_enum import PerformEnum
-from nc_operations.performance_bounds import (backlog, backlog_prob, delay,
-                                              delay_prob, output)
+from nc_operations.performance_bounds import (
+    backlog, backlog_array, backlog_prob, backlog_prob_array, delay,
+    delay_array, delay_prob, delay_prob_array, log_backlog, log_backlog_array,
+    log_backlog_prob, log_backlog_prob_array, log_delay, log_delay_array,
+    log_delay_prob, log_delay_prob_array, log_output, log_output_array, output,
+    output_array)
 from nc_service.service import Service
 from utils.perform_parameter import PerformParameter
 
@@ -13,12 +19,81 @@ def evaluate_single_hop(foi: ArrivalDistribution,
                         theta: float,
                         perform_param: PerformParameter,
                         indep=True,
-                        p=1.0) -> float:
+                        p=1.0,
+                        log_domain=False) -> float:
+    """
+    :param log_domain: return the logarithm of the bound, which does not
+                       overflow
+    """
+    if indep:
+        p = 1.0
+
+    if perform_param.perform_metric == PerformEnum.BACKLOG_PROB:
+        return (log_backlog_prob if log_domain else backlog_prob)(
+            arr=foi,
+            ser=s_net,
+            theta=theta,
+            backlog_value=perform_param.value,
+            indep=indep,
+            p=p)
+
+    elif perform_param.perform_metric == PerformEnum.BACKLOG:
+        return (log_backlog if log_domain else backlog)(
+            arr=foi,
+            ser=s_net,
+            theta=theta,
+            prob_b=perform_param.value,
+            indep=indep,
+            p=p)
+
+    elif perform_param.perform_metric == PerformEnum.DELAY_PROB:
+        return (log_delay_prob if log_domain else delay_prob)(
+            arr=foi,
+            ser=s_net,
+            theta=theta,
+            delay_value=perform_param.value,
+            indep=indep,
+            p=p)
+
+    elif perform_param.perform_metric == PerformEnum.DELAY:
+        return (log_delay if log_domain else delay)(
+            arr=foi,
+            ser=s_net,
+            theta=theta,
+            prob_d=perform_param.value,
+            indep=indep,
+            p=p)
+
+    elif perform_param.perform_metric == PerformEnum.OUTPUT:
+        return (log_output if log_domain else output)(
+            arr=foi,
+            ser=s_net,
+            theta=theta,
+            delta_time=perform_param.value,
+            indep=indep,
+            p=p)
+
+    else:
+        raise NameError("{0} is an infeasible performance metric".format(
+            perform_param.perform_metric))
+
+
+def evaluate_single_hop_array(foi: ArrivalDistribution,
+                              s_net: Service,
+                              theta: np.ndarray,
+                              perform_param: PerformParameter,
+                              indep=True,
+                              p=1.0,
+                              log_domain=False) -> np.ndarray:
+    """
+    :param log_domain: return the logarithm of the bound, which does not
+                       overflow
+    """
     if indep:
         p = 1.0
 
     if perform_param.perform_metric == PerformEnum.BACKLOG_PROB:
-        return backlog_prob(
+        return (log_backlog_prob_array if log_domain else backlog_prob_array)(
             arr=foi,
             ser=s_net,
             theta=theta,
@@ -27,7 +102,7 @@ def evaluate_single_hop(foi: ArrivalDistribution,
             p=p)
 
     elif perform_param.perform_metric == PerformEnum.BACKLOG:
-        return backlog(
+        return (log_backlog_array if log_domain else backlog_array)(
             arr=foi,
             ser=s_net,
             theta=theta,
@@ -36,7 +111,7 @@ def evaluate_single_hop(foi: ArrivalDistribution,
             p=p)
 
     elif perform_param.perform_metric == PerformEnum.DELAY_PROB:
-        return delay_prob(
+        return (log_delay_prob_array if log_domain else delay_prob_array)(
             arr=foi,
             ser=s_net,
             theta=theta,
@@ -45,7 +120,7 @@ def evaluate_single_hop(foi: ArrivalDistribution,
             p=p)
 
     elif perform_param.perform_metric == PerformEnum.DELAY:
-        return delay(
+        return (log_delay_array if log_domain else delay_array)(
             arr=foi,
             ser=s_net,
             theta=theta,
@@ -54,7 +129,7 @@ def evaluate_single_hop(foi: ArrivalDistribution,
             p=p)
 
     elif perform_param.perform_metric == PerformEnum.OUTPUT:
-        return output(
+        return (log_output_array if log_domain else output_array)(
             arr=foi,
             ser=s_net,
             theta=theta,
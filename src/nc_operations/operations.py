@@ -1,13 +1,18 @@
 """Implements all network operations in the sigma-rho calculus."""
 
-from math import exp, log
-from typing import List
+from math import exp, log, nan
+from typing import List, Tuple
+
+import numpy as np
 
 from nc_arrivals.arrival import Arrival
+from nc_operations.theta_domain import (intersect_domains, scale_domain,
+                                        stable_domain)
 from nc_service.constant_rate_server import ConstantRate
 from nc_service.service import Service
-from utils.exceptions import ParameterOutOfBounds
-from utils.helper_functions import get_p_n, get_q, is_equal
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
+from utils.helper_functions import EPSILON, get_p_n, get_q, is_equal
 
 
 class Deconvolve(Arrival):
@@ -32,14 +37,16 @@ class Deconvolve(Arrival):
         p_theta = self.p * theta
         q_theta = self.q * theta
 
-        k_sig = -log(1 - exp(
-            theta * (self.arr.rho(p_theta) - self.ser.rho(q_theta)))) / theta
+        rho_a_p = self.arr.rho(p_theta)
+
+        k_sig = -log(1 - exp(theta *
+                             (rho_a_p - self.ser.rho(q_theta)))) / theta
 
         if self.arr.is_discrete():
             return self.arr.sigma(p_theta) + self.ser.sigma(q_theta) + k_sig
         else:
             return self.arr.sigma(p_theta) + self.ser.sigma(
-                q_theta) + self.arr.rho(p_theta) + k_sig
+                q_theta) + rho_a_p + k_sig
 
     def rho(self, theta: float) -> float:
         """
@@ -47,17 +54,53 @@ class Deconvolve(Arrival):
         :param theta: mgf parameter
         :return: rho(theta)
         """
+        rho_a_p = self.arr.rho(self.p * theta)
+        rho_s_q = self.ser.rho(self.q * theta)
+
+        if not (rho_a_p >= 0 and rho_s_q >= 0):
+            return out_of_bounds("The rhos must be >= 0")
+
+        if rho_a_p >= rho_s_q:
+            return out_of_bounds(
+                "The arrivals' rho has to be smaller than the service's rho")
+
+        return rho_a_p
+
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
         p_theta = self.p * theta
         q_theta = self.q * theta
 
-        if self.arr.rho(p_theta) < 0 or self.ser.rho(q_theta) < 0:
-            raise ParameterOutOfBounds("The rhos must be >= 0")
+        rho_a_p = self.arr.rho_array(p_theta)
 
-        if self.arr.rho(p_theta) >= self.ser.rho(q_theta):
-            raise ParameterOutOfBounds(
-                "The arrivals' rho has to be smaller than the service's rho")
+        k_sig = -np.log(1 - np.exp(
+            theta * (rho_a_p - self.ser.rho_array(q_theta)))) / theta
 
-        return self.arr.rho(p_theta)
+        if self.arr.is_discrete():
+            return self.arr.sigma_array(p_theta) + self.ser.sigma_array(
+                q_theta) + k_sig
+        else:
+            return self.arr.sigma_array(p_theta) + self.ser.sigma_array(
+                q_theta) + rho_a_p + k_sig
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        rho_a_p = self.arr.rho_array(self.p * theta)
+        rho_s_q = self.ser.rho_array(self.q * theta)
+
+        return np.where((rho_a_p >= 0) & (rho_s_q >= 0) & (rho_a_p < rho_s_q),
+                        rho_a_p, nan)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return stable_domain(
+            domain=intersect_domains([
+                scale_domain(domain=self.arr.theta_domain(), factor=self.p),
+                scale_domain(domain=self.ser.theta_domain(), factor=self.q)
+            ]),
+            rho_arr=lambda theta: self.arr.rho_array(self.p * theta),
+            rho_ser=lambda theta: self.ser.rho_array(self.q * theta))
 
     def is_discrete(self):
         return self.arr.is_discrete()
@@ -84,10 +127,11 @@ class Convolve(Service):
         p_theta = self.p * theta
         q_theta = self.q * theta
 
-        if not is_equal(
-                abs(self.ser1.rho(p_theta)), abs(self.ser2.rho(q_theta))):
-            k_sig = -log(1 - exp(-theta * abs(
-                self.ser1.rho(p_theta) - self.ser2.rho(q_theta)))) / theta
+        rho_1_p = self.ser1.rho(p_theta)
+        rho_2_q = self.ser2.rho(q_theta)
+
+        if not is_equal(abs(rho_1_p), abs(rho_2_q)):
+            k_sig = -log(1 - exp(-theta * abs(rho_1_p - rho_2_q))) / theta
 
             return self.ser1.sigma(p_theta) + self.ser2.sigma(q_theta) + k_sig
 
@@ -99,18 +143,61 @@ class Convolve(Service):
                 self.ser2, ConstantRate):
             return min(self.ser1.rate, self.ser2.rate)
 
+        rho_1_p = self.ser1.rho(self.p * theta)
+        rho_2_q = self.ser2.rho(self.q * theta)
+
+        if not (rho_1_p >= 0 and rho_2_q >= 0):
+            return out_of_bounds("The rhos must be > 0")
+
+        if not is_equal(abs(rho_1_p), abs(rho_2_q)):
+            return min(rho_1_p, rho_2_q)
+
+        else:
+            return rho_1_p - (1 / theta)
+
+    @np.errstate(all="ignore")
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        if isinstance(self.ser1, ConstantRate) and isinstance(
+                self.ser2, ConstantRate):
+            return np.zeros(theta.shape)
+
         p_theta = self.p * theta
         q_theta = self.q * theta
 
-        if self.ser1.rho(p_theta) < 0 or self.ser2.rho(q_theta) < 0:
-            raise ParameterOutOfBounds("The rhos must be > 0")
+        rho_1_p = self.ser1.rho_array(p_theta)
+        rho_2_q = self.ser2.rho_array(q_theta)
 
-        if not is_equal(
-                abs(self.ser1.rho(p_theta)), abs(self.ser2.rho(q_theta))):
-            return min(self.ser1.rho(p_theta), self.ser2.rho(q_theta))
+        k_sig = np.where(
+            np.abs(np.abs(rho_1_p) - np.abs(rho_2_q)) < EPSILON, 0.0,
+            -np.log(1 - np.exp(-theta * np.abs(rho_1_p - rho_2_q))) / theta)
 
-        else:
-            return self.ser1.rho(p_theta) - (1 / theta)
+        return self.ser1.sigma_array(p_theta) + self.ser2.sigma_array(
+            q_theta) + k_sig
+
+    @np.errstate(all="ignore")
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        if isinstance(self.ser1, ConstantRate) and isinstance(
+                self.ser2, ConstantRate):
+            return np.full(theta.shape, min(self.ser1.rate, self.ser2.rate))
+
+        rho_1_p = self.ser1.rho_array(self.p * theta)
+        rho_2_q = self.ser2.rho_array(self.q * theta)
+
+        res = np.where(
+            np.abs(np.abs(rho_1_p) - np.abs(rho_2_q)) < EPSILON,
+            rho_1_p - (1 / theta), np.minimum(rho_1_p, rho_2_q))
+
+        return np.where((rho_1_p >= 0) & (rho_2_q >= 0), res, nan)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return intersect_domains([
+            scale_domain(domain=self.ser1.theta_domain(), factor=self.p),
+            scale_domain(domain=self.ser2.theta_domain(), factor=self.q)
+        ])
 
 
 class Leftover(Service):
@@ -133,13 +220,34 @@ class Leftover(Service):
         return self.ser.sigma(q_theta) + self.arr.sigma(p_theta)
 
     def rho(self, theta):
-        p_theta = self.p * theta
-        q_theta = self.q * theta
+        rho_s_q = self.ser.rho(self.q * theta)
+        rho_a_p = self.arr.rho(self.p * theta)
+
+        if not (rho_s_q >= 0 and rho_a_p >= 0):
+            return out_of_bounds("The rhos must be > 0")
+
+        return rho_s_q - rho_a_p
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
 
-        if self.ser.rho(q_theta) < 0 or self.arr.rho(p_theta) < 0:
-            raise ParameterOutOfBounds("The rhos must be > 0")
+        return self.ser.sigma_array(self.q * theta) + self.arr.sigma_array(
+            self.p * theta)
 
-        return self.ser.rho(q_theta) - self.arr.rho(p_theta)
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        rho_s_q = self.ser.rho_array(self.q * theta)
+        rho_a_p = self.arr.rho_array(self.p * theta)
+
+        return np.where((rho_s_q >= 0) & (rho_a_p >= 0), rho_s_q - rho_a_p,
+                        nan)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return intersect_domains([
+            scale_domain(domain=self.arr.theta_domain(), factor=self.p),
+            scale_domain(domain=self.ser.theta_domain(), factor=self.q)
+        ])
 
 
 class AggregateList(Arrival):
@@ -148,8 +256,22 @@ class AggregateList(Arrival):
     def __init__(self,
                  arr_list: List[Arrival],
                  p_list: List[float],
-                 indep=True) -> None:
+                 indep=True,
+                 n_list: List[int] = None) -> None:
+        """
+
+        :param arr_list: list of arrivals
+        :param p_list:   Hoelder parameters, ignored if indep
+        :param indep:    True if the arrivals are independent
+        :param n_list:   multiplicity of each arrival, i.e., the number of
+                         identical flows it represents, 1 by default
+        """
         self.arr_list = arr_list
+        if n_list is None:
+            self.n_list = [1] * len(self.arr_list)
+        else:
+            self.n_list = n_list
+
         if indep:
             self.p_list = [1.0] * len(self.arr_list)
         else:
@@ -163,20 +285,48 @@ class AggregateList(Arrival):
     def sigma(self, theta: float) -> float:
         res = 0.0
         for i in range(len(self.arr_list)):
-            res += self.arr_list[i].sigma(self.p_list[i] * theta)
+            res += self.n_list[i] * self.arr_list[i].sigma(
+                self.p_list[i] * theta)
 
         return res
 
     def rho(self, theta: float) -> float:
+        res = 0.0
         for i in range(len(self.arr_list)):
-            if self.arr_list[i].rho(self.p_list[i] * theta) < 0:
-                raise ParameterOutOfBounds("The rhos must be > 0")
+            rho_i = self.arr_list[i].rho(self.p_list[i] * theta)
 
-        res = 0.0
+            if not rho_i >= 0:
+                return out_of_bounds("The rhos must be > 0")
+
+            res += self.n_list[i] * rho_i
+
+        return res
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        res = np.zeros(theta.shape)
         for i in range(len(self.arr_list)):
-            res += self.arr_list[i].rho(self.p_list[i] * theta)
+            res = res + self.n_list[i] * self.arr_list[i].sigma_array(
+                self.p_list[i] * theta)
 
         return res
 
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        res = np.zeros(theta.shape)
+        for i in range(len(self.arr_list)):
+            rho_i = self.arr_list[i].rho_array(self.p_list[i] * theta)
+            res = res + self.n_list[i] * np.where(rho_i >= 0, rho_i, nan)
+
+        return res
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return intersect_domains([
+            scale_domain(domain=arr.theta_domain(), factor=p)
+            for arr, p in zip(self.arr_list, self.p_list)
+        ])
+
     def is_discrete(self):
         return self.arr_list[0].is_discrete()
@@ -2,52 +2,74 @@
 
 # TODO: write a "get_rho_arr_ser"-function
 
-from math import exp, inf, log
+from math import exp, inf, isnan, log
+
+import numpy as np
 
 from nc_arrivals.arrival import Arrival
 from nc_service.service import Service
-from utils.exceptions import ParameterOutOfBounds
-from utils.helper_functions import get_q
-
-
-def backlog_prob(arr: Arrival,
-                 ser: Service,
-                 theta: float,
-                 backlog_value: float,
-                 tau=1.0,
-                 indep=True,
-                 p=1.0) -> float:
-    """Implements stationary bound method"""
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
+from utils.helper_functions import (get_q, log_one_minus_exp,
+                                    log_one_minus_exp_array)
+
+
+def log_backlog_prob(arr: Arrival,
+                     ser: Service,
+                     theta: float,
+                     backlog_value: float,
+                     tau=1.0,
+                     indep=True,
+                     p=1.0) -> float:
+    """Logarithm of backlog_prob, does not overflow"""
     if indep:
         p = 1.0
 
     q = get_q(p=p, indep=indep)
 
     rho_a_p = arr.rho(theta=p * theta)
-    sigma_a_p = arr.sigma(theta=p * theta)
+    if isnan(rho_a_p):
+        return out_of_bounds("The arrivals' rho is nan")
+
     rho_s_q = ser.rho(theta=q * theta)
-    sigma_s_q = ser.sigma(theta=q * theta)
 
-    if rho_a_p >= rho_s_q:
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {rho_a_p} has to be smaller than"
-            f"the service's rho {rho_s_q}")
+    if not rho_a_p < rho_s_q:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_p, rho_s_q)
+
+    sigma_a_p = arr.sigma(theta=p * theta)
+    sigma_s_q = ser.sigma(theta=q * theta)
 
     rho_arr_ser = rho_a_p - rho_s_q
     sigma_arr_ser = sigma_a_p + sigma_s_q
 
-    try:
-        if arr.is_discrete():
-            return exp(-theta * backlog_value) * exp(
-                theta * sigma_arr_ser) / (1 - exp(theta * rho_arr_ser))
+    if arr.is_discrete():
+        return theta * (sigma_arr_ser - backlog_value) - log_one_minus_exp(
+            theta * rho_arr_ser)
+
+    else:
+        return theta * (rho_a_p * tau + sigma_arr_ser - backlog_value
+                        ) - log_one_minus_exp(theta * tau * rho_arr_ser)
 
-        else:
-            return exp(-theta * backlog_value) * exp(
-                theta * (rho_a_p * tau + sigma_arr_ser)) / (
-                    1 - exp(theta * tau * rho_arr_ser))
 
-    except ZeroDivisionError:
-        return inf
+def backlog_prob(arr: Arrival,
+                 ser: Service,
+                 theta: float,
+                 backlog_value: float,
+                 tau=1.0,
+                 indep=True,
+                 p=1.0) -> float:
+    """Implements stationary bound method"""
+    return exp(
+        log_backlog_prob(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            backlog_value=backlog_value,
+            tau=tau,
+            indep=indep,
+            p=p))
 
 
 def backlog(arr: Arrival,
@@ -64,66 +86,107 @@ def backlog(arr: Arrival,
     q = get_q(p=p, indep=indep)
 
     rho_a_p = arr.rho(theta=p * theta)
-    sigma_a_p = arr.sigma(theta=p * theta)
+    if isnan(rho_a_p):
+        return out_of_bounds("The arrivals' rho is nan")
+
     rho_s_q = ser.rho(theta=q * theta)
-    sigma_s_q = ser.sigma(theta=q * theta)
 
-    if rho_a_p >= rho_s_q:
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {rho_a_p} has to be smaller than"
-            f"the service's rho {rho_s_q}")
+    if not rho_a_p < rho_s_q:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_p, rho_s_q)
+
+    sigma_a_p = arr.sigma(theta=p * theta)
+    sigma_s_q = ser.sigma(theta=q * theta)
 
     rho_arr_ser = rho_a_p - rho_s_q
     sigma_arr_ser = sigma_a_p + sigma_s_q
 
     if arr.is_discrete():
-        log_part = log(prob_b * (1 - exp(theta * rho_arr_ser)))
+        log_part = log(prob_b) + log_one_minus_exp(theta * rho_arr_ser)
 
         return sigma_arr_ser - log_part / theta
 
     else:
-        log_part = log(prob_b * (1 - exp(theta * tau * rho_arr_ser)))
+        log_part = log(prob_b) + log_one_minus_exp(theta * tau * rho_arr_ser)
 
         return tau * rho_a_p + sigma_arr_ser - log_part / theta
 
 
-def delay_prob(arr: Arrival,
-               ser: Service,
-               theta: float,
-               delay_value: int,
-               tau=1.0,
-               indep=True,
-               p=1.0) -> float:
-    """Implements stationary bound method"""
+def log_backlog(arr: Arrival,
+                ser: Service,
+                theta: float,
+                prob_b: float,
+                tau=1.0,
+                indep=True,
+                p=1.0) -> float:
+    """Logarithm of backlog"""
+    return _log_quantile(
+        backlog(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            prob_b=prob_b,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+def log_delay_prob(arr: Arrival,
+                   ser: Service,
+                   theta: float,
+                   delay_value: int,
+                   tau=1.0,
+                   indep=True,
+                   p=1.0) -> float:
+    """Logarithm of delay_prob, does not overflow"""
     if indep:
         p = 1.0
 
     q = get_q(p=p, indep=indep)
 
     rho_a_p = arr.rho(theta=p * theta)
-    sigma_a_p = arr.sigma(theta=p * theta)
+    if isnan(rho_a_p):
+        return out_of_bounds("The arrivals' rho is nan")
+
     rho_s_q = ser.rho(theta=q * theta)
-    sigma_s_q = ser.sigma(theta=q * theta)
 
-    if rho_a_p >= rho_s_q:
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {rho_a_p} has to be smaller than"
-            f"the service's rho {rho_s_q}")
+    if not rho_a_p < rho_s_q:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_p, rho_s_q)
+
+    sigma_a_p = arr.sigma(theta=p * theta)
+    sigma_s_q = ser.sigma(theta=q * theta)
 
     rho_arr_ser = rho_a_p - rho_s_q
     sigma_arr_ser = sigma_a_p + sigma_s_q
 
-    try:
-        if arr.is_discrete():
-            return exp(-theta * rho_s_q * delay_value) * exp(
-                theta * sigma_arr_ser) / (1 - exp(theta * rho_arr_ser))
-        else:
-            return exp(-theta * rho_s_q * delay_value) * exp(
-                theta * (rho_a_p * tau + sigma_arr_ser)) / (
-                    1 - exp(theta * tau * rho_arr_ser))
+    if arr.is_discrete():
+        return theta * (sigma_arr_ser - rho_s_q * delay_value
+                        ) - log_one_minus_exp(theta * rho_arr_ser)
+    else:
+        return theta * (rho_a_p * tau + sigma_arr_ser - rho_s_q * delay_value
+                        ) - log_one_minus_exp(theta * tau * rho_arr_ser)
 
-    except ZeroDivisionError:
-        return inf
+
+def delay_prob(arr: Arrival,
+               ser: Service,
+               theta: float,
+               delay_value: int,
+               tau=1.0,
+               indep=True,
+               p=1.0) -> float:
+    """Implements stationary bound method"""
+    return exp(
+        log_delay_prob(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delay_value=delay_value,
+            tau=tau,
+            indep=indep,
+            p=p))
 
 
 def delay(arr: Arrival,
@@ -140,29 +203,90 @@ def delay(arr: Arrival,
     q = get_q(p=p, indep=indep)
 
     rho_a_p = arr.rho(theta=p * theta)
-    sigma_a_p = arr.sigma(theta=p * theta)
+    if isnan(rho_a_p):
+        return out_of_bounds("The arrivals' rho is nan")
+
     rho_s_q = ser.rho(theta=q * theta)
-    sigma_s_q = ser.sigma(theta=q * theta)
 
-    if rho_a_p >= rho_s_q:
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {rho_a_p} has to be smaller than"
-            f"the service's rho {rho_s_q}")
+    if not rho_a_p < rho_s_q:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_p, rho_s_q)
+
+    sigma_a_p = arr.sigma(theta=p * theta)
+    sigma_s_q = ser.sigma(theta=q * theta)
 
     rho_arr_ser = rho_a_p - rho_s_q
     sigma_arr_ser = sigma_a_p + sigma_s_q
 
     if arr.is_discrete():
-        log_part = log(prob_d * (1 - exp(theta * rho_arr_ser)))
+        log_part = log(prob_d) + log_one_minus_exp(theta * rho_arr_ser)
 
         return (sigma_arr_ser - log_part / theta) / rho_s_q
 
     else:
-        log_part = log(prob_d * (1 - exp(theta * tau * rho_arr_ser)))
+        log_part = log(prob_d) + log_one_minus_exp(theta * tau * rho_arr_ser)
 
         return (tau * rho_a_p + sigma_arr_ser - log_part / theta) * rho_s_q
 
 
+def log_delay(arr: Arrival,
+              ser: Service,
+              theta: float,
+              prob_d: float,
+              tau=1.0,
+              indep=True,
+              p=1.0) -> float:
+    """Logarithm of delay"""
+    return _log_quantile(
+        delay(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            prob_d=prob_d,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+def log_output(arr: Arrival,
+               ser: Service,
+               theta: float,
+               delta_time: int,
+               indep=True,
+               p=1.0) -> float:
+    """Logarithm of output, does not overflow"""
+    if indep:
+        p = 1.0
+
+    q = get_q(p=p, indep=indep)
+
+    rho_a_p = arr.rho(theta=p * theta)
+    if isnan(rho_a_p):
+        return out_of_bounds("The arrivals' rho is nan")
+
+    rho_s_q = ser.rho(theta=q * theta)
+
+    if not rho_a_p < rho_s_q:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_p, rho_s_q)
+
+    sigma_a_p = arr.sigma(theta=p * theta)
+    sigma_s_q = ser.sigma(theta=q * theta)
+
+    rho_arr_ser = rho_a_p - rho_s_q
+    sigma_arr_ser = sigma_a_p + sigma_s_q
+
+    if arr.is_discrete():
+        return theta * (rho_a_p * delta_time + sigma_arr_ser
+                        ) - log_one_minus_exp(theta * rho_arr_ser)
+
+    else:
+        return theta * (rho_a_p * (delta_time + 1) + sigma_arr_ser
+                        ) - log_one_minus_exp(theta * rho_arr_ser)
+
+
 def output(arr: Arrival,
            ser: Service,
            theta: float,
@@ -170,32 +294,265 @@ def output(arr: Arrival,
            indep=True,
            p=1.0) -> float:
     """Implements stationary bound method"""
+    return exp(
+        log_output(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delta_time=delta_time,
+            indep=indep,
+            p=p))
+
+
+def _log_quantile(res: float) -> float:
+    """Logarithm of a backlog or delay bound, -inf if it is not positive"""
+    if res <= 0:
+        return -inf
+
+    return log(res)
+
+
+def _arr_ser_array(arr: Arrival, ser: Service, theta: np.ndarray, indep: bool,
+                   p: float) -> tuple:
+    """Collects rho_a_p, rho_s_q and the combined rho and sigma"""
     if indep:
         p = 1.0
 
     q = get_q(p=p, indep=indep)
 
-    rho_a_p = arr.rho(theta=p * theta)
-    sigma_a_p = arr.sigma(theta=p * theta)
-    rho_s_q = ser.rho(theta=q * theta)
-    sigma_s_q = ser.sigma(theta=q * theta)
+    rho_a_p = arr.rho_array(theta=p * theta)
+    sigma_a_p = arr.sigma_array(theta=p * theta)
+    rho_s_q = ser.rho_array(theta=q * theta)
+    sigma_s_q = ser.sigma_array(theta=q * theta)
 
-    if rho_a_p >= rho_s_q:
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {rho_a_p} has to be smaller than"
-            f"the service's rho {rho_s_q}")
+    return rho_a_p, rho_s_q, rho_a_p - rho_s_q, sigma_a_p + sigma_s_q
 
-    rho_arr_ser = rho_a_p - rho_s_q
-    sigma_arr_ser = sigma_a_p + sigma_s_q
 
-    try:
-        if arr.is_discrete():
-            return exp(theta * rho_a_p * delta_time) * exp(
-                theta * sigma_arr_ser) / (1 - exp(theta * rho_arr_ser))
+def _mask_infeasible(res: np.ndarray, rho_a_p: np.ndarray,
+                     rho_s_q: np.ndarray) -> np.ndarray:
+    """Sets the bound to inf where the stability condition is violated"""
+    return np.where((rho_a_p < rho_s_q) & ~np.isnan(res), res, inf)
+
+
+@np.errstate(all="ignore")
+def log_backlog_prob_array(arr: Arrival,
+                           ser: Service,
+                           theta: np.ndarray,
+                           backlog_value: float,
+                           tau=1.0,
+                           indep=True,
+                           p=1.0) -> np.ndarray:
+    """Array version of log_backlog_prob, inf for infeasible thetas"""
+    theta = as_float_array(theta)
+    rho_a_p, rho_s_q, rho_arr_ser, sigma_arr_ser = _arr_ser_array(
+        arr=arr, ser=ser, theta=theta, indep=indep, p=p)
+
+    if arr.is_discrete():
+        res = theta * (sigma_arr_ser - backlog_value
+                       ) - log_one_minus_exp_array(theta * rho_arr_ser)
+
+    else:
+        res = theta * (rho_a_p * tau + sigma_arr_ser - backlog_value
+                       ) - log_one_minus_exp_array(theta * tau * rho_arr_ser)
+
+    return _mask_infeasible(res=res, rho_a_p=rho_a_p, rho_s_q=rho_s_q)
+
+
+@np.errstate(all="ignore")
+def backlog_prob_array(arr: Arrival,
+                       ser: Service,
+                       theta: np.ndarray,
+                       backlog_value: float,
+                       tau=1.0,
+                       indep=True,
+                       p=1.0) -> np.ndarray:
+    """Array version of backlog_prob, inf for infeasible thetas"""
+    return np.exp(
+        log_backlog_prob_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            backlog_value=backlog_value,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+@np.errstate(all="ignore")
+def backlog_array(arr: Arrival,
+                  ser: Service,
+                  theta: np.ndarray,
+                  prob_b: float,
+                  tau=1.0,
+                  indep=True,
+                  p=1.0) -> np.ndarray:
+    """Array version of backlog, inf for infeasible thetas"""
+    theta = as_float_array(theta)
+    rho_a_p, rho_s_q, rho_arr_ser, sigma_arr_ser = _arr_ser_array(
+        arr=arr, ser=ser, theta=theta, indep=indep, p=p)
+
+    if arr.is_discrete():
+        log_part = np.log(prob_b) + log_one_minus_exp_array(
+            theta * rho_arr_ser)
+
+        res = sigma_arr_ser - log_part / theta
 
-        else:
-            return exp(theta * rho_a_p * (delta_time + 1)) * exp(
-                theta * sigma_arr_ser) / (1 - exp(theta * rho_arr_ser))
+    else:
+        log_part = np.log(prob_b) + log_one_minus_exp_array(
+            theta * tau * rho_arr_ser)
+
+        res = tau * rho_a_p + sigma_arr_ser - log_part / theta
+
+    return _mask_infeasible(res=res, rho_a_p=rho_a_p, rho_s_q=rho_s_q)
+
+
+@np.errstate(all="ignore")
+def log_backlog_array(arr: Arrival,
+                      ser: Service,
+                      theta: np.ndarray,
+                      prob_b: float,
+                      tau=1.0,
+                      indep=True,
+                      p=1.0) -> np.ndarray:
+    """Array version of log_backlog, inf for infeasible thetas"""
+    return np.log(
+        backlog_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            prob_b=prob_b,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+@np.errstate(all="ignore")
+def log_delay_prob_array(arr: Arrival,
+                         ser: Service,
+                         theta: np.ndarray,
+                         delay_value: int,
+                         tau=1.0,
+                         indep=True,
+                         p=1.0) -> np.ndarray:
+    """Array version of log_delay_prob, inf for infeasible thetas"""
+    theta = as_float_array(theta)
+    rho_a_p, rho_s_q, rho_arr_ser, sigma_arr_ser = _arr_ser_array(
+        arr=arr, ser=ser, theta=theta, indep=indep, p=p)
 
-    except ZeroDivisionError:
-        return inf
+    if arr.is_discrete():
+        res = theta * (sigma_arr_ser - rho_s_q * delay_value
+                       ) - log_one_minus_exp_array(theta * rho_arr_ser)
+    else:
+        res = theta * (rho_a_p * tau + sigma_arr_ser - rho_s_q * delay_value
+                       ) - log_one_minus_exp_array(theta * tau * rho_arr_ser)
+
+    return _mask_infeasible(res=res, rho_a_p=rho_a_p, rho_s_q=rho_s_q)
+
+
+@np.errstate(all="ignore")
+def delay_prob_array(arr: Arrival,
+                     ser: Service,
+                     theta: np.ndarray,
+                     delay_value: int,
+                     tau=1.0,
+                     indep=True,
+                     p=1.0) -> np.ndarray:
+    """Array version of delay_prob, inf for infeasible thetas"""
+    return np.exp(
+        log_delay_prob_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delay_value=delay_value,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+@np.errstate(all="ignore")
+def delay_array(arr: Arrival,
+                ser: Service,
+                theta: np.ndarray,
+                prob_d: float,
+                tau=1.0,
+                indep=True,
+                p=1.0) -> np.ndarray:
+    """Array version of delay, inf for infeasible thetas"""
+    theta = as_float_array(theta)
+    rho_a_p, rho_s_q, rho_arr_ser, sigma_arr_ser = _arr_ser_array(
+        arr=arr, ser=ser, theta=theta, indep=indep, p=p)
+
+    if arr.is_discrete():
+        log_part = np.log(prob_d) + log_one_minus_exp_array(
+            theta * rho_arr_ser)
+
+        res = (sigma_arr_ser - log_part / theta) / rho_s_q
+
+    else:
+        log_part = np.log(prob_d) + log_one_minus_exp_array(
+            theta * tau * rho_arr_ser)
+
+        res = (tau * rho_a_p + sigma_arr_ser - log_part / theta) * rho_s_q
+
+    return _mask_infeasible(res=res, rho_a_p=rho_a_p, rho_s_q=rho_s_q)
+
+
+@np.errstate(all="ignore")
+def log_delay_array(arr: Arrival,
+                    ser: Service,
+                    theta: np.ndarray,
+                    prob_d: float,
+                    tau=1.0,
+                    indep=True,
+                    p=1.0) -> np.ndarray:
+    """Array version of log_delay, inf for infeasible thetas"""
+    return np.log(
+        delay_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            prob_d=prob_d,
+            tau=tau,
+            indep=indep,
+            p=p))
+
+
+@np.errstate(all="ignore")
+def log_output_array(arr: Arrival,
+                     ser: Service,
+                     theta: np.ndarray,
+                     delta_time: int,
+                     indep=True,
+                     p=1.0) -> np.ndarray:
+    """Array version of log_output, inf for infeasible thetas"""
+    theta = as_float_array(theta)
+    rho_a_p, rho_s_q, rho_arr_ser, sigma_arr_ser = _arr_ser_array(
+        arr=arr, ser=ser, theta=theta, indep=indep, p=p)
+
+    if arr.is_discrete():
+        res = theta * (rho_a_p * delta_time + sigma_arr_ser
+                       ) - log_one_minus_exp_array(theta * rho_arr_ser)
+
+    else:
+        res = theta * (rho_a_p * (delta_time + 1) + sigma_arr_ser
+                       ) - log_one_minus_exp_array(theta * rho_arr_ser)
+
+    return _mask_infeasible(res=res, rho_a_p=rho_a_p, rho_s_q=rho_s_q)
+
+
+@np.errstate(all="ignore")
+def output_array(arr: Arrival,
+                 ser: Service,
+                 theta: np.ndarray,
+                 delta_time: int,
+                 indep=True,
+                 p=1.0) -> np.ndarray:
+    """Array version of output, inf for infeasible thetas"""
+    return np.exp(
+        log_output_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delta_time=delta_time,
+            indep=indep,
+            p=p))
@@ -1,10 +1,53 @@
 """Implements new Lyapunov Output Bound"""
 
-from math import exp, inf
+from math import exp, inf, isnan
+
+import numpy as np
 
 from nc_arrivals.arrival import Arrival
 from nc_service.service import Service
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
+from utils.helper_functions import log_one_minus_exp, log_one_minus_exp_array
+
+
+def log_output_power(arr: Arrival,
+                     ser: Service,
+                     theta: float,
+                     delta_time: int,
+                     l_power=1.0) -> float:
+    """Logarithm of output_power, does not overflow"""
+    if l_power < 1.0:
+        l_power = 1.0
+        # raise ParameterOutOfBounds("l must be >= 1")
+
+    l_theta = l_power * theta
+
+    rho_a_l = arr.rho(theta=l_theta)
+    if isnan(rho_a_l):
+        return out_of_bounds("The arrivals' rho is nan")
+
+    rho_s_l = ser.rho(theta=l_theta)
+
+    if not rho_a_l < rho_s_l:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_l, rho_s_l)
+
+    sigma_l_arr_ser = arr.sigma(theta=l_theta) + ser.sigma(theta=l_theta)
+    rho_l_arr_ser = arr.rho(theta=l_theta) - ser.rho(theta=l_theta)
+
+    if arr.is_discrete():
+        log_numerator = theta * (
+            arr.rho(theta=l_theta) * delta_time + sigma_l_arr_ser)
+
+    else:
+        log_numerator = theta * (
+            arr.rho(theta=l_theta) * (delta_time + 1) + sigma_l_arr_ser)
+
+    log_denominator = log_one_minus_exp(l_theta * rho_l_arr_ser) / l_power
+
+    return log_numerator - log_denominator
 
 
 def output_power(arr: Arrival,
@@ -13,35 +56,45 @@ def output_power(arr: Arrival,
                  delta_time: int,
                  l_power=1.0) -> float:
     """Implements stationary bound method"""
+    return exp(
+        log_output_power(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delta_time=delta_time,
+            l_power=l_power))
+
+
+def log_delay_prob_power(arr: Arrival,
+                         ser: Service,
+                         theta: float,
+                         delay: int,
+                         l_power=1.0) -> float:
+    """Logarithm of delay_prob_power, does not overflow"""
     if l_power < 1.0:
         l_power = 1.0
         # raise ParameterOutOfBounds("l must be >= 1")
 
     l_theta = l_power * theta
 
-    if arr.rho(theta=l_theta) >= ser.rho(theta=l_theta):
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {arr.rho(theta)} has to be smaller than"
-            f"the service's rho {ser.rho(theta)}")
+    rho_a_l = arr.rho(theta=l_theta)
+    if isnan(rho_a_l):
+        return out_of_bounds("The arrivals' rho is nan")
 
-    sigma_l_arr_ser = arr.sigma(theta=l_theta) + ser.sigma(theta=l_theta)
-    rho_l_arr_ser = arr.rho(theta=l_theta) - ser.rho(theta=l_theta)
+    rho_s_l = ser.rho(theta=l_theta)
 
-    if arr.is_discrete():
-        numerator = exp(theta * arr.rho(theta=l_theta) * delta_time) * exp(
-            theta * sigma_l_arr_ser)
-        denominator = (1 - exp(l_theta * rho_l_arr_ser))**(1 / l_power)
+    if not rho_a_l < rho_s_l:
+        return out_of_bounds(
+            "The arrivals' rho {0} has to be smaller than the service's "
+            "rho {1}", rho_a_l, rho_s_l)
 
-    else:
-        numerator = exp(theta * arr.rho(theta=l_theta) *
-                        (delta_time + 1)) * exp(theta * sigma_l_arr_ser)
-        denominator = (1 - exp(l_theta * rho_l_arr_ser))**(1 / l_power)
+    sigma_l_arr_ser = arr.sigma(theta=l_theta) + ser.sigma(theta=l_theta)
+    rho_l_arr_ser = arr.rho(theta=l_theta) - ser.rho(theta=l_theta)
 
-    try:
-        return numerator / denominator
+    log_numerator = theta * (ser.rho(theta=l_theta) * delay + sigma_l_arr_ser)
+    log_denominator = log_one_minus_exp(l_theta * rho_l_arr_ser) / l_power
 
-    except ZeroDivisionError:
-        return inf
+    return log_numerator - log_denominator
 
 
 def delay_prob_power(arr: Arrival,
@@ -50,26 +103,93 @@ def delay_prob_power(arr: Arrival,
                      delay: int,
                      l_power=1.0) -> float:
     """Implements stationary bound method"""
-    if l_power < 1.0:
-        l_power = 1.0
-        # raise ParameterOutOfBounds("l must be >= 1")
+    return exp(
+        log_delay_prob_power(
+            arr=arr, ser=ser, theta=theta, delay=delay, l_power=l_power))
+
 
+@np.errstate(all="ignore")
+def log_output_power_array(arr: Arrival,
+                           ser: Service,
+                           theta: np.ndarray,
+                           delta_time: int,
+                           l_power=1.0) -> np.ndarray:
+    """Array version of log_output_power, inf for infeasible parameters"""
+    l_power = np.maximum(l_power, 1.0)
+
+    theta = as_float_array(theta)
     l_theta = l_power * theta
 
-    if arr.rho(theta=l_theta) >= ser.rho(theta=l_theta):
-        raise ParameterOutOfBounds(
-            f"The arrivals' rho {arr.rho(theta)} has to be smaller than"
-            f"the service's rho {ser.rho(theta)}")
+    rho_a_l = arr.rho_array(theta=l_theta)
+    rho_s_l = ser.rho_array(theta=l_theta)
 
-    sigma_l_arr_ser = arr.sigma(theta=l_theta) + ser.sigma(theta=l_theta)
-    rho_l_arr_ser = arr.rho(theta=l_theta) - ser.rho(theta=l_theta)
+    sigma_l_arr_ser = arr.sigma_array(theta=l_theta) + ser.sigma_array(
+        theta=l_theta)
+    rho_l_arr_ser = rho_a_l - rho_s_l
+
+    if arr.is_discrete():
+        log_numerator = theta * (rho_a_l * delta_time + sigma_l_arr_ser)
+
+    else:
+        log_numerator = theta * (rho_a_l * (delta_time + 1) + sigma_l_arr_ser)
+
+    log_denominator = log_one_minus_exp_array(
+        l_theta * rho_l_arr_ser) / l_power
+    res = log_numerator - log_denominator
+
+    return np.where((rho_a_l < rho_s_l) & ~np.isnan(res), res, inf)
+
+
+@np.errstate(all="ignore")
+def output_power_array(arr: Arrival,
+                       ser: Service,
+                       theta: np.ndarray,
+                       delta_time: int,
+                       l_power=1.0) -> np.ndarray:
+    """Array version of output_power, inf for infeasible parameters"""
+    return np.exp(
+        log_output_power_array(
+            arr=arr,
+            ser=ser,
+            theta=theta,
+            delta_time=delta_time,
+            l_power=l_power))
+
+
+@np.errstate(all="ignore")
+def log_delay_prob_power_array(arr: Arrival,
+                               ser: Service,
+                               theta: np.ndarray,
+                               delay: int,
+                               l_power=1.0) -> np.ndarray:
+    """Array version of log_delay_prob_power, inf for infeasible parameters"""
+    l_power = np.maximum(l_power, 1.0)
+
+    theta = as_float_array(theta)
+    l_theta = l_power * theta
+
+    rho_a_l = arr.rho_array(theta=l_theta)
+    rho_s_l = ser.rho_array(theta=l_theta)
+
+    sigma_l_arr_ser = arr.sigma_array(theta=l_theta) + ser.sigma_array(
+        theta=l_theta)
+    rho_l_arr_ser = rho_a_l - rho_s_l
+
+    log_numerator = theta * (rho_s_l * delay + sigma_l_arr_ser)
+    log_denominator = log_one_minus_exp_array(
+        l_theta * rho_l_arr_ser) / l_power
+    res = log_numerator - log_denominator
 
-    numerator = exp(theta * ser.rho(theta=l_theta) * delay) * exp(
-        theta * sigma_l_arr_ser)
-    denominator = (1 - exp(l_theta * rho_l_arr_ser))**(1 / l_power)
+    return np.where((rho_a_l < rho_s_l) & ~np.isnan(res), res, inf)
 
-    try:
-        return numerator / denominator
 
-    except ZeroDivisionError:
-        return inf
+@np.errstate(all="ignore")
+def delay_prob_power_array(arr: Arrival,
+                           ser: Service,
+                           theta: np.ndarray,
+                           delay: int,
+                           l_power=1.0) -> np.ndarray:
+    """Array version of delay_prob_power, inf for infeasible parameters"""
+    return np.exp(
+        log_delay_prob_power_array(
+            arr=arr, ser=ser, theta=theta, delay=delay, l_power=l_power))
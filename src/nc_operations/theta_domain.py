@@ -0,0 +1,131 @@
+"""Feasible theta intervals of arrivals, services and their operations"""
+
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+# thetas beyond are not searched for a stability boundary
+THETA_MAX = 1000.0
+
+
+def scale_domain(domain: Tuple[float, float],
+                 factor: float) -> Tuple[float, float]:
+    """
+    :param domain: open interval (lower, upper) of a node evaluated at
+                   factor * theta
+    :param factor: e.g. Hoelder p or Lyapunov l
+    :return:       corresponding interval for theta
+    """
+    return domain[0] / factor, domain[1] / factor
+
+
+def intersect_domains(
+        domain_list: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """
+    :param domain_list: list of open intervals (lower, upper)
+    :return:            their intersection, empty if lower >= upper
+    """
+    lower = max(float(np.max(domain[0])) for domain in domain_list)
+    upper = min(float(np.min(domain[1])) for domain in domain_list)
+
+    return lower, upper
+
+
+def stable_domain(domain: Tuple[float, float],
+                  rho_arr: Callable[[np.ndarray], np.ndarray],
+                  rho_ser: Callable[[np.ndarray], np.ndarray],
+                  number_points=64,
+                  number_refinements=5) -> Tuple[float, float]:
+    """
+    Shrinks the domain to the thetas with rho_arr(theta) < rho_ser(theta).
+    The stable set is assumed to be an interval. It is located on a
+    geometric grid and both ends are refined at once on linear grids
+    between the last unstable and the first stable theta.
+
+    :param domain:             open interval (lower, upper)
+    :param rho_arr:            arrival's rho for an array of thetas,
+                               nan if out of bounds
+    :param rho_ser:            service's rho for an array of thetas,
+                               nan if out of bounds
+    :param number_points:      size of the grids
+    :param number_refinements: number of linear grids at each end, each
+                               shrinks the bracket by number_points - 1
+    :return:                   stable open interval, empty if lower >= upper
+    """
+    lower, upper = domain
+
+    if lower >= upper:
+        return domain
+
+    def is_stable(theta: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            # nan compares to False
+            return rho_arr(theta) < rho_ser(theta)
+
+    grid_lower = max(lower, THETA_MAX * 1e-9)
+    grid_upper = min(upper, THETA_MAX)
+    theta_grid = np.geomspace(grid_lower, grid_upper, number_points)
+    # stay inside the open interval
+    theta_grid = theta_grid[(theta_grid > lower) & (theta_grid < upper)]
+
+    stable_index = np.flatnonzero(is_stable(theta_grid))
+
+    if stable_index.size == 0:
+        return lower, lower
+
+    first = stable_index[0]
+    last = stable_index[-1]
+
+    # brackets of an unstable and a stable theta at the ends to refine
+    unstable = []
+    stable = []
+    if first > 0:
+        unstable.append(theta_grid[first - 1])
+        stable.append(theta_grid[first])
+    if last < theta_grid.size - 1:
+        unstable.append(theta_grid[last + 1])
+        stable.append(theta_grid[last])
+
+    if unstable:
+        unstable = np.array(unstable)
+        stable = np.array(stable)
+        fractions = np.linspace(0.0, 1.0, number_points)[1:-1]
+        ends = np.arange(unstable.size)
+
+        for _ in range(number_refinements):
+            theta_fine = unstable[:, np.newaxis] + np.outer(
+                stable - unstable, fractions)
+            stable_fine = is_stable(theta_fine)
+            # first stable theta seen from the unstable end, the last
+            # index stands for the stable end of the bracket
+            index = np.where(
+                np.any(stable_fine, axis=1), np.argmax(stable_fine, axis=1),
+                fractions.size)
+
+            stable = np.where(
+                index < fractions.size,
+                theta_fine[ends, np.minimum(index, fractions.size - 1)],
+                stable)
+            unstable = np.where(index > 0, theta_fine[ends, index - 1],
+                                unstable)
+
+        if first > 0:
+            lower = unstable[0]
+        if last < theta_grid.size - 1:
+            upper = unstable[-1]
+
+    return float(lower), float(upper)
+
+
+def single_hop_domain(foi, s_net) -> Tuple[float, float]:
+    """
+    :param foi:   flow of interest (Arrival)
+    :param s_net: its network service (Service)
+    :return:      open theta interval in which the single hop bounds are
+                  feasible
+    """
+    return stable_domain(
+        domain=intersect_domains([foi.theta_domain(),
+                                  s_net.theta_domain()]),
+        rho_arr=foi.rho_array,
+        rho_ser=s_net.rho_array)
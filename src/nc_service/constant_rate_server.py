@@ -1,7 +1,13 @@
 """Implemented service classes for different distributions"""
 
+from math import nan
+
+import numpy as np
+
 from nc_service.service import Service
-from utils.exceptions import ParameterOutOfBounds
+from utils.batch import Batch, as_population
+from utils.dual import as_float_array
+from utils.exceptions import out_of_bounds
 
 
 class ConstantRate(Service):
@@ -13,16 +19,35 @@ class ConstantRate(Service):
     def sigma(self, theta=0.0) -> float:
         # TODO: remove the sign constraints later
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         return 0.0
 
     def rho(self, theta: float) -> float:
         # TODO: remove the sign constraints later
         if theta <= 0:
-            raise ParameterOutOfBounds(f"theta = {theta} must be > 0")
+            return out_of_bounds("theta = {0} must be > 0", theta)
 
         return self.rate
 
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        return np.where(theta > 0, 0.0, nan)
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        theta = as_float_array(theta)
+
+        return np.where(theta > 0, self.rate, nan)
+
     def to_value(self, number=1):
         return "rate{0}={1}".format(str(number), str(self.rate))
+
+
+class ConstantRateBatch(Batch, ConstantRate):
+    """Population of constant rate services"""
+
+    def __init__(self, rate: np.ndarray) -> None:
+        rate, = as_population(rate)
+        super().__init__(rate=rate)
+        self.population_size = rate.size
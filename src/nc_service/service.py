@@ -1,6 +1,12 @@
 """Implemented service class"""
 
 from abc import abstractmethod
+from math import inf
+from typing import Tuple
+
+import numpy as np
+
+from utils.helper_functions import apply_elementwise
 
 
 class Service(object):
@@ -15,3 +21,15 @@ class Service(object):
     def rho(self, theta: float) -> float:
         """Rho method"""
         pass
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        """Sigma method for an array of thetas, nan if out of bounds"""
+        return apply_elementwise(fun=self.sigma, theta=theta)
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        """Rho method for an array of thetas, nan if out of bounds"""
+        return apply_elementwise(fun=self.rho, theta=theta)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        """Open interval of thetas, in which sigma and rho are feasible"""
+        return 0.0, inf
@@ -1,12 +1,12 @@
 """Class for all service processes that cannot be described via (sigma, rho)"""
 from math import exp
 
-from utils.exceptions import ParameterOutOfBounds
+from utils.exceptions import out_of_bounds
 
 
 def mgf_const_rate(theta: float, delta_time: int, rate: float) -> float:
     if theta <= 0:
-        raise ParameterOutOfBounds("theta = {0} must be > 0".format(theta))
+        return out_of_bounds("theta = {0} must be > 0", theta)
 
     return exp(-theta * rate * delta_time)
 
@@ -0,0 +1,213 @@
+"""Registry of exact and semi-analytic optimal thetas of single hop
+settings, keyed by (arrival class, service class, performance metric)"""
+
+from math import log1p
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from nc_arrivals.arrival_distribution import ArrivalDistribution
+from nc_arrivals.qt import DM1, MM1
+from nc_arrivals.regulated_arrivals import TokenBucketConstant
+from nc_operations.perform_enum import PerformEnum
+from nc_service.constant_rate_server import ConstantRate
+from utils.perform_parameter import PerformParameter
+
+ANALYTIC_THETA: Dict[tuple, Callable[..., float]] = {}
+
+# metrics of the form exp(c * theta) * exp(k * theta * rho_a(theta))
+# / (1 - exp(theta * (rho_a(theta) - rate))), whose logarithm is convex
+CONVEX_METRICS = [
+    PerformEnum.BACKLOG_PROB, PerformEnum.DELAY_PROB, PerformEnum.OUTPUT
+]
+
+
+def register(arrival_class: type, service_class: type,
+             metric_list: List[PerformEnum]) -> Callable:
+    """Decorator that registers an optimal theta for each metric"""
+
+    def decorator(theta_fun: Callable[..., float]) -> Callable[..., float]:
+        for metric in metric_list:
+            ANALYTIC_THETA[(arrival_class, service_class, metric)] = theta_fun
+
+        return theta_fun
+
+    return decorator
+
+
+def analytic_theta(setting, lower: float, upper: float) -> Optional[float]:
+    """
+    :param setting: e.g. SingleServerPerform, only single hops with an
+                    arrival arr and a service ser can be registered
+    :param lower:   lower theta, inside the feasible theta interval
+    :param upper:   upper theta, inside the feasible theta interval
+    :return:        optimal theta in [lower, upper], None if the setting
+                    is not registered
+    """
+    try:
+        key = (type(setting.arr), type(setting.ser),
+               setting.perform_param.perform_metric)
+    except AttributeError:
+        return None
+
+    theta_fun = ANALYTIC_THETA.get(key)
+    if theta_fun is None:
+        return None
+
+    return float(
+        theta_fun(
+            arr=setting.arr,
+            ser=setting.ser,
+            perform_param=setting.perform_param,
+            lower=lower,
+            upper=upper))
+
+
+def _log_bound_coefficients(arr: ArrivalDistribution,
+                            ser: ConstantRate,
+                            perform_param: PerformParameter) -> tuple:
+    """
+    :return: c and k of the log-bound
+             c * theta + k * theta * rho_a(theta)
+             - log(1 - exp(theta * (rho_a(theta) - rate)))
+             of the convex metrics, see performance_bounds
+    """
+    metric = perform_param.perform_metric
+    value = perform_param.value
+
+    if metric == PerformEnum.BACKLOG_PROB:
+        c, k = -value, 0.0
+    elif metric == PerformEnum.DELAY_PROB:
+        c, k = -ser.rate * value, 0.0
+    elif metric == PerformEnum.OUTPUT:
+        c, k = 0.0, value
+    else:
+        raise NameError(f"{metric} is not a convex performance metric")
+
+    if not arr.is_discrete():
+        # tau = 1
+        k += 1.0
+
+    # sigma_a has to be independent of theta
+    return c + arr.sigma(), k
+
+
+def _convex_theta(derivative: Callable[[float], float],
+                  lower: float,
+                  upper: float,
+                  number_bisections=60) -> float:
+    """
+    Minimum of a convex function in [lower, upper] by bisection on the sign
+    of its derivative. The derivative is nan where the bound is infeasible,
+    i.e. at theta = 0 or beyond the stability boundary, and is taken as its
+    limit -inf at the lower and +inf at the upper end.
+
+    :param derivative:        derivative of the log-bound
+    :param lower:             lower theta
+    :param upper:             upper theta
+    :param number_bisections: number of bisection steps
+    :return:                  optimal theta
+    """
+    with np.errstate(all="ignore"):
+        # nan compares to False
+        if derivative(lower) >= 0:
+            return lower
+        if derivative(upper) <= 0:
+            return upper
+
+        for _ in range(number_bisections):
+            middle = 0.5 * (lower + upper)
+            if derivative(middle) < 0:
+                lower = middle
+            else:
+                upper = middle
+
+    return 0.5 * (lower + upper)
+
+
+def _convex_log_bound_theta(arr: ArrivalDistribution, ser: ConstantRate,
+                            perform_param: PerformParameter, lower: float,
+                            upper: float,
+                            psi_prime: Callable[[float], float]) -> float:
+    """
+    :param psi_prime: derivative of psi(theta) = theta * rho_a(theta)
+    :return:          optimal theta of a convex metric
+    """
+    c, k = _log_bound_coefficients(
+        arr=arr, ser=ser, perform_param=perform_param)
+
+    def derivative(theta: float) -> float:
+        theta = np.float64(theta)
+        g = theta * (arr.rho_array(theta) - ser.rate)
+        g_prime = psi_prime(theta) - ser.rate
+
+        # the arrivals have to be stable
+        return np.where(g < 0,
+                        c + k * psi_prime(theta) + g_prime / np.expm1(-g),
+                        np.nan)
+
+    return _convex_theta(derivative=derivative, lower=lower, upper=upper)
+
+
+@register(TokenBucketConstant, ConstantRate, CONVEX_METRICS)
+def token_bucket_constant_rate(arr: TokenBucketConstant, ser: ConstantRate,
+                               perform_param: PerformParameter, lower: float,
+                               upper: float) -> float:
+    """
+    Exact: rho_a is independent of theta, so the log-bound is
+    (c + k * rho_a) * theta - log(1 - exp(-b * theta)) with
+    b = rate - rho_a.
+    """
+    c, k = _log_bound_coefficients(
+        arr=arr, ser=ser, perform_param=perform_param)
+    rho_a = arr.n * arr.rho_single
+    slope = c + k * rho_a
+    gap = ser.rate - rho_a
+
+    if slope <= 0:
+        # decreasing in theta
+        return upper
+
+    return min(max(log1p(gap / slope) / gap, lower), upper)
+
+
+@register(TokenBucketConstant, ConstantRate,
+          [PerformEnum.BACKLOG, PerformEnum.DELAY])
+def token_bucket_constant_rate_quantile(arr: TokenBucketConstant,
+                                        ser: ConstantRate,
+                                        perform_param: PerformParameter,
+                                        lower: float, upper: float) -> float:
+    """
+    Exact: the bound sigma_a - log(prob * (1 - exp(-b * theta))) / theta
+    decreases towards the deterministic bound sigma_a.
+    """
+    return upper
+
+
+@register(DM1, ConstantRate, CONVEX_METRICS)
+def dm1_constant_rate(arr: DM1, ser: ConstantRate,
+                      perform_param: PerformParameter, lower: float,
+                      upper: float) -> float:
+    """Semi-analytic: root of the closed form derivative"""
+    return _convex_log_bound_theta(
+        arr=arr,
+        ser=ser,
+        perform_param=perform_param,
+        lower=lower,
+        upper=upper,
+        psi_prime=lambda theta: arr.n / (arr.lamb - theta))
+
+
+@register(MM1, ConstantRate, CONVEX_METRICS)
+def mm1_constant_rate(arr: MM1, ser: ConstantRate,
+                      perform_param: PerformParameter, lower: float,
+                      upper: float) -> float:
+    """Semi-analytic: root of the closed form derivative"""
+    return _convex_log_bound_theta(
+        arr=arr,
+        ser=ser,
+        perform_param=perform_param,
+        lower=lower,
+        upper=upper,
+        psi_prime=lambda theta: arr.n * arr.lamb * arr.mu /
+        (arr.mu - theta)**2)
@@ -3,11 +3,19 @@ from enum import Enum
 
 class OptMethod(Enum):
     GRID_SEARCH = "GridSearch"
+    GRID_SEARCH_VEC = "GridSearchVec"
+    GRID_SEARCH_ADAPTIVE = "GridSearchAdaptive"
+    GRID_SEARCH_SEPARABLE = "GridSearchSeparable"
+    GRID_SEARCH_BATCH = "GridSearchBatch"
+    BRENT = "Brent"
     NELDER_MEAD = "NelderMead"
     PATTERN_SEARCH = "PatternSearch"
+    PATTERN_SEARCH_VEC = "PatternSearchVec"
     BASIN_HOPPING = "BasinHopping"
     SIMULATED_ANNEALING = "SimulatedAnnealing"
+    SIMULATED_ANNEALING_VEC = "SimulatedAnnealingVec"
     DIFFERENTIAL_EVOLUTION = "DifferentialEvolution"
     BFGS = "BFGS"
+    NEWTON_CG = "NewtonCG"
     GS_OLD = "GridSearchOld"
     NM_OLD = "NelderMeadOld"
@@ -1,44 +1,240 @@
 """Optimize theta and all Lyapunov l's"""
 
-from math import exp, inf
-from typing import List, Tuple
+from contextlib import nullcontext
+from functools import wraps
+from math import ceil, exp, inf, isnan
+from typing import Callable, List, Optional, Tuple
 from warnings import warn
 
 import numpy as np
 import pandas as pd
 import scipy.optimize
 
+from optimization.analytic_optimum import analytic_theta
 from optimization.nelder_mead_parameters import NelderMeadParameters
 from optimization.sim_anneal_param import SimAnnealParams
 from utils.deprecated import deprecated
-from utils.exceptions import ParameterOutOfBounds
+from utils.dual import Dual
+from utils.eval_context import EvalContext
+from utils.exceptions import ParameterOutOfBounds, get_out_of_bounds
 from utils.helper_functions import (
     average_towards_best_row, centroid_without_one_row, expand_grid, is_equal)
 from utils.setting import Setting
 
 
+def to_bound(method: Callable[..., float]) -> Callable[..., float]:
+    """Decorator for the optimization methods, which returns the bound of the
+    minimized objective, i.e., exp of the log-bound in the log domain"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs) -> float:
+        res = method(self, *args, **kwargs)
+
+        if not self.log_domain:
+            return res
+
+        with np.errstate(over="ignore", under="ignore"):
+            return float(np.exp(res))
+
+    return wrapper
+
+
 class Optimize(object):
     """Optimize class"""
 
-    def __init__(self, setting: Setting, print_x=False,
-                 show_warn=False) -> None:
+    def __init__(self,
+                 setting: Setting,
+                 print_x=False,
+                 show_warn=False,
+                 analytic=False,
+                 log_domain=False,
+                 clip_theta=False) -> None:
+        """
+
+        :param setting:    setting to optimize
+        :param print_x:    print the optimal parameters
+        :param show_warn:  warn if the optimum is on the boundary
+        :param analytic:   the theta-only searches with bounds first look up
+                           an exact optimum, see analytic_optimum
+        :param log_domain: minimize the log-bound, which does not overflow
+                           for large bounds; the methods still return the
+                           bound
+        :param clip_theta: the searches with bounds only search the
+                           setting's feasible theta interval, see
+                           clip_bound_list; grid_search_vec always does
+                           so for more than one parameter
+        """
         self.setting = setting
         self.print_x = print_x
         self.show_warn = show_warn
+        self.analytic = analytic
+        self.log_domain = log_domain
+        self.clip_theta = clip_theta
+        # only settings with shared subtrees gain from the cache
+        self.eval_context = EvalContext if setting.memoize else nullcontext
+        self.setting.prepare()
+        self._theta_domain: Tuple[float, float] = None
 
     def eval_except(self, param_list: List[float]) -> float:
         """
         Shortens the exception handling and case distinction in a small method.
 
         :param param_list: theta parameter and Lyapunov parameters l_i
-        :return:           function to_value
+        :return:           function to_value, the log-bound in the log domain
         """
 
         try:
-            return self.setting.bound(param_list=param_list)
+            with self.eval_context():
+                if self.log_domain:
+                    res = self.setting.log_evaluate(param_list=param_list)
+                else:
+                    res = self.setting.evaluate(param_list=param_list)
         except (FloatingPointError, OverflowError, ParameterOutOfBounds):
             return inf
 
+        # the guards return nan in the exception-free mode
+        return inf if isnan(res) else res
+
+    def eval_array(self, param_array: np.ndarray) -> np.ndarray:
+        """
+        Counterpart of eval_except for a whole array of parameters.
+
+        :param param_array: theta parameter and Lyapunov parameters l_i along
+                            the first axis
+        :return:            array of bounds (log-bounds in the log domain),
+                            inf if infeasible
+        """
+
+        with np.errstate(all="ignore"):
+            if self.log_domain:
+                res = self.setting.log_bound_array(param_array=param_array)
+            else:
+                res = self.setting.bound_array(param_array=param_array)
+
+        return np.where(np.isnan(res), inf, res)
+
+    def eval_grad(self, param_list: List[float]) -> Tuple[float, np.ndarray]:
+        """
+        Objective and its exact gradient, propagated by dual numbers through
+        the closed form array bounds, i.e., the setting has to implement
+        bound_array (new_bound_array for the Lyapunov bound).
+
+        :param param_list: theta parameter and Lyapunov parameters l_i
+        :return:           eval_except and its gradient, which is zero if
+                           the parameters are infeasible
+        """
+        if not self.has_array_bound():
+            # the columnwise fallback converts the dual numbers to floats
+            raise ValueError(
+                f"{self.setting.to_name()} has no closed form array bound, "
+                f"which the exact gradient needs, use finite differences, "
+                f"e.g., bfgs(jac=False)")
+
+        res = self.eval_array(param_array=Dual.variables(param_list))
+
+        if res.value == inf:
+            return inf, np.zeros(len(param_list))
+
+        return float(res.value), np.array(res.grad)
+
+    def has_array_bound(self) -> bool:
+        """
+        :return: True if the setting overrides bound_array with a closed
+                 form, False for the columnwise fallback of Setting
+        """
+        return type(self.setting).bound_array is not Setting.bound_array
+
+    @staticmethod
+    def set_floating_point_errors() -> None:
+        """
+        By default, numpy's floating point errors are raised and abort the
+        search. In the exception-free mode, see set_out_of_bounds, they are
+        ignored and the infeasible parameters evaluate to inf.
+        """
+        if get_out_of_bounds() == "raise":
+            np.seterr(all="raise")
+        else:
+            np.seterr(all="ignore")
+
+    def clip_bound_list(self,
+                        bound_list: List[Tuple[float, float]],
+                        delta=None,
+                        force=False) -> List[Tuple[float, float]]:
+        """
+        Clips the theta range, i.e., the first tuple, to the setting's
+        feasible theta interval if clip_theta is set. The interval is the
+        setting's theta_domain, which assumes that the stable thetas form a
+        single interval, see stable_domain. Otherwise the result can differ
+        from the unclipped search.
+
+        :param bound_list: list of tuples of lower and upper bounds
+        :param delta:      if given, the lower bound stays on the grid
+                           lower + k * delta
+        :param force:      clip regardless of clip_theta, for the searches
+                           that need a feasible bracket or, as
+                           grid_search_vec, gain from a smaller mesh
+        :return:           clipped bound list, lower >= upper if infeasible
+        """
+        if not (self.clip_theta or force):
+            return list(bound_list)
+
+        if self._theta_domain is None:
+            self._theta_domain = self.setting.theta_domain()
+
+        lower, upper = bound_list[0]
+        domain_lower, domain_upper = self._theta_domain
+
+        if domain_lower > lower:
+            if delta is None:
+                lower = domain_lower
+            else:
+                lower += ceil((domain_lower - lower) / delta) * delta
+
+        upper = min(upper, domain_upper)
+
+        return [(lower, upper)] + list(bound_list[1:])
+
+    def analytic_search(
+            self, bound_list: List[Tuple[float, float]]) -> Optional[float]:
+        """
+        Optimal theta from the registry of analytic optima.
+
+        :param bound_list: list with one tuple of lower and upper bound of
+                           theta
+        :return:           optimized bound, None if the setting has no
+                           analytic optimum or it cannot be evaluated
+        """
+        if len(bound_list) != 1:
+            return None
+
+        # the registry expects a feasible interval
+        bound_list = self.clip_bound_list(bound_list=bound_list, force=True)
+        if bound_list[0][0] >= bound_list[0][1]:
+            return inf
+
+        theta_opt = analytic_theta(
+            setting=self.setting,
+            lower=bound_list[0][0],
+            upper=bound_list[0][1])
+        if theta_opt is None:
+            return None
+
+        analytic_bound = self.eval_except(param_list=[theta_opt])
+        if analytic_bound == inf:
+            # e.g. an overflow of the scalar bound at a large theta
+            return None
+
+        if self.show_warn:
+            if (is_equal(theta_opt, bound_list[0][0])
+                    or is_equal(theta_opt, bound_list[0][1])):
+                warn(f"optimal x is on the boundary: {str(theta_opt)}")
+
+        if self.print_x:
+            print(f"analytic optimal x: {theta_opt}")
+
+        return analytic_bound
+
+    @to_bound
     def grid_search(self, bound_list: List[Tuple[float, float]],
                     delta: float) -> float:
         """
@@ -48,13 +244,26 @@ class Optimize(object):
         :param delta:      granularity of the grid search
         :return:           optimized bound
         """
+        if self.analytic:
+            analytic_bound = self.analytic_search(bound_list=bound_list)
+            if analytic_bound is not None:
+                return analytic_bound
+
+        clipped_list = self.clip_bound_list(
+            bound_list=bound_list, delta=delta)
+        if clipped_list[0][0] >= clipped_list[0][1]:
+            return inf
+
+        # brute fails for dimensions with a single grid point
+        if clipped_list[0][1] - clipped_list[0][0] > delta:
+            bound_list = clipped_list
 
         list_slices = [slice(0)] * len(bound_list)
 
         for i in range(len(bound_list)):
             list_slices[i] = slice(bound_list[i][0], bound_list[i][1], delta)
 
-        np.seterr("raise")
+        self.set_floating_point_errors()
 
         # grid_res = scipy.optimize.brute(
         #     func=self.eval_except, ranges=tuple(list_slices),
@@ -81,6 +290,348 @@ class Optimize(object):
 
         return grid_res[1]
 
+    @to_bound
+    def grid_search_vec(self,
+                        bound_list: List[Tuple[float, float]],
+                        delta: float,
+                        polish=True) -> float:
+        """
+        Grid search that evaluates the whole mesh in one array call.
+
+        :param bound_list: list of tuples of lower and upper bounds
+        :param delta:      granularity of the grid search
+        :param polish:     refine the grid optimum by nested grids, see
+                           _zoom_grid. It stays within about delta of the
+                           grid optimum, where the Nelder-Mead of scipy's
+                           brute may walk far out of bound_list
+        :return:           optimized bound
+        """
+        if self.analytic:
+            analytic_bound = self.analytic_search(bound_list=bound_list)
+            if analytic_bound is not None:
+                return analytic_bound
+
+        # a theta grid alone costs a single array call, the clipping pays
+        # off on meshes, whose infeasible thetas repeat for every l
+        bound_list = self.clip_bound_list(
+            bound_list=bound_list, delta=delta, force=len(bound_list) > 1)
+        if bound_list[0][0] >= bound_list[0][1]:
+            return inf
+
+        list_slices = [slice(0)] * len(bound_list)
+
+        for i in range(len(bound_list)):
+            list_slices[i] = slice(bound_list[i][0], bound_list[i][1], delta)
+
+        param_grid = np.mgrid[tuple(list_slices)]
+        bound_grid = self.eval_array(param_array=param_grid)
+
+        grid_index = np.unravel_index(
+            np.argmin(bound_grid, axis=None), bound_grid.shape)
+        x_grid = param_grid[(slice(None), ) + grid_index]
+        bound_grid_opt = bound_grid[grid_index]
+
+        if polish:
+            x_grid, bound_grid_opt = self._zoom_grid(
+                x_grid=x_grid, bound_grid_opt=bound_grid_opt, delta=delta)
+
+        return self._finish_grid(
+            x_grid=x_grid,
+            bound_grid_opt=bound_grid_opt,
+            bound_list=bound_list,
+            polish=False,
+            method_name="grid search vec")
+
+    @to_bound
+    def grid_search_adaptive(self,
+                             bound_list: List[Tuple[float, float]],
+                             delta: float,
+                             delta_coarse=0.5,
+                             zoom_factor=2,
+                             number_cells=3,
+                             polish=True) -> float:
+        """
+        Coarse-to-fine grid search: a coarse grid over the whole box, then
+        local grids around the number_cells best points, whose granularity
+        shrinks by zoom_factor per level down to delta. All granularities
+        are delta * zoom_factor**k, so every point lies on the grid of
+        grid_search_vec. Each local grid spans one cell of the previous
+        level to both sides, and moves instead of zooming in if its optimum
+        lies on its edge.
+
+        :param bound_list:   list of tuples of lower and upper bounds
+        :param delta:        final granularity
+        :param delta_coarse: maximal granularity of the first grid, axes
+                             narrower than zoom_factor * delta_coarse start
+                             finer
+        :param zoom_factor:  integer refinement per level
+        :param number_cells: number of local grids per level
+        :param polish:       refine the grid optimum by Nelder-Mead as
+                             scipy's brute does
+        :return:             optimized bound
+        """
+        if self.analytic:
+            analytic_bound = self.analytic_search(bound_list=bound_list)
+            if analytic_bound is not None:
+                return analytic_bound
+
+        bound_list = self.clip_bound_list(bound_list=bound_list, delta=delta)
+        if bound_list[0][0] >= bound_list[0][1]:
+            return inf
+
+        number_param = len(bound_list)
+        lower = np.array([bound[0] for bound in bound_list])
+        upper = np.array([bound[1] for bound in bound_list])
+
+        # granularity delta * scale per axis, with an integer scale
+        coarse = np.minimum(delta_coarse, (upper - lower) / zoom_factor)
+        scale = zoom_factor**np.floor(
+            np.log(np.maximum(coarse / delta, 1.0)) /
+            np.log(zoom_factor)).astype(int)
+
+        list_slices = [
+            slice(bound[0], bound[1], delta * scale_i)
+            for bound, scale_i in zip(bound_list, scale)
+        ]
+        param_grid = np.mgrid[tuple(list_slices)].reshape(number_param, -1)
+        bound_grid = self.eval_array(param_array=param_grid)
+
+        # integer offsets of a local grid, one column per point
+        offsets = np.mgrid[(slice(-zoom_factor, zoom_factor + 1), ) *
+                           number_param].reshape(number_param, -1)
+        number_offsets = offsets.shape[1]
+
+        while np.any(scale > 1):
+            scale = np.maximum(scale // zoom_factor, 1)
+            # stable, such that ties keep the first grid point as np.argmin
+            centers = param_grid[:, np.argsort(bound_grid, kind="stable")
+                                 [:number_cells]]
+            bound_opt = inf
+
+            while True:
+                param_local = np.clip(
+                    (centers[:, :, np.newaxis] +
+                     delta * scale[:, np.newaxis, np.newaxis] *
+                     offsets[:, np.newaxis, :]).reshape(number_param, -1),
+                    lower[:, np.newaxis], upper[:, np.newaxis])
+                bound_local = self.eval_array(param_array=param_local)
+                grid_index = np.argmin(bound_local)
+
+                if not bound_local[grid_index] < bound_opt:
+                    break
+                param_grid, bound_grid = param_local, bound_local
+                bound_opt = bound_grid[grid_index]
+
+                x_grid = param_grid[:, grid_index]
+                cell, offset = divmod(grid_index, number_offsets)
+                on_edge = ((np.abs(offsets[:, offset]) == zoom_factor) &
+                           (x_grid > lower) & (x_grid < upper))
+                if not np.any(on_edge):
+                    break
+
+                # the optimum may lie outside, move this local grid
+                centers[:, cell] = x_grid
+
+        grid_index = np.argmin(bound_grid)
+
+        return self._finish_grid(
+            x_grid=param_grid[:, grid_index],
+            bound_grid_opt=bound_grid[grid_index],
+            bound_list=bound_list,
+            polish=polish,
+            method_name="grid search adaptive")
+
+    @to_bound
+    def grid_search_separable(self,
+                              bound_list: List[Tuple[float, float]],
+                              delta: float,
+                              number_sweeps=3,
+                              polish=True) -> float:
+        """
+        Grid search over theta, where the remaining parameters are optimized
+        coordinate-wise for each theta. Each coordinate is a 1-D grid, so the
+        cost grows linearly in the number of parameters instead of
+        exponentially. Exact if the parameters only affect their own flow,
+        as the l's in FatCrossPerform.new_bound.
+
+        :param bound_list:    list of tuples of lower and upper bounds,
+                              theta first
+        :param delta:         granularity of the grid search
+        :param number_sweeps: maximal number of passes over all coordinates
+        :param polish:        refine the grid optimum by Nelder-Mead as
+                              scipy's brute does
+        :return:              optimized bound
+        """
+        bound_list = self.clip_bound_list(bound_list=bound_list, delta=delta)
+        if bound_list[0][0] >= bound_list[0][1]:
+            return inf
+
+        theta_grid = np.mgrid[slice(bound_list[0][0], bound_list[0][1],
+                                    delta)]
+
+        # current best parameters per theta, start at the lower bounds
+        x_theta = np.empty((len(bound_list), theta_grid.size))
+        x_theta[0] = theta_grid
+        for i in range(1, len(bound_list)):
+            x_theta[i] = bound_list[i][0]
+
+        bound_theta = self.eval_array(param_array=x_theta)
+
+        for _sweep in range(number_sweeps):
+            bound_previous = bound_theta
+
+            for i in range(1, len(bound_list)):
+                coordinate_grid = np.mgrid[slice(bound_list[i][0],
+                                                 bound_list[i][1], delta)]
+
+                # axis 1: theta, axis 2: coordinate i
+                param_array = np.repeat(
+                    x_theta[:, :, np.newaxis], coordinate_grid.size, axis=2)
+                param_array[i] = coordinate_grid
+                bound_grid = self.eval_array(param_array=param_array)
+
+                coordinate_index = np.argmin(bound_grid, axis=1)
+                x_theta[i] = coordinate_grid[coordinate_index]
+                bound_theta = bound_grid[np.arange(theta_grid.size),
+                                         coordinate_index]
+
+            if np.array_equal(bound_theta, bound_previous):
+                break
+
+        theta_index = np.argmin(bound_theta)
+
+        return self._finish_grid(
+            x_grid=x_theta[:, theta_index],
+            bound_grid_opt=bound_theta[theta_index],
+            bound_list=bound_list,
+            polish=polish,
+            method_name="grid search separable")
+
+    @to_bound
+    def brent(self, bound_list: List[Tuple[float, float]],
+              xatol=1e-5) -> float:
+        """
+        Bounded Brent search (golden section with parabolic steps) on the
+        log-bound for the standard bound, i.e., theta only. The log-bound is
+        convex on the feasible theta interval, which brackets the search.
+
+        :param bound_list: list with one tuple of lower and upper bound of
+                           theta
+        :param xatol:      absolute tolerance in theta
+        :return:           optimized bound
+        """
+        if self.analytic:
+            analytic_bound = self.analytic_search(bound_list=bound_list)
+            if analytic_bound is not None:
+                return analytic_bound
+
+        bound_list = self.clip_bound_list(bound_list=bound_list, force=True)
+        if bound_list[0][0] >= bound_list[0][1]:
+            return inf
+
+        def log_bound(theta: float) -> float:
+            if self.log_domain:
+                return self.eval_except(param_list=[theta])
+
+            with np.errstate(divide="ignore"):
+                return np.log(self.eval_except(param_list=[theta]))
+
+        brent_res = scipy.optimize.minimize_scalar(
+            fun=log_bound,
+            bounds=bound_list[0],
+            method="bounded",
+            options={"xatol": xatol})
+
+        if self.show_warn:
+            if (is_equal(brent_res.x, bound_list[0][0])
+                    or is_equal(brent_res.x, bound_list[0][1])):
+                warn(f"optimal x is on the boundary: {str(brent_res.x)}")
+
+        if self.print_x:
+            print(f"Brent optimal x: {brent_res.x}")
+
+        return self.eval_except(param_list=[brent_res.x])
+
+    def _zoom_grid(self,
+                   x_grid: np.ndarray,
+                   bound_grid_opt: float,
+                   delta: float,
+                   xatol=1e-4,
+                   max_points=2**10) -> Tuple[np.ndarray, float]:
+        """
+        Polishes the grid optimum by nested grids: each level evaluates the
+        neighboring cells of the best point so far in one eval_array call,
+        with up to max_points points, until the granularity is below xatol.
+        A single parameter takes one level.
+
+        :param x_grid:         optimal parameters on the grid
+        :param bound_grid_opt: bound at x_grid
+        :param delta:          granularity of the grid search
+        :param xatol:          absolute tolerance of the parameters
+        :param max_points:     cap on the points per level
+        :return:               polished parameters and their bound
+        """
+        number_steps = max(
+            2, int(round(max_points**(1 / len(x_grid)))) // 2 - 1)
+        offsets = np.arange(-number_steps, number_steps + 1) / number_steps
+
+        while delta > xatol:
+            param_zoom = np.stack(
+                np.meshgrid(*[x + delta * offsets for x in x_grid],
+                            indexing="ij")).reshape(len(x_grid), -1)
+            bound_zoom = self.eval_array(param_array=param_zoom)
+
+            index_opt = np.argmin(bound_zoom)
+            if bound_zoom[index_opt] < bound_grid_opt:
+                x_grid = param_zoom[:, index_opt]
+                bound_grid_opt = bound_zoom[index_opt]
+
+            delta /= number_steps
+
+        return x_grid, bound_grid_opt
+
+    def _finish_grid(self, x_grid: np.ndarray, bound_grid_opt: float,
+                     bound_list: List[Tuple[float, float]], polish: bool,
+                     method_name: str) -> float:
+        """
+        Polishes the grid optimum and checks the boundary.
+
+        :param x_grid:         optimal parameters on the grid
+        :param bound_grid_opt: bound at x_grid
+        :param bound_list:     list of tuples of lower and upper bounds
+        :param polish:         refine the grid optimum by Nelder-Mead
+        :param method_name:    name for print_x
+        :return:               optimized bound
+        """
+        if polish:
+            self.set_floating_point_errors()
+
+            try:
+                fmin_res = scipy.optimize.fmin(
+                    func=self.eval_except,
+                    x0=x_grid,
+                    full_output=True,
+                    disp=False)
+
+            except FloatingPointError:
+                return inf
+
+        else:
+            fmin_res = (x_grid, bound_grid_opt)
+
+        if self.show_warn:
+            for i in range(len(bound_list)):
+                if (is_equal(fmin_res[0][i], bound_list[i][0])
+                        or is_equal(fmin_res[0][i], bound_list[i][1])):
+                    warn(
+                        f"optimal x is on the boundary: {str(fmin_res[0][i])}")
+
+        if self.print_x:
+            print(f"{method_name} optimal x: {fmin_res[0].tolist()}")
+
+        return fmin_res[1]
+
+    @to_bound
     def pattern_search(self,
                        start_list: List[float],
                        delta=3.0,
@@ -139,6 +690,56 @@ class Optimize(object):
 
         return optimum_new
 
+    @to_bound
+    def pattern_search_vec(self,
+                           start_list: List[float],
+                           delta=3.0,
+                           delta_min=0.01) -> float:
+        """
+        Hooke and Jeeves with a parallel poll step: all moves +-delta along
+        each coordinate and the pattern move are evaluated in one eval_array
+        call and the best improving move is accepted.
+
+        :param start_list: list of starting values
+        :param delta:      initial granularity
+        :param delta_min:  final granularity
+        :return:           optimized bound
+        """
+        param_current = np.array(start_list, dtype=float)
+        number_param = param_current.size
+        optimum_current = self.eval_array(
+            param_array=param_current[:, np.newaxis])[0]
+
+        # rows: +delta and -delta along each coordinate
+        directions = np.vstack(
+            (np.eye(number_param), -np.eye(number_param)))
+        last_step = np.zeros(number_param)
+
+        while delta > delta_min:
+            candidates = param_current + delta * directions
+            if np.any(last_step):
+                # pattern move: repeat the last successful step
+                candidates = np.vstack(
+                    (candidates, param_current + last_step))
+
+            # parameters along the first axis
+            candidate_values = self.eval_array(param_array=candidates.T)
+            best_index = np.argmin(candidate_values)
+
+            if candidate_values[best_index] < optimum_current:
+                last_step = candidates[best_index] - param_current
+                param_current = candidates[best_index]
+                optimum_current = candidate_values[best_index]
+            else:
+                last_step = np.zeros(number_param)
+                delta *= 0.5
+
+        if self.print_x:
+            print(f"pattern search vec optimal x: {param_current.tolist()}")
+
+        return float(optimum_current)
+
+    @to_bound
     def nelder_mead(self, simplex: np.ndarray, sd_min=10**(-2)) -> float:
         """
         Nelder-Mead optimization from the sciPy package.
@@ -148,7 +749,7 @@ class Optimize(object):
                             become very small)
         :return:            optimized bound
         """
-        np.seterr("raise")
+        self.set_floating_point_errors()
         try:
             nm_res = scipy.optimize.minimize(
                 self.eval_except,
@@ -167,6 +768,7 @@ class Optimize(object):
 
         return nm_res.fun
 
+    @to_bound
     def basin_hopping(self, start_list: List[float]) -> float:
         """
         Basin Hopping optimization from the sciPy package.
@@ -186,6 +788,7 @@ class Optimize(object):
 
         return bh_res.fun
 
+    @to_bound
     def sim_annealing(self, start_list: List[float],
                       sim_anneal_params: SimAnnealParams) -> float:
         """
@@ -245,35 +848,166 @@ class Optimize(object):
 
         return optimum_best
 
-    def diff_evolution(self, bound_list: List[tuple]) -> float:
+    @to_bound
+    def sim_annealing_vec(self,
+                          start_list: List[float],
+                          sim_anneal_params: SimAnnealParams,
+                          number_chains=64,
+                          seed=None) -> float:
+        """
+        Simulated annealing with independent chains in lockstep: each step
+        proposes one neighbor per chain and evaluates them in one eval_array
+        call, see search_feasible_neighbors for the infeasible ones. A chain
+        freezes after a sweep of rep_max proposals without a move, as in
+        sim_annealing. An eval_array call costs about as much as a dozen
+        eval_except calls, so the chains pay off in numbers.
+
+        :param start_list:        initial parameter set of all chains
+        :param sim_anneal_params: object that contains all the simulated
+                                  annealing-parameters and helper methods
+        :param number_chains:     number of chains
+        :param seed:              seed for reproducible runs
+        :return:                  optimized bound, best across the chains
+        """
+        rng = np.random.default_rng(seed)
+        param_array = np.tile(
+            np.array(start_list, dtype=float)[:, np.newaxis],
+            (1, number_chains))
+        optimum_current = self.eval_array(param_array=param_array)
+
+        param_best = param_array[:, 0].copy()
+        optimum_best = optimum_current[0]
+
+        temperature = sim_anneal_params.temp_start
+        rep_max = sim_anneal_params.rep_max
+        search_radius = sim_anneal_params.search_radius
+
+        active = np.full(number_chains, True)
+
+        while np.any(active):
+            objective_change = np.full(number_chains, False)
+            random_numbers = rng.uniform(size=(rep_max, number_chains))
+
+            for iteration in range(rep_max):
+                chains = np.flatnonzero(active)
+                param_new, optimum_new = \
+                    sim_anneal_params.search_feasible_neighbors(
+                        objective_array=self.eval_array,
+                        param_array=param_array[:, chains],
+                        search_radius=search_radius,
+                        rng=rng)
+
+                with np.errstate(all="ignore"):
+                    # inf - inf is nan, which is never accepted
+                    accept = (optimum_new < optimum_current[chains]) | (
+                        np.exp((optimum_current[chains] - optimum_new) /
+                               temperature) >
+                        random_numbers[iteration, chains])
+
+                chains = chains[accept]
+                param_array[:, chains] = param_new[:, accept]
+                optimum_current[chains] = optimum_new[accept]
+                objective_change[chains] = True
+
+                best_chain = np.argmin(optimum_current)
+                if optimum_current[best_chain] < optimum_best:
+                    param_best = param_array[:, best_chain].copy()
+                    optimum_best = optimum_current[best_chain]
+
+            active &= objective_change
+            temperature *= sim_anneal_params.cooling_factor
+
+        if self.print_x:
+            print(f"simulated annealing vec optimal x: {param_best.tolist()}")
+
+        return float(optimum_best)
+
+    @to_bound
+    def diff_evolution(self,
+                       bound_list: List[tuple],
+                       popsize=15,
+                       workers=1,
+                       seed=None,
+                       vectorized=True) -> float:
         """
         Differential Evolution optimization from the sciPy package.
 
         :param bound_list: list of tuples of lower and upper bounds
+        :param popsize:    multiplier of the population size
+        :param workers:    number of processes that evaluate a generation,
+                           requires vectorized=False
+        :param seed:       seed for reproducible runs
+        :param vectorized: evaluate a whole generation in one eval_array
+                           call. The population is then updated once per
+                           generation (updating="deferred") instead of
+                           after every member as scipy's default, so the
+                           search differs from vectorized=False
         :return:           optimized bound
         """
-        np.seterr("raise")
-
-        try:
-            de_res = scipy.optimize.differential_evolution(
-                func=self.eval_except, bounds=bound_list)
+        if vectorized and workers != 1:
+            raise ValueError(
+                f"workers={workers} requires vectorized=False, a vectorized "
+                f"generation is evaluated in a single call")
 
-        except FloatingPointError:
+        bound_list = self.clip_bound_list(bound_list=bound_list)
+        if bound_list[0][0] >= bound_list[0][1]:
             return inf
 
+        if vectorized:
+            # the generation is passed with the parameters along the first
+            # axis, as eval_array expects; infeasible members are inf, so
+            # floating point errors, e.g. inf - inf in the polishing step,
+            # must not abort the search
+            with np.errstate(all="ignore"):
+                de_res = scipy.optimize.differential_evolution(
+                    func=self.eval_array,
+                    bounds=bound_list,
+                    popsize=popsize,
+                    seed=seed,
+                    updating="deferred",
+                    vectorized=True)
+
+        else:
+            self.set_floating_point_errors()
+
+            try:
+                de_res = scipy.optimize.differential_evolution(
+                    func=self.eval_except,
+                    bounds=bound_list,
+                    popsize=popsize,
+                    seed=seed,
+                    updating="immediate" if workers == 1 else "deferred",
+                    workers=workers)
+
+            except FloatingPointError:
+                return inf
+
         if self.print_x:
             print(f"Differential Evolution optimal x: {de_res.x}")
 
         return de_res.fun
 
-    def bfgs(self, start_list: list) -> float:
+    @to_bound
+    def bfgs(self, start_list: list, jac=False) -> float:
+        """
+        BFGS optimization from the sciPy package.
+
+        :param start_list: initial guess
+        :param jac:        use the exact gradient of eval_grad instead of
+                           finite differences
+        :return:           optimized bound
+        """
         x0 = np.array(start_list)
 
-        np.seterr("raise")
+        self.set_floating_point_errors()
 
         try:
-            bfgs_res = scipy.optimize.minimize(
-                fun=self.eval_except, x0=x0, method="BFGS")
+            if jac:
+                bfgs_res = scipy.optimize.minimize(
+                    fun=self.eval_grad, x0=x0, method="BFGS", jac=True)
+            else:
+                bfgs_res = scipy.optimize.minimize(
+                    fun=self.eval_except, x0=x0, method="BFGS")
 
         except FloatingPointError:
             return inf
@@ -283,7 +1017,34 @@ class Optimize(object):
 
         return bfgs_res.fun
 
+    @to_bound
+    def newton_cg(self, start_list: list) -> float:
+        """
+        Newton-CG optimization from the sciPy package with the exact
+        gradient of eval_grad. The Hessian-vector products are finite
+        differences of the exact gradient.
+
+        :param start_list: initial guess
+        :return:           optimized bound
+        """
+        x0 = np.array(start_list, dtype=float)
+
+        self.set_floating_point_errors()
+
+        try:
+            newton_res = scipy.optimize.minimize(
+                fun=self.eval_grad, x0=x0, method="Newton-CG", jac=True)
+
+        except FloatingPointError:
+            return inf
+
+        if self.print_x:
+            print(f"Newton-CG optimal x: {newton_res.x}")
+
+        return newton_res.fun
+
     @deprecated
+    @to_bound
     def grid_search_old(self, bound_list: List[Tuple[float, float]],
                         delta: float) -> float:
         """
@@ -333,6 +1094,7 @@ class Optimize(object):
         return y_opt
 
     @deprecated
+    @to_bound
     def nelder_mead_old(self,
                         simplex: np.ndarray,
                         nelder_mead_param: NelderMeadParameters,
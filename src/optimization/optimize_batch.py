@@ -0,0 +1,207 @@
+"""Grid search for a whole population of settings at once"""
+
+from math import inf
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.setting_new import SettingNew
+
+
+class OptimizeBatch(object):
+    """
+    Optimizes every member of a population of settings, i.e. a setting that
+    is built from batch arrivals and services (see utils/batch.py). Its
+    array bounds are evaluated on the grid with a trailing population axis,
+    so the mesh is shared by all members and only reduced at the end.
+    """
+
+    def __init__(self,
+                 setting: SettingNew,
+                 new=False,
+                 max_elements=2**16,
+                 log_domain=False) -> None:
+        """
+
+        :param setting:      setting of batch arrivals and services, plain
+                             settings are a population of size 1
+        :param new:          optimize the Lyapunov bound instead of the
+                             standard one
+        :param max_elements: cap on grid points times population size per
+                             array call
+        :param log_domain:   minimize the log-bound, see Optimize
+        """
+        self.setting = setting
+        self.new = new
+        self.max_elements = max_elements
+        self.log_domain = log_domain
+
+    def eval_array(self, param_array: np.ndarray) -> np.ndarray:
+        """
+        :param param_array: theta parameter and Lyapunov parameters l_i along
+                            the first axis, the population along the last
+        :return:            array of bounds (log-bounds in the log domain),
+                            inf if infeasible
+        """
+        with np.errstate(all="ignore"):
+            if self.new and self.log_domain:
+                res = self.setting.log_new_bound_array(
+                    param_l_array=param_array)
+            elif self.new:
+                res = self.setting.new_bound_array(param_l_array=param_array)
+            elif self.log_domain:
+                res = self.setting.log_bound_array(param_array=param_array)
+            else:
+                res = self.setting.bound_array(param_array=param_array)
+
+        return np.where(np.isnan(res), inf, res)
+
+    def grid_search(self,
+                    bound_list: List[Tuple[float, float]],
+                    delta: float,
+                    polish=True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Same mesh as Optimize.grid_search_vec, the optimum of each member is
+        polished by nelder_mead.
+
+        :param bound_list: list of tuples of lower and upper bounds
+        :param delta:      granularity of the grid search
+        :param polish:     refine the grid optima by Nelder-Mead as
+                           scipy's brute does
+        :return:           optimal bound of each member and its parameters,
+                           of shapes (population, ) and
+                           (parameters, population)
+        """
+        list_slices = [
+            slice(lower, upper, delta) for lower, upper in bound_list
+        ]
+        param_grid = np.mgrid[tuple(list_slices)].reshape(len(bound_list), -1)
+        number_points = param_grid.shape[1]
+
+        # the first call also tells the population size
+        bound_opt = self.eval_array(param_array=param_grid[:, :1, None])[0]
+        index_opt = np.zeros(bound_opt.shape, dtype=int)
+        chunk_size = max(1, self.max_elements // bound_opt.size)
+
+        for first in range(1, number_points, chunk_size):
+            bound_chunk = self.eval_array(
+                param_array=param_grid[:, first:first + chunk_size, None])
+            index_chunk = np.argmin(bound_chunk, axis=0)
+            bound_chunk = np.min(bound_chunk, axis=0)
+
+            # ties keep the first grid point as np.argmin
+            better = bound_chunk < bound_opt
+            bound_opt = np.where(better, bound_chunk, bound_opt)
+            index_opt = np.where(better, index_chunk + first, index_opt)
+
+        param_opt = param_grid[:, index_opt]
+        if polish:
+            bound_opt, param_opt = self.nelder_mead(
+                start_array=param_opt, bound_start=bound_opt)
+
+        if self.log_domain:
+            with np.errstate(over="ignore", under="ignore"):
+                bound_opt = np.exp(bound_opt)
+
+        return bound_opt, param_opt
+
+    def nelder_mead(self,
+                    start_array: np.ndarray,
+                    bound_start: np.ndarray,
+                    xatol=1e-4,
+                    fatol=1e-4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        scipy.optimize.fmin for every member at once: same initial simplex,
+        coefficients and stopping rules, but each iteration evaluates the
+        reflection, expansion and both contractions of all members in one
+        array call. Converged members and members without a feasible
+        vertex are frozen.
+
+        :param start_array: parameters along the first axis, the population
+                            along the second
+        :param bound_start: objective at start_array, of shape (population, )
+        :param xatol:       absolute tolerance of the parameters
+        :param fatol:       absolute tolerance of the objective
+        :return:            minimal objective (not exponentiated in the log
+                            domain) of each member and its parameters
+        """
+        number_param = start_array.shape[0]
+        max_calls = 200 * number_param
+        param_index = np.arange(number_param)
+
+        # simplex of shape (vertices, parameters, population)
+        simplex = np.repeat(start_array[None], number_param + 1, axis=0)
+        vertices = simplex[param_index + 1, param_index]
+        simplex[param_index + 1, param_index] = np.where(
+            vertices != 0, 1.05 * vertices, 0.00025)
+
+        bound_simplex = np.empty(simplex.shape[::2])
+        bound_simplex[0] = bound_start
+        bound_simplex[1:] = self.eval_array(
+            param_array=np.moveaxis(simplex[1:], 0, 1))
+        number_calls = np.full(bound_start.shape, number_param + 1)
+
+        with np.errstate(all="ignore"):
+            for _ in range(1, max_calls):
+                order = np.argsort(bound_simplex, axis=0)
+                bound_simplex = np.take_along_axis(bound_simplex, order, 0)
+                simplex = np.take_along_axis(simplex, order[:, None, :], 0)
+
+                # fmin would not stop for a simplex without a feasible
+                # vertex, as inf - inf is nan, and gain nothing
+                running = (number_calls < max_calls) & np.isfinite(
+                    bound_simplex[0]) & ~(
+                        (np.max(np.abs(simplex[1:] - simplex[0]),
+                                axis=(0, 1)) <= xatol) &
+                        (np.max(np.abs(bound_simplex[0] - bound_simplex[1:]),
+                                axis=0) <= fatol))
+                if not np.any(running):
+                    break
+
+                centroid = np.mean(simplex[:-1], axis=0)
+                worst = simplex[-1]
+                # reflection, expansion, outside and inside contraction
+                candidates = np.stack(
+                    (2.0 * centroid - worst, 3.0 * centroid - 2.0 * worst,
+                     1.5 * centroid - 0.5 * worst,
+                     0.5 * centroid + 0.5 * worst),
+                    axis=1)
+                bound_cand = self.eval_array(param_array=candidates)
+
+                b_refl, b_exp, b_out, b_in = bound_cand
+                expand = b_refl < bound_simplex[0]
+                reflect = ~expand & (b_refl < bound_simplex[-2])
+                outside = ~expand & ~reflect & (b_refl < bound_simplex[-1])
+                inside = ~expand & ~reflect & ~outside
+
+                choice = np.select(
+                    [expand & (b_exp < b_refl), expand | reflect,
+                     outside & (b_out <= b_refl),
+                     inside & (b_in < bound_simplex[-1])], [1, 0, 2, 3],
+                    default=-1)
+                shrink = running & (choice == -1)
+                replace = running & ~shrink
+                choice = np.maximum(choice, 0)
+
+                member = np.arange(choice.size)
+                simplex[-1] = np.where(replace,
+                                       candidates[:, choice, member], worst)
+                bound_simplex[-1] = np.where(replace, bound_cand[choice,
+                                                                 member],
+                                             bound_simplex[-1])
+                number_calls += running.astype(int) + (running & ~reflect)
+
+                if np.any(shrink):
+                    shrunk = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+                    bound_shrunk = self.eval_array(
+                        param_array=np.moveaxis(shrunk, 0, 1))
+                    simplex[1:] = np.where(shrink, shrunk, simplex[1:])
+                    bound_simplex[1:] = np.where(shrink, bound_shrunk,
+                                                 bound_simplex[1:])
+                    number_calls += number_param * shrink
+
+            index_min = np.argmin(bound_simplex, axis=0)
+
+        member = np.arange(index_min.size)
+        return (bound_simplex[index_min, member],
+                simplex[index_min, :, member].T)
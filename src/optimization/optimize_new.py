@@ -1,6 +1,6 @@
 """Optimize theta and all Lyapunov l's"""
 
-from math import inf
+from math import inf, isnan
 from typing import List
 
 import numpy as np
@@ -19,8 +19,15 @@ class OptimizeNew(Optimize):
                  setting_new: SettingNew,
                  new=True,
                  print_x=False,
-                 show_warn=False) -> None:
-        super().__init__(setting_new, print_x, show_warn)
+                 show_warn=False,
+                 log_domain=False,
+                 clip_theta=False) -> None:
+        super().__init__(
+            setting_new,
+            print_x,
+            show_warn,
+            log_domain=log_domain,
+            clip_theta=clip_theta)
         self.setting_bound = setting_new
         self.new = new
         self.print_x = print_x
@@ -31,20 +38,71 @@ class OptimizeNew(Optimize):
         Shortens the exception handling and case distinction in a small method.
 
         :param param_list: theta parameter and Lyapunov parameters l_i
-        :return:           function to_value
+        :return:           function to_value, the log-bound in the log domain
         """
 
         if self.new:
             try:
-                return self.setting_bound.new_bound(param_l_list=param_list)
+                with self.eval_context():
+                    if self.log_domain:
+                        res = self.setting_bound.log_new_evaluate(
+                            param_l_list=param_list)
+                    else:
+                        res = self.setting_bound.new_evaluate(
+                            param_l_list=param_list)
             except (ParameterOutOfBounds, OverflowError):
                 return inf
         else:
             try:
-                return self.setting_bound.bound(param_list=param_list)
+                with self.eval_context():
+                    if self.log_domain:
+                        res = self.setting_bound.log_evaluate(
+                            param_list=param_list)
+                    else:
+                        res = self.setting_bound.evaluate(
+                            param_list=param_list)
             except (ParameterOutOfBounds, OverflowError):
                 return inf
 
+        # the guards return nan in the exception-free mode
+        return inf if isnan(res) else res
+
+    def has_array_bound(self) -> bool:
+        """
+        :return: True if the setting overrides the array bound that is
+                 optimized with a closed form, see Optimize.has_array_bound
+        """
+        if not self.new:
+            return super().has_array_bound()
+
+        return (type(self.setting_bound).new_bound_array
+                is not SettingNew.new_bound_array)
+
+    def eval_array(self, param_array: np.ndarray) -> np.ndarray:
+        """
+        Counterpart of eval_except for a whole array of parameters.
+
+        :param param_array: theta parameter and Lyapunov parameters l_i along
+                            the first axis
+        :return:            array of bounds (log-bounds in the log domain),
+                            inf if infeasible
+        """
+
+        with np.errstate(all="ignore"):
+            if self.new and self.log_domain:
+                res = self.setting_bound.log_new_bound_array(
+                    param_l_array=param_array)
+            elif self.new:
+                res = self.setting_bound.new_bound_array(
+                    param_l_array=param_array)
+            elif self.log_domain:
+                res = self.setting_bound.log_bound_array(
+                    param_array=param_array)
+            else:
+                res = self.setting_bound.bound_array(param_array=param_array)
+
+        return np.where(np.isnan(res), inf, res)
+
 
 if __name__ == '__main__':
     from fat_tree.fat_cross_perform import FatCrossPerform
@@ -62,3 +62,67 @@ class SimAnnealParams(object):
             value = objective(param_list=param_new)
 
         return param_new
+
+    @staticmethod
+    def change_param_random_array(param_array: np.ndarray,
+                                  search_radius: float,
+                                  rng: np.random.Generator) -> np.ndarray:
+        """
+        Find new parameters inside of a given radius for several chains.
+
+        :param param_array:     parameters along the first axis, the chains
+                                along the last
+        :param search_radius:   search radius
+        :param rng:             random generator of the draws
+        :return:                changed parameters
+        """
+        return param_array + rng.uniform(
+            low=-search_radius, high=search_radius, size=param_array.shape)
+
+    def search_feasible_neighbors(self,
+                                  objective_array: Callable,
+                                  param_array: np.ndarray,
+                                  search_radius: float,
+                                  rng: np.random.Generator,
+                                  number_draws=10) -> tuple:
+        """
+        Search for feasible neighbors of all chains at once: each chain draws
+        one proposal. Only the chains with an infeasible one draw again, all
+        their redraws are evaluated in a second call and the first feasible
+        one is kept.
+
+        :param objective_array: function to be optimized on a whole array of
+                                parameters
+        :param param_array:     parameters along the first axis, the chains
+                                along the last
+        :param search_radius:   search radius
+        :param rng:             random generator of the draws
+        :param number_draws:    proposals per chain, a chain without a
+                                feasible one keeps the value inf
+        :return:                neighbor parameter sets and their values
+        """
+        param_new = self.change_param_random_array(
+            param_array=param_array, search_radius=search_radius, rng=rng)
+        values = objective_array(param_array=param_new)
+
+        chains = np.flatnonzero(values == inf)
+        if chains.size == 0 or number_draws < 2:
+            return param_new, values
+
+        number_param = param_array.shape[0]
+        redraws = self.change_param_random_array(
+            param_array=np.repeat(
+                param_array[:, np.newaxis, chains], number_draws - 1, axis=1),
+            search_radius=search_radius,
+            rng=rng)
+        redraw_values = objective_array(
+            param_array=redraws.reshape(number_param, -1)).reshape(
+                number_draws - 1, chains.size)
+
+        # argmax finds the first feasible redraw, or the first one if none
+        first_feasible = np.argmax(redraw_values < inf, axis=0)
+        columns = np.arange(chains.size)
+        param_new[:, chains] = redraws[:, first_feasible, columns]
+        values[chains] = redraw_values[first_feasible, columns]
+
+        return param_new, values
@@ -1,17 +1,20 @@
 """Compare with alternative traffic description"""
 
 import csv
+from functools import partial
 from math import exp, inf, log, nan
 from multiprocessing import Process
 from typing import List
 
 import numpy as np
 import scipy.optimize
-from tqdm import tqdm
 
 from bound_evaluation.array_to_results import three_col_array_to_results
 from bound_evaluation.mc_enum import MCEnum
+from bound_evaluation.mc_enum_to_dist import mc_enum_to_dist
+from bound_evaluation.mc_parallel import mc_parallel
 from bound_evaluation.monte_carlo_dist import MonteCarloDist
+from bound_evaluation.stability_filter import stable_rows
 from nc_arrivals.arrival_enum import ArrivalEnum
 from nc_arrivals.arrivals_alternative import expect_dm1
 from nc_arrivals.qt import DM1
@@ -232,91 +235,126 @@ def delay_prob_sample_exp_dm1_opt(t: int,
     return grid_res[1]
 
 
-def csv_single_param_exp_lower(start_time: int,
-                               perform_param: PerformParameter,
-                               mc_dist: MonteCarloDist,
-                               sample=False) -> dict:
-    total_iterations = 10**2
-    valid_iterations = total_iterations
-    metric = "relative"
-    sample_size = 10**3
+def draw_exp_lower_param(mc_dist: MonteCarloDist,
+                         size: (int, int),
+                         rng: np.random.Generator,
+                         start=0,
+                         qmc_rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Draws lamb and rate as mc_enum_to_dist, but the exponential parameter
+    of this study is the scale, i.e. the expectation, instead of the rate.
+    """
+    if mc_dist.mc_enum == MCEnum.EXPONENTIAL:
+        mc_dist = MonteCarloDist(
+            mc_enum=MCEnum.EXPONENTIAL,
+            param_list=[1 / mc_dist.param_list[0]],
+            sample_enum=mc_dist.sample_enum)
+    elif mc_dist.mc_enum != MCEnum.UNIFORM:
+        raise NameError("Distribution parameter {0} is infeasible".format(
+            mc_dist.mc_enum))
 
-    delta = 0.05
+    return mc_enum_to_dist(
+        mc_dist=mc_dist, size=size, rng=rng, start=start, qmc_rng=qmc_rng)
 
-    size_array = [total_iterations, 2]
-    # [rows, columns]
 
-    if mc_dist.mc_enum == MCEnum.UNIFORM:
-        param_array = np.random.uniform(
-            low=0, high=mc_dist.param_list[0], size=size_array)
-    elif mc_dist.mc_enum == MCEnum.EXPONENTIAL:
-        param_array = np.random.exponential(
-            scale=mc_dist.param_list[0], size=size_array)
-    else:
-        raise NameError("Distribution parameter {0} is infeasible".format(
-            mc_dist.mc_enum))
+def exp_lower_row(param_row: np.ndarray, start_time: int,
+                  perform_param: PerformParameter, delta: float,
+                  sample: bool, sample_size: int) -> tuple:
+    """Standard, power and exp bound for one row of Monte Carlo parameters,
+    followed by the sampled ones if sample is True"""
+    res = np.empty(3)
+    res_sample = np.full(3, nan)
 
-    res_array = np.empty([total_iterations, 3])
-    if sample:
-        res_array_sample = np.empty([total_iterations, 3])
+    setting = SingleServerPerform(
+        arr=DM1(lamb=param_row[0]),
+        const_rate=ConstantRate(rate=param_row[1]),
+        perform_param=perform_param)
 
-    for i in tqdm(range(total_iterations)):
-        setting = SingleServerPerform(
-            arr=DM1(lamb=param_array[i, 0]),
-            const_rate=ConstantRate(rate=param_array[i, 1]),
-            perform_param=perform_param)
+    theta_bounds = [(0.1, 4.0)]
+    bound_array = theta_bounds[:]
 
-        theta_bounds = [(0.1, 4.0)]
-        bound_array = theta_bounds[:]
+    res[0] = Optimize(setting=setting).grid_search(
+        bound_list=bound_array, delta=delta)
 
-        res_array[i, 0] = Optimize(setting=setting).grid_search(
-            bound_list=bound_array, delta=delta)
+    bound_array_power = theta_bounds[:]
+    bound_array_power.append((0.9, 4.0))
 
-        bound_array_power = theta_bounds[:]
-        bound_array_power.append((0.9, 4.0))
+    res[1] = OptimizeNew(setting_new=setting).grid_search(
+        bound_list=bound_array_power, delta=delta)
 
-        res_array[i, 1] = OptimizeNew(setting_new=setting).grid_search(
-            bound_list=bound_array_power, delta=delta)
+    if perform_param.perform_metric == PerformEnum.DELAY_PROB:
+        res[2] = delay_prob_lower_exp_dm1_opt(
+            t=start_time,
+            delay=perform_param.value,
+            lamb=param_row[0],
+            rate=param_row[1])
 
-        if perform_param.perform_metric == PerformEnum.DELAY_PROB:
-            res_array[i, 2] = delay_prob_lower_exp_dm1_opt(
+        if sample:
+            res_sample[0] = res[0]
+            res_sample[1] = res[1]
+            res_sample[2] = delay_prob_sample_exp_dm1_opt(
                 t=start_time,
                 delay=perform_param.value,
-                lamb=param_array[i, 0],
-                rate=param_array[i, 1])
-
-            if sample:
-                res_array_sample[i, 0] = res_array[i, 0]
-                res_array_sample[i, 1] = res_array[i, 1]
-                res_array_sample[i, 2] = delay_prob_sample_exp_dm1_opt(
-                    t=start_time,
-                    delay=perform_param.value,
-                    lamb=param_array[i, 0],
-                    rate=param_array[i, 1],
-                    sample_size=sample_size)
-
-            if res_array[i, 0] > 1.0:
-                res_array[i, ] = nan
-                if sample:
-                    res_array_sample[i, ] = nan
-
-        elif perform_param.perform_metric == PerformEnum.OUTPUT:
-            res_array[i, 2] = output_lower_exp_dm1_opt(
-                s=start_time,
-                delta_time=perform_param.value,
-                lamb=param_array[i, 0],
-                rate=param_array[i, 1])
-
-        else:
-            raise NameError("{0} is an infeasible performance metric".format(
-                perform_param.perform_metric))
-
-        if (res_array[i, 1] == inf or res_array[i, 2] == inf
-                or res_array[i, 0] == nan or res_array[i, 1] == nan
-                or res_array[i, 2] == nan):
-            res_array[i, ] = nan
-            res_array_sample[i, ] = nan
-            valid_iterations -= 1
+                lamb=param_row[0],
+                rate=param_row[1],
+                sample_size=sample_size)
+
+        if res[0] > 1.0:
+            res[:] = nan
+            res_sample[:] = nan
+
+    elif perform_param.perform_metric == PerformEnum.OUTPUT:
+        res[2] = output_lower_exp_dm1_opt(
+            s=start_time,
+            delta_time=perform_param.value,
+            lamb=param_row[0],
+            rate=param_row[1])
+
+    else:
+        raise NameError("{0} is an infeasible performance metric".format(
+            perform_param.perform_metric))
+
+    if res[1] == inf or res[2] == inf or np.any(np.isnan(res)):
+        res[:] = nan
+        res_sample[:] = nan
+
+    return np.concatenate((res, res_sample))
+
+
+def csv_single_param_exp_lower(start_time: int,
+                               perform_param: PerformParameter,
+                               mc_dist: MonteCarloDist,
+                               sample=False,
+                               seed=None,
+                               processes=None) -> dict:
+    total_iterations = 10**2
+    metric = "relative"
+    sample_size = 10**3
+
+    delta = 0.05
+
+    _param_array, res_both = mc_parallel(
+        row_fun=partial(
+            exp_lower_row,
+            start_time=start_time,
+            perform_param=perform_param,
+            delta=delta,
+            sample=sample,
+            sample_size=sample_size),
+        draw_fun=partial(draw_exp_lower_param, mc_dist=mc_dist),
+        total_iterations=total_iterations,
+        number_columns=2,
+        number_results=6,
+        seed=seed,
+        chunk_size=10,
+        processes=processes,
+        filter_fun=partial(
+            stable_rows, arrival_enum=ArrivalEnum.DM1, number_servers=1))
+
+    res_array = res_both[:, :3]
+    res_array_sample = res_both[:, 3:]
+    valid_iterations = total_iterations - int(
+        np.sum(np.any(np.isnan(res_array), axis=1)))
 
     # print("exponential results", res_array[:, 2])
 
@@ -335,21 +373,6 @@ def csv_single_param_exp_lower(start_time: int,
         "MCParam": mc_dist.param_to_string()
     })
 
-    res_dict_sample = three_col_array_to_results(
-        arrival_enum=ArrivalEnum.DM1,
-        res_array=res_array_sample,
-        valid_iterations=valid_iterations,
-        metric=metric)
-
-    res_dict_sample.update({
-        "iterations": total_iterations,
-        "delta_time": perform_param.value,
-        "optimization": "grid_search",
-        "metric": "relative",
-        "MCDistribution": mc_dist.to_name(),
-        "MCParam": mc_dist.param_to_string()
-    })
-
     with open(
             "lower_single_{0}_DM1_results_MC{1}_power_exp.csv".format(
                 perform_param.to_name(), mc_dist.to_name()), 'w') as csv_file:
@@ -357,6 +380,21 @@ def csv_single_param_exp_lower(start_time: int,
         for key, value in res_dict.items():
             writer.writerow([key, value])
     if sample:
+        res_dict_sample = three_col_array_to_results(
+            arrival_enum=ArrivalEnum.DM1,
+            res_array=res_array_sample,
+            valid_iterations=valid_iterations,
+            metric=metric)
+
+        res_dict_sample.update({
+            "iterations": total_iterations,
+            "delta_time": perform_param.value,
+            "optimization": "grid_search",
+            "metric": "relative",
+            "MCDistribution": mc_dist.to_name(),
+            "MCParam": mc_dist.param_to_string()
+        })
+
         with open(
                 "sample_single_{0}_DM1_results_MC{1}_power_exp.csv".format(
                     perform_param.to_name(), mc_dist.to_name()),
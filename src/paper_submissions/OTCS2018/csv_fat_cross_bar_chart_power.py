@@ -37,8 +37,11 @@ def csv_bar_chart(ar_list: List[ArrivalDistribution],
             ser_list=ser_list_copy,
             perform_param=perform_param)
 
+        # identical cross flows share one l
         standard_bound, new_bound = compute_improvement(
-            setting=large_setting, opt_method=opt_method, number_l=i)
+            setting=large_setting,
+            opt_method=opt_method,
+            number_l=len(large_setting.cross_groups))
 
         if new_bound >= 1:
             warn("new bound = {0} is >= 1".format(new_bound))
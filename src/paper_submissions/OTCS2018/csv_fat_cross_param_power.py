@@ -1,25 +1,32 @@
 """Compute optimal and average improvement for different parameters."""
 
 import csv
-from math import nan
+from functools import partial
+from math import inf, isnan, nan
 
 import numpy as np
-from tqdm import tqdm
 
-from bound_evaluation.array_to_results import two_col_array_to_results
-from bound_evaluation.compare_old_new import compute_improvement
+from bound_evaluation.array_to_results import TwoColAggregator
+from bound_evaluation.compare_old_new import (compute_improvement,
+                                              compute_improvement_batch)
 from bound_evaluation.mc_enum import MCEnum
 from bound_evaluation.mc_enum_to_dist import mc_enum_to_dist
+from bound_evaluation.mc_parallel import mc_adaptive
 from bound_evaluation.monte_carlo_dist import MonteCarloDist
+from bound_evaluation.stability_filter import stable_rows
 from fat_tree.fat_cross_perform import FatCrossPerform
 from nc_arrivals.arrival_enum import ArrivalEnum
+from nc_arrivals.batch_arrivals import (DM1Batch, EBBBatch,
+                                        LeakyBucketMassOneBatch, MD1Batch,
+                                        MMOOFluidBatch,
+                                        TokenBucketConstantBatch)
 from nc_arrivals.ebb import EBB
 from nc_arrivals.markov_modulated import MMOOFluid
 from nc_arrivals.qt import DM1, MD1
 from nc_arrivals.regulated_arrivals import (LeakyBucketMassOne,
                                             TokenBucketConstant)
 from nc_operations.perform_enum import PerformEnum
-from nc_service.constant_rate_server import ConstantRate
+from nc_service.constant_rate_server import ConstantRate, ConstantRateBatch
 from optimization.opt_method import OptMethod
 from utils.perform_parameter import PerformParameter
 
@@ -28,123 +35,260 @@ from utils.perform_parameter import PerformParameter
 ########################################################################
 
 
-def csv_fat_cross_param_power(arrival_enum: ArrivalEnum, number_servers: int,
+def fat_cross_improvement_row(param_row: np.ndarray,
+                              arrival_enum: ArrivalEnum, number_servers: int,
+                              perform_param: PerformParameter,
+                              opt_method: OptMethod) -> tuple:
+    """Standard and new bound for one row of Monte Carlo parameters."""
+    if arrival_enum == ArrivalEnum.DM1:
+        arrive_list = [DM1(lamb=param_row[j]) for j in range(number_servers)]
+
+    elif arrival_enum == ArrivalEnum.MD1:
+        arrive_list = [
+            MD1(lamb=param_row[j],
+                mu=1 / (param_row[arrival_enum.number_parameters() *
+                                  number_servers + j]))
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.MMOO:
+        arrive_list = [
+            MMOOFluid(
+                mu=param_row[j],
+                lamb=param_row[number_servers + j],
+                burst=param_row[2 * number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.EBB:
+        arrive_list = [
+            EBB(factor_m=param_row[j],
+                decay=param_row[number_servers + j],
+                rho_single=param_row[2 * number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.MassOne:
+        arrive_list = [
+            LeakyBucketMassOne(
+                sigma_single=param_row[j],
+                rho_single=param_row[number_servers + j],
+                n=20) for j in range(number_servers)
+        ]
+        # TODO: note that n is fixed
+
+    elif arrival_enum == ArrivalEnum.TBConst:
+        arrive_list = [
+            TokenBucketConstant(
+                sigma_single=param_row[j],
+                rho_single=param_row[number_servers + j],
+                n=1) for j in range(number_servers)
+        ]
+
+    else:
+        raise NameError("Arrival parameter {0} is infeasible".format(
+            arrival_enum.name))
+
+    if arrival_enum == ArrivalEnum.MD1 or arrival_enum == ArrivalEnum.MM1:
+        service_list = [ConstantRate(rate=1.0) for j in range(number_servers)]
+    else:
+        service_list = [
+            ConstantRate(rate=param_row[arrival_enum.number_parameters() *
+                                        number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    setting = FatCrossPerform(
+        arr_list=arrive_list,
+        ser_list=service_list,
+        perform_param=perform_param)
+
+    standard_bound, new_bound = compute_improvement(
+        setting=setting, opt_method=opt_method, number_l=number_servers - 1)
+
+    if perform_param.perform_metric == PerformEnum.DELAY_PROB:
+        if new_bound > 1.0:
+            return nan, nan
+
+    # a row is invalid if any of its bounds is nan
+    if isnan(standard_bound) or isnan(new_bound):
+        return nan, nan
+
+    return standard_bound, new_bound
+
+
+def fat_cross_improvement_rows(param_chunk: np.ndarray,
+                               arrival_enum: ArrivalEnum, number_servers: int,
+                               perform_param: PerformParameter) -> np.ndarray:
+    """Standard and new bound for all rows of Monte Carlo parameters at
+    once, see compute_improvement_batch."""
+    if arrival_enum == ArrivalEnum.DM1:
+        arrive_list = [
+            DM1Batch(lamb=param_chunk[:, j]) for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.MD1:
+        arrive_list = [
+            MD1Batch(
+                lamb=param_chunk[:, j],
+                mu=1 / (param_chunk[:, arrival_enum.number_parameters() *
+                                    number_servers + j]))
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.MMOO:
+        arrive_list = [
+            MMOOFluidBatch(
+                mu=param_chunk[:, j],
+                lamb=param_chunk[:, number_servers + j],
+                burst=param_chunk[:, 2 * number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.EBB:
+        arrive_list = [
+            EBBBatch(
+                factor_m=param_chunk[:, j],
+                decay=param_chunk[:, number_servers + j],
+                rho_single=param_chunk[:, 2 * number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.MassOne:
+        arrive_list = [
+            LeakyBucketMassOneBatch(
+                sigma_single=param_chunk[:, j],
+                rho_single=param_chunk[:, number_servers + j],
+                n=20) for j in range(number_servers)
+        ]
+
+    elif arrival_enum == ArrivalEnum.TBConst:
+        arrive_list = [
+            TokenBucketConstantBatch(
+                sigma_single=param_chunk[:, j],
+                rho_single=param_chunk[:, number_servers + j],
+                n=1) for j in range(number_servers)
+        ]
+
+    else:
+        raise NameError("Arrival parameter {0} is infeasible".format(
+            arrival_enum.name))
+
+    if arrival_enum == ArrivalEnum.MD1 or arrival_enum == ArrivalEnum.MM1:
+        service_list = [ConstantRate(rate=1.0) for j in range(number_servers)]
+    else:
+        service_list = [
+            ConstantRateBatch(
+                rate=param_chunk[:, arrival_enum.number_parameters() *
+                                 number_servers + j])
+            for j in range(number_servers)
+        ]
+
+    setting = FatCrossPerform(
+        arr_list=arrive_list,
+        ser_list=service_list,
+        perform_param=perform_param)
+
+    res_chunk = compute_improvement_batch(
+        setting=setting, number_l=number_servers - 1)
+
+    if perform_param.perform_metric == PerformEnum.DELAY_PROB:
+        res_chunk[res_chunk[:, 1] > 1.0] = nan
+
+    # a row is invalid if any of its bounds is nan
+    res_chunk[np.any(np.isnan(res_chunk), axis=1)] = nan
+
+    return res_chunk
+
+
+def csv_fat_cross_param_power(arrival_enum: ArrivalEnum,
+                              number_servers: int,
                               perform_param: PerformParameter,
                               opt_method: OptMethod,
-                              mc_dist: MonteCarloDist) -> dict:
-    """Chooses parameters by Monte Carlo type random choice."""
-    total_iterations = 10**4
-    valid_iterations = total_iterations
+                              mc_dist: MonteCarloDist,
+                              seed=None,
+                              processes=None,
+                              checkpoint_dir=None,
+                              width_mean=None,
+                              width_share=None,
+                              batch_size=500,
+                              prefilter=True,
+                              resample=False) -> dict:
+    """Chooses parameters by Monte Carlo type random choice. With a seed
+    and a checkpoint_dir, an interrupted run resumes from its finished
+    shards. If width_mean or width_share is given, batches are run until
+    the 95% confidence intervals of "mean improvement" and "share
+    improved" are narrower, with at most 10**4 iterations. Unstable rows
+    are skipped if prefilter is True and replaced if resample is True.
+    GRID_SEARCH_BATCH optimizes all rows of a shard at once."""
+    max_iterations = 10**4
     metric = "relative"
+    adaptive = width_mean is not None or width_share is not None
 
-    size_array = [
-        total_iterations,
-        (arrival_enum.number_parameters() + 1) * number_servers
-        # const_rate has 1 parameter
-    ]
-    # [rows, columns]
-
-    param_array = mc_enum_to_dist(mc_dist=mc_dist, size=size_array)
-
-    res_array = np.empty([total_iterations, 2])
-
-    # print(res_array)
-
-    for i in tqdm(range(total_iterations), total=total_iterations):
-        if arrival_enum == ArrivalEnum.DM1:
-            arrive_list = [
-                DM1(lamb=param_array[i, j]) for j in range(number_servers)
-            ]
-
-        elif arrival_enum == ArrivalEnum.MD1:
-            arrive_list = [
-                MD1(lamb=param_array[i, j],
-                    mu=1 / (param_array[i,
-                                        arrival_enum.number_parameters() *
-                                        number_servers + j]))
-                for j in range(number_servers)
-            ]
-
-        elif arrival_enum == ArrivalEnum.MMOO:
-            arrive_list = [
-                MMOOFluid(
-                    mu=param_array[i, j],
-                    lamb=param_array[i, number_servers + j],
-                    burst=param_array[i, 2 * number_servers + j])
-                for j in range(number_servers)
-            ]
-
-        elif arrival_enum == ArrivalEnum.EBB:
-            arrive_list = [
-                EBB(factor_m=param_array[i, j],
-                    decay=param_array[i, number_servers + j],
-                    rho_single=param_array[i, 2 * number_servers + j])
-                for j in range(number_servers)
-            ]
-
-        elif arrival_enum == ArrivalEnum.MassOne:
-            arrive_list = [
-                LeakyBucketMassOne(
-                    sigma_single=param_array[i, j],
-                    rho_single=param_array[i, number_servers + j],
-                    n=20) for j in range(number_servers)
-            ]
-            # TODO: note that n is fixed
-
-        elif arrival_enum == ArrivalEnum.TBConst:
-            arrive_list = [
-                TokenBucketConstant(
-                    sigma_single=param_array[i, j],
-                    rho_single=param_array[i, number_servers + j],
-                    n=1) for j in range(number_servers)
-            ]
-
-        else:
-            raise NameError("Arrival parameter {0} is infeasible".format(
-                arrival_enum.name))
-
-        if arrival_enum == ArrivalEnum.MD1 or arrival_enum == ArrivalEnum.MM1:
-            service_list = [
-                ConstantRate(rate=1.0) for j in range(number_servers)
-            ]
-        else:
-            service_list = [
-                ConstantRate(
-                    rate=param_array[i,
-                                     arrival_enum.number_parameters() *
-                                     number_servers + j])
-                for j in range(number_servers)
-            ]
-
-        setting = FatCrossPerform(
-            arr_list=arrive_list,
-            ser_list=service_list,
-            perform_param=perform_param)
-
-        # print(res_array[i, ])
-
-        # standard_bound, new_bound = compute_improvement()
-        res_array[i, 0], res_array[i, 1] = compute_improvement(
-            setting=setting,
-            opt_method=opt_method,
-            number_l=number_servers - 1)
-
-        if perform_param.perform_metric == PerformEnum.DELAY_PROB:
-            if res_array[i, 1] > 1.0:
-                res_array[i, ] = nan
-
-        if res_array[i, 0] == nan or res_array[i, 1] == nan:
-            res_array[i, ] = nan
-            valid_iterations -= 1
-
-    res_dict = two_col_array_to_results(
+    aggregator = TwoColAggregator(
         arrival_enum=arrival_enum,
-        param_array=param_array,
-        res_array=res_array,
         number_servers=number_servers,
-        valid_iterations=valid_iterations,
         metric=metric)
 
+    def stop_fun() -> bool:
+        return adaptive and aggregator.is_precise(
+            width_mean=inf if width_mean is None else width_mean,
+            width_share=inf if width_share is None else width_share)
+
+    vectorized = opt_method == OptMethod.GRID_SEARCH_BATCH
+
+    if vectorized:
+        row_fun = partial(
+            fat_cross_improvement_rows,
+            arrival_enum=arrival_enum,
+            number_servers=number_servers,
+            perform_param=perform_param)
+    else:
+        row_fun = partial(
+            fat_cross_improvement_row,
+            arrival_enum=arrival_enum,
+            number_servers=number_servers,
+            perform_param=perform_param,
+            opt_method=opt_method)
+
+    # the shards are aggregated and dropped as they arrive
+    total_iterations = mc_adaptive(
+        update_fun=lambda start, param_chunk, res_chunk: aggregator.update(
+            param_chunk=param_chunk, res_chunk=res_chunk, start=start),
+        stop_fun=stop_fun,
+        row_fun=row_fun,
+        draw_fun=partial(mc_enum_to_dist, mc_dist=mc_dist),
+        max_iterations=max_iterations,
+        number_columns=(arrival_enum.number_parameters() + 1) *
+        number_servers,
+        # const_rate has 1 parameter
+        number_results=2,
+        batch_size=batch_size if adaptive else max_iterations,
+        seed=seed,
+        processes=processes,
+        checkpoint_dir=checkpoint_dir,
+        filter_fun=partial(
+            stable_rows,
+            arrival_enum=arrival_enum,
+            number_servers=number_servers,
+            n=20 if arrival_enum == ArrivalEnum.MassOne else 1)
+        if prefilter else None,
+        resample=resample,
+        vectorized=vectorized,
+        config={
+            "study": "fat_cross_param_power",
+            "arrival": arrival_enum.name,
+            "number_servers": number_servers,
+            "perform_param": perform_param.to_name_value(),
+            "opt_method": opt_method.name,
+            "mc_dist": mc_dist.to_name(),
+            "mc_param": mc_dist.param_to_string(),
+            "prefilter": prefilter,
+            "resample": resample
+        })
+
+    res_dict = aggregator.results()
+
     res_dict.update({
         "iterations": total_iterations,
         "T": perform_param.value,
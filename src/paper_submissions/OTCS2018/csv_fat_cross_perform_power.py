@@ -40,27 +40,29 @@ def fat_cross_df(arr_list: List[ArrivalDistribution],
         setting = FatCrossPerform(
             arr_list=arr_list, ser_list=ser_list, perform_param=perform_param)
 
+        # the log-bounds of large T neither overflow nor underflow
+        optimize = Optimize(setting=setting, log_domain=True)
+        optimize_new = OptimizeNew(
+            setting_new=setting, new=True, log_domain=True)
+
         if opt_method == OptMethod.GRID_SEARCH:
-            bound[_i] = Optimize(setting=setting).grid_search(
+            bound[_i] = optimize.grid_search(
                 bound_list=[(0.1, 5.0)], delta=0.1)
-            new_bound[_i] = OptimizeNew(
-                setting_new=setting, new=True).grid_search(
-                    bound_list=[(0.1, 5.0), (0.9, 6.0)], delta=0.05)
+            new_bound[_i] = optimize_new.grid_search(
+                bound_list=[(0.1, 5.0), (0.9, 6.0)], delta=0.05)
 
         elif opt_method == OptMethod.PATTERN_SEARCH:
-            bound[_i] = Optimize(setting=setting).pattern_search(
+            bound[_i] = optimize.pattern_search(
                 start_list=[0.5], delta=3.0, delta_min=0.01)
 
-            new_bound[_i] = OptimizeNew(
-                setting_new=setting, new=True).pattern_search(
-                    start_list=[0.5, 2.0], delta=3.0, delta_min=0.01)
+            new_bound[_i] = optimize_new.pattern_search(
+                start_list=[0.5, 2.0], delta=3.0, delta_min=0.01)
 
         elif opt_method == OptMethod.GS_OLD:
-            bound[_i] = Optimize(setting=setting).grid_search_old(
+            bound[_i] = optimize.grid_search_old(
                 bound_list=[(0.1, 5.0)], delta=0.1)
-            new_bound[_i] = OptimizeNew(
-                setting_new=setting, new=True).grid_search_old(
-                    bound_list=[(0.1, 5.0), (0.9, 6.0)], delta=0.1)
+            new_bound[_i] = optimize_new.grid_search_old(
+                bound_list=[(0.1, 5.0), (0.9, 6.0)], delta=0.1)
 
         else:
             raise ValueError(
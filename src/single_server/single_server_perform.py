@@ -1,15 +1,22 @@
 """Single server topology class"""
 
-from typing import List
+from typing import List, Tuple
 from warnings import warn
 
+import numpy as np
+
 from nc_arrivals.arrival_distribution import ArrivalDistribution
 from nc_arrivals.qt import DM1
-from nc_operations.evaluate_single_hop import evaluate_single_hop
+from nc_operations.evaluate_single_hop import (evaluate_single_hop,
+                                               evaluate_single_hop_array)
 from nc_operations.perform_enum import PerformEnum
-from nc_operations.performance_bounds import delay_prob
-from nc_operations.performance_bounds_power import (delay_prob_power,
-                                                    output_power)
+from nc_operations.performance_bounds import (
+    delay_prob, delay_prob_array, log_delay_prob, log_delay_prob_array)
+from nc_operations.performance_bounds_power import (
+    delay_prob_power, delay_prob_power_array, log_delay_prob_power,
+    log_delay_prob_power_array, log_output_power, log_output_power_array,
+    output_power, output_power_array)
+from nc_operations.theta_domain import single_hop_domain
 from nc_service.constant_rate_server import ConstantRate
 from utils.perform_parameter import PerformParameter
 from utils.setting_new import SettingNew
@@ -39,25 +46,69 @@ class SingleServerPerform(SettingNew):
             theta=theta,
             perform_param=self.perform_param)
 
+    def bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        theta = param_array[0]
+
+        return evaluate_single_hop_array(
+            foi=self.arr,
+            s_net=self.ser,
+            theta=theta,
+            perform_param=self.perform_param)
+
+    def log_bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        return evaluate_single_hop_array(
+            foi=self.arr,
+            s_net=self.ser,
+            theta=param_array[0],
+            perform_param=self.perform_param,
+            log_domain=True)
+
+    def log_evaluate(self, param_list: List[float]) -> float:
+        return evaluate_single_hop(
+            foi=self.arr,
+            s_net=self.ser,
+            theta=param_list[0],
+            perform_param=self.perform_param,
+            log_domain=True)
+
+    def theta_domain(self) -> Tuple[float, float]:
+        return single_hop_domain(foi=self.arr, s_net=self.ser)
+
     def new_bound(self, param_l_list: List[float]) -> float:
+        return self._new_bound(param_l_list=param_l_list, log_domain=False)
+
+    def new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        return self._new_bound_array(
+            param_l_array=param_l_array, log_domain=False)
+
+    def log_new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        return self._new_bound_array(
+            param_l_array=param_l_array, log_domain=True)
+
+    def log_new_evaluate(self, param_l_list: List[float]) -> float:
+        return self._new_bound(param_l_list=param_l_list, log_domain=True)
+
+    def _new_bound(self, param_l_list: List[float],
+                   log_domain: bool) -> float:
         if self.perform_param.perform_metric == PerformEnum.DELAY_PROB:
             if self.arr.is_discrete():
-                return delay_prob_power(
-                    arr=self.arr,
-                    ser=self.ser,
-                    theta=param_l_list[0],
-                    delay=self.perform_param.value,
-                    l_power=param_l_list[1])
+                return (log_delay_prob_power
+                        if log_domain else delay_prob_power)(
+                            arr=self.arr,
+                            ser=self.ser,
+                            theta=param_l_list[0],
+                            delay=self.perform_param.value,
+                            l_power=param_l_list[1])
             else:
                 warn("old approach is applied")
-                return delay_prob(
+                return (log_delay_prob if log_domain else delay_prob)(
                     arr=self.arr,
                     ser=self.ser,
                     theta=param_l_list[0],
                     delay_value=self.perform_param.value)
 
         elif self.perform_param.perform_metric == PerformEnum.OUTPUT:
-            return output_power(
+            return (log_output_power if log_domain else output_power)(
                 arr=self.arr,
                 ser=self.ser,
                 theta=param_l_list[0],
@@ -68,6 +119,39 @@ class SingleServerPerform(SettingNew):
             raise NameError(f"{self.perform_param.perform_metric} is an"
                             f"infeasible performance metric")
 
+    def _new_bound_array(self, param_l_array: np.ndarray,
+                         log_domain: bool) -> np.ndarray:
+        if self.perform_param.perform_metric == PerformEnum.DELAY_PROB:
+            if self.arr.is_discrete():
+                return (log_delay_prob_power_array
+                        if log_domain else delay_prob_power_array)(
+                            arr=self.arr,
+                            ser=self.ser,
+                            theta=param_l_array[0],
+                            delay=self.perform_param.value,
+                            l_power=param_l_array[1])
+            else:
+                warn("old approach is applied")
+                return (log_delay_prob_array
+                        if log_domain else delay_prob_array)(
+                            arr=self.arr,
+                            ser=self.ser,
+                            theta=param_l_array[0],
+                            delay_value=self.perform_param.value)
+
+        elif self.perform_param.perform_metric == PerformEnum.OUTPUT:
+            return (log_output_power_array
+                    if log_domain else output_power_array)(
+                        arr=self.arr,
+                        ser=self.ser,
+                        theta=param_l_array[0],
+                        delta_time=self.perform_param.value,
+                        l_power=param_l_array[1])
+
+        else:
+            raise NameError(f"{self.perform_param.perform_metric} is an"
+                            f"infeasible performance metric")
+
     def to_string(self) -> str:
         return self.to_name() + "_" + self.arr.to_value(
         ) + "_" + self.ser.to_value() + self.perform_param.to_name_value()
@@ -1,14 +1,16 @@
 """Compute average computation time for different parameters"""
 
-from math import floor
+from functools import partial
 
 import numpy as np
 
-from bound_evaluation.array_to_results import time_array_to_results
+from bound_evaluation.array_to_results import TimeAggregator
 from bound_evaluation.compare_old_new import compute_overhead
 from bound_evaluation.mc_enum import MCEnum
 from bound_evaluation.mc_enum_to_dist import mc_enum_to_dist
+from bound_evaluation.mc_parallel import mc_shards
 from bound_evaluation.monte_carlo_dist import MonteCarloDist
+from bound_evaluation.stability_filter import stable_rows
 from nc_arrivals.arrival_enum import ArrivalEnum
 from nc_arrivals.markov_modulated import MMOOFluid
 from nc_arrivals.qt import DM1
@@ -19,53 +21,79 @@ from single_server.single_server_perform import SingleServerPerform
 from utils.perform_parameter import PerformParameter
 
 
-def mc_time_single(arrival_enum: ArrivalEnum, perform_param: PerformParameter,
-                   opt_method: OptMethod, mc_dist: MonteCarloDist) -> dict:
-    """Chooses parameters by Monte Carlo type random choice"""
+def single_time_row(param_row: np.ndarray, arrival_enum: ArrivalEnum,
+                    perform_param: PerformParameter,
+                    opt_method: OptMethod) -> tuple:
+    """Computation times for one row of Monte Carlo parameters"""
+    if arrival_enum == ArrivalEnum.DM1:
+        setting = SingleServerPerform(
+            arr=DM1(lamb=param_row[0]),
+            const_rate=ConstantRate(rate=param_row[1]),
+            perform_param=perform_param)
+
+    elif arrival_enum == ArrivalEnum.MMOO:
+        setting = SingleServerPerform(
+            arr=MMOOFluid(
+                mu=param_row[0], lamb=param_row[1], burst=param_row[2]),
+            const_rate=ConstantRate(rate=param_row[3]),
+            perform_param=perform_param)
+
+    else:
+        raise NameError(f"Arrival parameter {arrival_enum.name} is infeasible")
+
+    # time_standard, time_lyapunov = compute_overhead()
+    return compute_overhead(
+        setting=setting, opt_method=opt_method, number_l=1)
+
+
+def mc_time_single(arrival_enum: ArrivalEnum,
+                   perform_param: PerformParameter,
+                   opt_method: OptMethod,
+                   mc_dist: MonteCarloDist,
+                   seed=None,
+                   processes=1,
+                   checkpoint_dir=None,
+                   prefilter=True) -> dict:
+    """Chooses parameters by Monte Carlo type random choice. With a seed
+    and a checkpoint_dir, an interrupted run resumes from its finished
+    shards. Unstable rows are not timed if prefilter is True. The timings
+    run in this process by default, as workers on the other cores would
+    skew the wall-clock times; a pool of processes is opt-in."""
     total_iterations = 10**4
 
     time_ratio = {"Number_of_servers": "Ratio"}
 
     # 1 Parameter for service
-    size_array = [total_iterations, arrival_enum.number_parameters() + 1]
-    # [rows, columns]
-
-    param_array = mc_enum_to_dist(mc_dist=mc_dist, size=size_array)
-
-    time_array = np.empty([total_iterations, 2])
-
-    for i in range(total_iterations):
-        if arrival_enum == ArrivalEnum.DM1:
-            setting = SingleServerPerform(
-                arr=DM1(lamb=param_array[i, 0]),
-                const_rate=ConstantRate(rate=param_array[i, 1]),
-                perform_param=perform_param)
-
-        elif arrival_enum == ArrivalEnum.MMOO:
-            setting = SingleServerPerform(
-                arr=MMOOFluid(
-                    mu=param_array[i, 0],
-                    lamb=param_array[i, 1],
-                    burst=param_array[i, 2]),
-                const_rate=ConstantRate(rate=param_array[i, 3]),
-                perform_param=perform_param)
-
-        else:
-            raise NameError(
-                f"Arrival parameter {arrival_enum.name} is infeasible")
-
-        # time_standard, time_lyapunov = compute_overhead()
-        time_array[i, 0], time_array[i, 1] = compute_overhead(
-            setting=setting, opt_method=opt_method, number_l=1)
-
-        if i % floor(total_iterations / 10) == 0:
-            print(f"iteration {i} of {total_iterations}")
-
-    return time_array_to_results(
-        arrival_enum=arrival_enum,
-        time_array=time_array,
-        number_servers=1,
-        time_ratio=time_ratio)
+    aggregator = TimeAggregator(arrival_enum=arrival_enum, number_servers=1)
+
+    for _start, _param_chunk, time_chunk in mc_shards(
+            row_fun=partial(
+                single_time_row,
+                arrival_enum=arrival_enum,
+                perform_param=perform_param,
+                opt_method=opt_method),
+            draw_fun=partial(mc_enum_to_dist, mc_dist=mc_dist),
+            total_iterations=total_iterations,
+            number_columns=arrival_enum.number_parameters() + 1,
+            number_results=2,
+            seed=seed,
+            processes=processes,
+            checkpoint_dir=checkpoint_dir,
+            filter_fun=partial(
+                stable_rows, arrival_enum=arrival_enum, number_servers=1)
+            if prefilter else None,
+            config={
+                "study": "single_time",
+                "arrival": arrival_enum.name,
+                "perform_param": perform_param.to_name_value(),
+                "opt_method": opt_method.name,
+                "mc_dist": mc_dist.to_name(),
+                "mc_param": mc_dist.param_to_string(),
+                "prefilter": prefilter
+            }):
+        aggregator.update(time_chunk=time_chunk)
+
+    return aggregator.results(time_ratio=time_ratio)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,47 @@
+"""Structure-of-arrays populations of arrivals and services"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def as_population(*params) -> Tuple[np.ndarray, ...]:
+    """
+    :param params: parameters of a population, arrays or shared scalars
+    :return:       1-d float arrays of a common length
+    """
+    arrays = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(param, dtype=float)) for param in params])
+
+    return tuple(array.ravel() for array in arrays)
+
+
+class Batch(object):
+    """
+    Mixin for a population of arrivals or services of the same class, whose
+    parameters are arrays of length population_size.
+
+    sigma and rho take a theta or a grid of thetas and return arrays of
+    shape theta.shape + (population_size, ). The array methods broadcast
+    theta against the population instead, e.g. a theta of shape (T, 1)
+    gives (T, population_size), so they can be composed by the operations.
+    """
+
+    population_size = 0
+
+    def population_shape(self, theta: np.ndarray) -> tuple:
+        return np.broadcast_shapes(np.shape(theta), (self.population_size, ))
+
+    def sigma(self, theta) -> np.ndarray:
+        return self.sigma_array(np.asarray(theta, dtype=float)[..., None])
+
+    def rho(self, theta) -> np.ndarray:
+        return self.rho_array(np.asarray(theta, dtype=float)[..., None])
+
+    def sigma_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(
+            super().sigma_array(theta), self.population_shape(theta))
+
+    def rho_array(self, theta: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(
+            super().rho_array(theta), self.population_shape(theta))
@@ -0,0 +1,195 @@
+"""Forward-mode dual numbers for exact gradients of the array bounds"""
+
+from typing import Sequence
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+def as_float_array(theta):
+    """
+    Replaces np.asarray(theta, dtype=float) in the array methods, such that
+    dual numbers pass through.
+
+    :param theta: scalar, array or Dual
+    :return:      float array or the Dual itself
+    """
+    if isinstance(theta, Dual):
+        return theta
+
+    return np.asarray(theta, dtype=float)
+
+
+def _split(operand) -> tuple:
+    """:return: value and gradient, None for constants"""
+    if isinstance(operand, Dual):
+        return operand.value, operand.grad
+
+    return operand, None
+
+
+def _chain(factor, grad):
+    """:return: factor * grad with the gradient axis last, None is zero"""
+    if grad is None:
+        return None
+
+    return np.asarray(factor)[..., None] * grad
+
+
+def _add(grad1, grad2):
+    if grad1 is None:
+        return grad2
+    if grad2 is None:
+        return grad1
+
+    return grad1 + grad2
+
+
+def _negative(grad):
+    return None if grad is None else -grad
+
+
+def _zero_if_none(grad):
+    """:return: grad, zero gradients if None"""
+    return 0.0 if grad is None else grad
+
+
+class Dual(NDArrayOperatorsMixin):
+    """
+    Array of values together with their gradients with respect to a fixed
+    number of variables, stored along an additional last axis. The numpy
+    ufuncs of the closed forms, e.g. np.exp or np.log1p, and np.where apply
+    the chain rule, comparisons and np.isnan act on the values.
+    """
+
+    # unary ufuncs: derivative as a function of the input
+    UNARY = {
+        np.negative: lambda u: -np.ones_like(u),
+        np.positive: np.ones_like,
+        np.exp: np.exp,
+        np.expm1: np.exp,
+        np.log: lambda u: 1 / u,
+        np.log1p: lambda u: 1 / (1 + u),
+        np.sqrt: lambda u: 0.5 / np.sqrt(u),
+        np.absolute: np.sign,
+    }
+
+    # ufuncs without a derivative, evaluated on the values only
+    PIECEWISE_CONSTANT = (np.less, np.less_equal, np.greater,
+                          np.greater_equal, np.equal, np.not_equal, np.isnan,
+                          np.isinf, np.isfinite, np.sign)
+
+    def __init__(self, value, grad) -> None:
+        """
+
+        :param value: array of values
+        :param grad:  array of gradients of shape value.shape + (variables, )
+        """
+        self.value = np.asarray(value, dtype=float)
+        self.grad = np.broadcast_to(
+            np.asarray(grad, dtype=float),
+            self.value.shape + np.shape(grad)[-1:])
+
+    @classmethod
+    def variables(cls, param_array: Sequence[float]) -> 'Dual':
+        """
+        Seeds the parameters on the first axis as the variables.
+
+        :param param_array: e.g. theta and the Lyapunov parameters l_i
+        :return:            Dual with the unit gradients
+        """
+        value = np.asarray(param_array, dtype=float)
+        number_variables = value.shape[0]
+        grad = np.zeros(value.shape + (number_variables, ))
+
+        for i in range(number_variables):
+            grad[i, ..., i] = 1.0
+
+        return cls(value=value, grad=grad)
+
+    @property
+    def shape(self) -> tuple:
+        return self.value.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.value.ndim
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __getitem__(self, key) -> 'Dual':
+        # the key refers to the leading axes, the gradient axis stays
+        return Dual(value=self.value[key], grad=self.grad[key])
+
+    def __repr__(self) -> str:
+        return f"Dual(value={self.value!r}, grad={self.grad!r})"
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or "out" in kwargs:
+            return NotImplemented
+
+        values, grads = zip(*[_split(operand) for operand in inputs])
+        value = ufunc(*values, **kwargs)
+
+        if ufunc in self.PIECEWISE_CONSTANT:
+            return value
+
+        if ufunc in self.UNARY:
+            return Dual(
+                value=value,
+                grad=_chain(self.UNARY[ufunc](values[0]), grads[0]))
+
+        if len(inputs) != 2:
+            return NotImplemented
+
+        u, v = values
+        du, dv = grads
+
+        if ufunc is np.add:
+            grad = _add(du, dv)
+        elif ufunc is np.subtract:
+            grad = _add(du, _negative(dv))
+        elif ufunc is np.multiply:
+            grad = _add(_chain(v, du), _chain(u, dv))
+        elif ufunc is np.true_divide:
+            grad = _add(_chain(1 / v, du), _chain(-value / v, dv))
+        elif ufunc is np.power:
+            grad = _chain(v * u**(v - 1), du)
+            if dv is not None:
+                # only if the exponent depends on the variables, as log(u)
+                # is nan for u <= 0
+                grad = _add(grad, _chain(np.log(u) * value, dv))
+        elif ufunc is np.logaddexp:
+            grad = _add(
+                _chain(np.exp(u - value), du), _chain(np.exp(v - value), dv))
+        elif ufunc is np.maximum or ufunc is np.minimum:
+            first = np.asarray(u >= v if ufunc is np.maximum else u <= v)
+            grad = np.where(first[..., None], _zero_if_none(du),
+                            _zero_if_none(dv))
+        else:
+            return NotImplemented
+
+        return Dual(value=value, grad=grad)
+
+    def __array_function__(self, func, types, args, kwargs):
+        if func is np.where:
+            condition, x, y = args
+            x_value, x_grad = _split(x)
+            y_value, y_grad = _split(y)
+            value = np.where(condition, x_value, y_value)
+
+            return Dual(
+                value=value,
+                grad=np.where(
+                    np.asarray(condition)[..., None],
+                    _zero_if_none(x_grad),
+                    _zero_if_none(y_grad)))
+
+        if func is np.shape:
+            return self.shape
+
+        if func is np.ndim:
+            return self.ndim
+
+        return NotImplemented
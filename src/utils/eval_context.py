@@ -0,0 +1,142 @@
+"""Cache sigma(theta) and rho(theta) of each node during one evaluation"""
+
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Optional
+
+import numpy as np
+
+
+# active context of the current thread (or task), see EvalContext.active
+_ACTIVE: ContextVar = ContextVar("eval_context", default=None)
+
+
+class EvalContext(object):
+    """Context for one bound evaluation. Within the context, sigma and rho
+    of every MemoizedNode are computed at most once per theta. The
+    optimizers only open it for settings with memoize set, see
+    Setting.memoize."""
+
+    def __init__(self, memoize=True) -> None:
+        """
+
+        :param memoize: if False, the calls are only counted
+        """
+        self.memoize = memoize
+        self.cache: dict = {}
+        self.number_calls = 0
+        self.number_evaluations = 0
+        self._token = None
+
+    @staticmethod
+    def active() -> Optional['EvalContext']:
+        """
+        :return: innermost context of the current thread, None outside
+        """
+        return _ACTIVE.get()
+
+    def __enter__(self) -> 'EvalContext':
+        self._token = _ACTIVE.set(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _ACTIVE.reset(self._token)
+        # the node ids are only valid during the evaluation
+        self.cache.clear()
+
+
+def memoize_theta(method: Callable) -> Callable:
+    """Decorator for sigma and rho of MemoizedNode"""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(node, theta=None):
+        context = _ACTIVE.get()
+
+        if theta is None:
+            # use the method's default theta
+            return method(node)
+
+        if context is None:
+            return method(node, theta)
+
+        context.number_calls += 1
+        # theta is a float on the scalar path; arrays are not cached
+        if isinstance(theta, np.ndarray):
+            context.number_evaluations += 1
+            return method(node, theta)
+
+        key = (id(node), name, theta)
+
+        if context.memoize and key in context.cache:
+            return context.cache[key]
+
+        res = method(node, theta)
+        context.number_evaluations += 1
+
+        if context.memoize:
+            context.cache[key] = res
+
+        return res
+
+    return wrapper
+
+
+class MemoizedNode(object):
+    """
+    Wraps a node that is shared in the operator graph, e.g., a hop of the
+    TFA tandem's deconvolution chain, such that its sigma and rho are
+    cached in the active EvalContext. Nodes that are not shared would never
+    hit the cache and stay unwrapped. All other attributes are the node's.
+    """
+
+    def __init__(self, node) -> None:
+        self.node = node
+
+    @memoize_theta
+    def sigma(self, theta=None):
+        if theta is None:
+            return self.node.sigma()
+
+        return self.node.sigma(theta)
+
+    @memoize_theta
+    def rho(self, theta=None):
+        if theta is None:
+            return self.node.rho()
+
+        return self.node.rho(theta)
+
+    def __getattr__(self, name: str):
+        # only called for attributes that are not found otherwise; "node"
+        # is missing while unpickling
+        if name == "node":
+            raise AttributeError(name)
+
+        return getattr(self.node, name)
+
+
+if __name__ == '__main__':
+    from canonical_tandem.tandem_tfa_delay import TandemTFADelay
+    from nc_arrivals.qt import DM1
+    from nc_service.constant_rate_server import ConstantRate
+    # use the module's class, not the one of __main__
+    from utils.eval_context import EvalContext as Context
+
+    for NUMBER_SERVERS in [2, 4, 8, 16]:
+        TANDEM = TandemTFADelay(
+            arr_list=[DM1(lamb=8.0)] * (NUMBER_SERVERS + 1),
+            ser_list=[ConstantRate(rate=2.0 * NUMBER_SERVERS)] *
+            NUMBER_SERVERS,
+            prob_d=0.001)
+
+        with Context(memoize=False) as COUNT_ONLY:
+            TANDEM.evaluate(param_list=[0.5])
+
+        with Context() as MEMOIZED:
+            TANDEM.evaluate(param_list=[0.5])
+
+        print(f"{NUMBER_SERVERS} servers: "
+              f"{COUNT_ONLY.number_evaluations} evaluations without, "
+              f"{MEMOIZED.number_evaluations} with memoization")
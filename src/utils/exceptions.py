@@ -1,5 +1,11 @@
 """"One file for all custom exception classes"""
 
+from contextvars import ContextVar
+from math import nan
+
+# "raise" or "nan" of the current thread (or task), see set_out_of_bounds
+_OUT_OF_BOUNDS_MODE: ContextVar = ContextVar("out_of_bounds", default="raise")
+
 
 class ParameterOutOfBounds(Exception):
     """Exception if input parameter is not feasible in the optimization"""
@@ -8,3 +14,69 @@ class ParameterOutOfBounds(Exception):
         msg = "Parameter is out of bounds, {0}".format(parameter)
         super(ParameterOutOfBounds, self).__init__(msg)
         self.parameter = parameter
+
+
+def set_out_of_bounds(mode: str) -> str:
+    """
+    Treatment of infeasible parameters in the current thread, similar to
+    np.seterr. Prefer OutOfBoundsState, which restores the previous mode.
+
+    :param mode: "raise" a ParameterOutOfBounds (default) or return "nan",
+                 which the optimizers map to inf
+    :return:     previous mode
+    """
+    if mode not in ("raise", "nan"):
+        raise ValueError(f"mode {mode} must be 'raise' or 'nan'")
+
+    previous = _OUT_OF_BOUNDS_MODE.get()
+    _OUT_OF_BOUNDS_MODE.set(mode)
+
+    return previous
+
+
+def get_out_of_bounds() -> str:
+    """
+    :return: current mode, see set_out_of_bounds
+    """
+    return _OUT_OF_BOUNDS_MODE.get()
+
+
+def out_of_bounds(message: str, *args) -> float:
+    """
+    Guard for infeasible parameters, used as
+    return out_of_bounds(message, *args). The message is only formatted
+    when raising, so the guard stays cheap in the "nan" mode.
+
+    In the "nan" mode, the nan propagates to the nodes above: their
+    feasibility checks are written as "not rho_a < rho_s" or
+    "not rho >= 0", which are also true for nan, so they return nan in
+    turn. The performance bounds return before evaluating the service if
+    the arrivals' rho is already nan.
+
+    :param message: message of the exception, formatted with args
+    :param args:    arguments of message.format
+    :return:        nan if the mode is "nan", raises otherwise
+    """
+    if _OUT_OF_BOUNDS_MODE.get() == "raise":
+        raise ParameterOutOfBounds(message.format(*args) if args else message)
+
+    return nan
+
+
+class OutOfBoundsState(object):
+    """Context manager for set_out_of_bounds, similar to np.errstate"""
+
+    def __init__(self, mode: str) -> None:
+        if mode not in ("raise", "nan"):
+            raise ValueError(f"mode {mode} must be 'raise' or 'nan'")
+
+        self.mode = mode
+        self._token = None
+
+    def __enter__(self) -> 'OutOfBoundsState':
+        self._token = _OUT_OF_BOUNDS_MODE.set(self.mode)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _OUT_OF_BOUNDS_MODE.reset(self._token)
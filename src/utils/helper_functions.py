@@ -1,14 +1,16 @@
 """Helper functions"""
 
 from itertools import product
-from typing import List
+from math import exp, expm1, inf, log, log1p, nan
+from typing import Callable, List
 
 import numpy as np
 import pandas as pd
 
-from utils.exceptions import ParameterOutOfBounds
+from utils.exceptions import ParameterOutOfBounds, out_of_bounds
 
 EPSILON = 1e-09
+LOG_2 = log(2.0)
 
 
 def get_q(p: float, indep: bool) -> float:
@@ -22,7 +24,7 @@ def get_q(p: float, indep: bool) -> float:
         return 1.0
     else:
         if p <= 1:
-            raise ParameterOutOfBounds("p={0} must be >1".format(p))
+            return out_of_bounds("p={0} must be >1", p)
 
         # 1/p + 1/q = 1
         # 1/q = (p - 1) / p
@@ -42,7 +44,7 @@ def get_p_n(p_list: List[float], indep: bool) -> float:
     else:
         for p_i in p_list:
             if p_i <= 1:
-                raise ParameterOutOfBounds("p={0} must be >1".format(p_i))
+                return out_of_bounds("p={0} must be >1", p_i)
 
         return 1 / (1 - sum(p_list))
 
@@ -56,6 +58,33 @@ def is_equal(float1: float, float2: float) -> bool:
     return abs(float1 - float2) < EPSILON
 
 
+def log_one_minus_exp(x: float) -> float:
+    """
+    log(1 - exp(x)) without cancellation, see Maechler (2012)
+
+    :param x: non-positive real, typically theta * (rho_a - rho_s)
+    :return:  -inf for x = 0
+    """
+    if x == 0:
+        return -inf
+
+    if x > -LOG_2:
+        return log(-expm1(x))
+
+    return log1p(-exp(x))
+
+
+@np.errstate(all="ignore")
+def log_one_minus_exp_array(x: np.ndarray) -> np.ndarray:
+    """
+    Array version of log_one_minus_exp, nan for positive entries
+
+    :param x: array of non-positive reals
+    :return:  -inf for x = 0
+    """
+    return np.where(x > -LOG_2, np.log(-np.expm1(x)), np.log1p(-np.exp(x)))
+
+
 def expand_grid(list_input: list) -> pd.DataFrame:
     """
     implement R-expand.grid() function
@@ -65,6 +94,46 @@ def expand_grid(list_input: list) -> pd.DataFrame:
     return pd.DataFrame([row for row in product(*list_input)])
 
 
+def apply_elementwise(fun: Callable[[float], float],
+                      theta: np.ndarray) -> np.ndarray:
+    """
+    Fallback to evaluate a scalar sigma / rho on an array of thetas
+    :param fun:   scalar function of theta
+    :param theta: array of thetas
+    :return:      array of function values, nan where fun is infeasible
+    """
+    theta = np.asarray(theta, dtype=float)
+    res = np.empty(theta.shape)
+
+    for index, value in np.ndenumerate(theta):
+        try:
+            res[index] = fun(float(value))
+        except (ArithmeticError, ParameterOutOfBounds, ValueError):
+            res[index] = nan
+
+    return res
+
+
+def apply_columnwise(fun: Callable[[List[float]], float],
+                     param_array: np.ndarray) -> np.ndarray:
+    """
+    Fallback to evaluate a scalar bound on an array of parameters
+    :param fun:         bound as a function of a parameter list
+    :param param_array: parameters along the first axis
+    :return:            array of bounds, inf where fun is infeasible
+    """
+    param_array = np.asarray(param_array, dtype=float)
+    res = np.empty(param_array.shape[1:])
+
+    for index in np.ndindex(*res.shape):
+        try:
+            res[index] = fun(param_array[(slice(None), ) + index].tolist())
+        except (ArithmeticError, ParameterOutOfBounds, ValueError):
+            res[index] = inf
+
+    return np.where(np.isnan(res), inf, res)
+
+
 def centroid_without_one_row(simplex: np.ndarray, index: int) -> np.ndarray:
     # type hint does not work with int and np.ndarray[int]
     # column mean of simplex without a given row
@@ -97,6 +166,49 @@ def get_unit_vector(length: int, index: int) -> List[float]:
     return res
 
 
+def is_identical(obj1, obj2) -> bool:
+    """
+    :param obj1: e.g. arrival or service
+    :param obj2: e.g. arrival or service
+    :return: returns true if both are of the same class with equal attributes
+    """
+    if obj1 is obj2:
+        return True
+
+    if type(obj1) is not type(obj2):
+        return False
+
+    dict1 = vars(obj1)
+    dict2 = vars(obj2)
+
+    if dict1.keys() != dict2.keys():
+        return False
+
+    return all(np.array_equal(dict1[key], dict2[key]) for key in dict1)
+
+
+def group_identical_pairs(list1: list, list2: list) -> List[tuple]:
+    """
+
+    :param list1: e.g. arrival list
+    :param list2: e.g. service list of the same length
+    :return:      list of (item1, item2, multiplicity) for each distinct pair
+                  in order of first occurrence
+    """
+    groups: List[list] = []
+
+    for item1, item2 in zip(list1, list2):
+        for group in groups:
+            if is_identical(group[0], item1) and is_identical(
+                    group[1], item2):
+                group[2] += 1
+                break
+        else:
+            groups.append([item1, item2, 1])
+
+    return [tuple(group) for group in groups]
+
+
 if __name__ == '__main__':
     SIMPLEX_START_TEST = np.array([[0.1, 2.0], [1.0, 3.0], [2.0, 2.0]])
     print(SIMPLEX_START_TEST)
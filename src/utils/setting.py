@@ -1,13 +1,22 @@
 """This superclass represents our get_value abstract class"""
 
 from abc import ABC, abstractmethod
-from typing import List
+from math import inf
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.helper_functions import apply_columnwise
 
 
 class Setting(ABC):
     """Each setting (topology) has to implements methods to obtain
     the bounds"""
 
+    # settings whose operator graph shares subtrees, e.g., the TFA tandem,
+    # cache sigma and rho during an evaluation, see EvalContext
+    memoize = False
+
     @abstractmethod
     def bound(self, param_list: List[float]) -> float:
         """
@@ -17,5 +26,57 @@ class Setting(ABC):
         """
         pass
 
+    def bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        """
+        standard bound on a whole array of parameters, inf if infeasible
+
+        :param param_array: theta and Hoelder parameters along the first axis
+        """
+        return apply_columnwise(fun=self.bound, param_array=param_array)
+
+    def log_bound_array(self, param_array: np.ndarray) -> np.ndarray:
+        """
+        logarithm of bound_array; settings with a closed form in log space
+        override it, such that large bounds do not overflow
+
+        :param param_array: theta and Hoelder parameters along the first axis
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log(self.bound_array(param_array=param_array))
+
+    def prepare(self) -> None:
+        """
+        build the operator graph once, such that evaluate only has to plug in
+        the parameters; settings without a graph have nothing to prepare
+        """
+        pass
+
+    def evaluate(self, param_list: List[float]) -> float:
+        """
+        standard bound on the prepared graph, used by the optimizers
+
+        :param param_list: theta and Hoelder parameters
+        """
+        return self.bound(param_list=param_list)
+
+    def log_evaluate(self, param_list: List[float]) -> float:
+        """
+        logarithm of the standard bound on the prepared graph, used by the
+        optimizers in the log domain
+
+        :param param_list: theta and Hoelder parameters
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.log(self.evaluate(param_list=param_list)))
+
+    def theta_domain(self) -> Tuple[float, float]:
+        """
+        open interval of thetas, in which the standard bound can be feasible,
+        including the stability condition; settings without an analytic
+        interval return (0, inf). The stable thetas are assumed to form a
+        single interval, see stable_domain.
+        """
+        return 0.0, inf
+
     def to_name(self) -> str:
         return self.__class__.__name__
@@ -3,6 +3,9 @@
 from abc import abstractmethod
 from typing import List
 
+import numpy as np
+
+from utils.helper_functions import apply_columnwise
 from utils.setting import Setting
 
 
@@ -18,3 +21,41 @@ class SettingNew(Setting):
         :param param_l_list: theta and Lyapunov parameters
         """
         pass
+
+    def new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        """
+        new Lyapunov bound on a whole array of parameters, inf if infeasible
+
+        :param param_l_array: theta and Lyapunov parameters along the first
+                              axis
+        """
+        return apply_columnwise(fun=self.new_bound, param_array=param_l_array)
+
+    def log_new_bound_array(self, param_l_array: np.ndarray) -> np.ndarray:
+        """
+        logarithm of new_bound_array, see Setting.log_bound_array
+
+        :param param_l_array: theta and Lyapunov parameters along the first
+                              axis
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log(self.new_bound_array(param_l_array=param_l_array))
+
+    def new_evaluate(self, param_l_list: List[float]) -> float:
+        """
+        new Lyapunov bound on the prepared graph, used by the optimizers
+
+        :param param_l_list: theta and Lyapunov parameters
+        """
+        return self.new_bound(param_l_list=param_l_list)
+
+    def log_new_evaluate(self, param_l_list: List[float]) -> float:
+        """
+        logarithm of the new Lyapunov bound on the prepared graph, see
+        Setting.log_evaluate
+
+        :param param_l_list: theta and Lyapunov parameters
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(
+                np.log(self.new_evaluate(param_l_list=param_l_list)))